@@ -4,7 +4,9 @@ from flask import Blueprint, request
 from components import db, token_required
 from components.models import Activity, ActivityBooking, ActivityRating, User
 from components.response_service import ResponseService
-from ..common.utils import ActivityValidator, ActivityStatistics, ActivityStatusManager
+from components import seat_reservation
+from components.booking_admission import booking_admission
+from ..common.utils import ActivityValidator, ActivityStatistics, ActivityStatusManager, ActivityBookingHelper
 from datetime import datetime, timezone
 
 # 创建管理员活动管理模块蓝图
@@ -483,11 +485,13 @@ def update_booking_status_admin(current_user, activity_id, booking_id):
         if not booking:
             return ResponseService.error('预约记录不存在', status_code=404)
 
+        # 修改状态并同步名额（改回 booked 时需要占用名额）
         old_status = booking.status
-        booking.status = new_status
-        booking.notes = notes
-        booking.updated_at = datetime.now()
-        db.session.commit()
+        updated, error_msg = seat_reservation.change_status(booking.id, new_status, {'notes': notes})
+        if not updated:
+            return ResponseService.error(error_msg, status_code=400)
+        if old_status == seat_reservation.SEAT_STATUS and new_status != seat_reservation.SEAT_STATUS:
+            booking_admission.schedule_promotion(activity_id)
 
         print(f"【管理员更新预约状态】预约ID: {booking_id}, 状态: {old_status} -> {new_status}, 操作者: {current_user.account}")
 
@@ -526,6 +530,9 @@ def batch_update_bookings_admin(current_user, activity_id):
         if not booking_ids:
             return ResponseService.error('预约ID列表不能为空', status_code=400)
 
+        if not isinstance(booking_ids, list):
+            return ResponseService.error('预约ID列表格式错误', status_code=400)
+
         # 验证操作类型
         operation_map = {
             'confirm_attendance': 'attended',
@@ -545,42 +552,8 @@ def batch_update_bookings_admin(current_user, activity_id):
         if not can_manage:
             return ResponseService.error(error_msg, status_code=403)
 
-        # 查询要操作的预约
-        bookings = ActivityBooking.query.filter(
-            ActivityBooking.id.in_(booking_ids),
-            ActivityBooking.activity_id == activity_id
-        ).all()
-
-        if not bookings:
-            return ResponseService.error('未找到可操作的预约记录', status_code=404)
-
-        new_status = operation_map[operation]
-        success_count = 0
-        error_count = 0
-        errors = []
-
-        for booking in bookings:
-            try:
-                old_status = booking.status
-                booking.status = new_status
-                booking.updated_at = datetime.now()
-                success_count += 1
-                print(f"【批量操作预约】预约ID: {booking.id}, 状态: {old_status} -> {new_status}")
-
-            except Exception as e:
-                error_count += 1
-                errors.append(f"预约ID {booking.id}: {str(e)}")
-
-        if success_count > 0:
-            db.session.commit()
-
-        return ResponseService.success({
-            'operation': operation,
-            'activity_id': activity_id,
-            'success_count': success_count,
-            'error_count': error_count,
-            'errors': errors
-        }, message=f'批量操作完成，成功: {success_count} 个，失败: {error_count} 个')
+        # 按批集合更新，返回每个预约ID的结果
+        return ActivityBookingHelper.batch_update(activity_id, operation, operation_map[operation], booking_ids)
 
     except Exception as e:
         db.session.rollback()
@@ -1,10 +1,14 @@
 # 预约专门接口 - 独立拆分的预约管理
 
-from flask import Blueprint, request
+from flask import Blueprint, Response, request
 from components import db, token_required
 from components.models import Activity, ActivityBooking, User
 from components.response_service import ResponseService
-from ..common.utils import ActivityValidator, ActivityStatistics
+from components import seat_reservation
+from components.booking_admission import booking_admission, get_waitlist_entry, leave_waitlist
+from components.activity_availability import availability_cache
+from ..common.utils import ActivityStatistics, ActivityBookingHelper
+from ..common.exporters import BookingExporter
 from datetime import datetime
 from sqlalchemy import text
 
@@ -22,67 +26,9 @@ def create_booking(current_user, activity_id):
     try:
         print(f"【预约接口调用】用户: {current_user.account}, 活动ID: {activity_id}")
 
-        # 验证活动是否存在
-        activity = Activity.query.get(activity_id)
-        if not activity:
-            return ResponseService.error('活动不存在', status_code=404)
-
-        # 验证活动是否可预约
-        can_book, error_msg = ActivityValidator.is_activity_bookable(activity)
-        if not can_book:
-            return ResponseService.error(error_msg, status_code=400)
-
-        # 检查用户预约冲突
-        has_conflict, existing_booking = ActivityValidator.check_user_booking_conflict(
-            current_user.account, activity_id
-        )
-
-        if has_conflict:
-            return ResponseService.error('您已经预约过该活动', status_code=400)
-
-        # 如果有取消过的预约记录，重新激活
-        if existing_booking and existing_booking.status == 'cancelled':
-            existing_booking.status = 'booked'
-            existing_booking.notes = None
-            existing_booking.updated_at = datetime.now()
-            db.session.commit()
-
-            print(f"【预约重新激活】预约ID: {existing_booking.id}")
-
-            booking_data = {
-                'id': existing_booking.id,
-                'activity_id': existing_booking.activity_id,
-                'user_account': existing_booking.user_account,
-                'status': existing_booking.status,
-                'booking_time': existing_booking.booking_time.isoformat().replace('+00:00', 'Z')
-            }
-
-            return ResponseService.success(data=booking_data, message='预约成功')
-
-        # 创建新预约
-        data = request.get_json() or {}
-        booking = ActivityBooking(
-            activity_id=activity_id,
-            user_account=current_user.account,
-            status='booked',
-            notes=data.get('notes', '')
-        )
-
-        db.session.add(booking)
-        db.session.commit()
-
-        print(f"【预约创建成功】预约ID: {booking.id}")
-
-        booking_data = {
-            'id': booking.id,
-            'activity_id': booking.activity_id,
-            'user_account': booking.user_account,
-            'status': booking.status,
-            'notes': booking.notes,
-            'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z')
-        }
-
-        return ResponseService.success(data=booking_data, message='预约成功')
+        # 提交到预约排队（未启用时直接占用名额并写入预约）
+        data = request.get_json(silent=True) or {}
+        return ActivityBookingHelper.book(current_user.account, activity_id, data.get('notes', ''), '预约成功')
 
     except Exception as e:
         db.session.rollback()
@@ -114,10 +60,11 @@ def cancel_booking(current_user, activity_id):
         if activity and activity.status == 'completed':
             return ResponseService.error('活动已结束，无法取消预约', status_code=400)
 
-        # 更新预约状态为取消
-        booking.status = 'cancelled'
-        booking.updated_at = datetime.now()
-        db.session.commit()
+        # 更新预约状态为取消并释放名额
+        if not seat_reservation.cancel(booking.id):
+            return ResponseService.error('未找到有效的预约记录', status_code=404)
+        # 释放的名额由候补名单按顺序转正
+        booking_admission.schedule_promotion(activity_id)
 
         print(f"【预约取消成功】预约ID: {booking.id}")
 
@@ -131,6 +78,75 @@ def cancel_booking(current_user, activity_id):
         return ResponseService.error(f'取消预约失败: {str(e)}', status_code=500)
 
 
+@booking_bp.route('/tickets/<ticket_id>', methods=['GET'])
+@token_required
+def get_booking_ticket(current_user, ticket_id):
+    """
+    查询预约排队凭证
+    需要认证：是
+    参数：wait 长轮询等待秒数（默认0，立即返回）；status 客户端已知的凭证状态（默认 queued），状态变化或超时后返回
+    """
+    try:
+        ticket = booking_admission.get_ticket(ticket_id)
+        if not ticket or ticket.user_account != current_user.account:
+            return ResponseService.error('排队凭证不存在或已过期', status_code=404)
+
+        wait = request.args.get('wait', 0, type=float)
+        if wait > 0:
+            booking_admission.wait(ticket, request.args.get('status', ticket.status), wait)
+
+        return ActivityBookingHelper.ticket_response(ticket)
+
+    except Exception as e:
+        db.session.rollback()
+        return ResponseService.error(f'查询排队凭证失败: {str(e)}', status_code=500)
+
+
+@booking_bp.route('/activities/<int:activity_id>/waitlist', methods=['GET'])
+@token_required
+def get_my_waitlist(current_user, activity_id):
+    """
+    查询当前用户在活动候补名单中的状态与排位
+    需要认证：是
+    """
+    try:
+        entry, position = get_waitlist_entry(activity_id, current_user.account)
+        if not entry:
+            return ResponseService.error('未加入该活动的候补名单', status_code=404)
+
+        return ResponseService.success({
+            'activity_id': activity_id,
+            'status': entry.status,
+            'position': position,
+            'booking_id': entry.booking_id,
+            'queued_at': entry.queued_at.isoformat().replace('+00:00', 'Z') if entry.queued_at else None,
+            'promoted_at': entry.promoted_at.isoformat().replace('+00:00', 'Z') if entry.promoted_at else None
+        }, message='查询候补状态成功')
+
+    except Exception as e:
+        return ResponseService.error(f'查询候补状态失败: {str(e)}', status_code=500)
+
+
+@booking_bp.route('/activities/<int:activity_id>/waitlist', methods=['DELETE'])
+@token_required
+def leave_activity_waitlist(current_user, activity_id):
+    """
+    退出活动候补名单
+    需要认证：是
+    """
+    try:
+        if not leave_waitlist(activity_id, current_user.account):
+            return ResponseService.error('未找到候补中的记录', status_code=404)
+
+        print(f"【退出候补名单】用户: {current_user.account}, 活动ID: {activity_id}")
+
+        return ResponseService.success(data={'activity_id': activity_id}, message='已退出候补名单')
+
+    except Exception as e:
+        db.session.rollback()
+        return ResponseService.error(f'退出候补名单失败: {str(e)}', status_code=500)
+
+
 @booking_bp.route('/activities/<int:activity_id>/bookings', methods=['GET'])
 @token_required
 def get_activity_bookings(current_user, activity_id):
@@ -311,11 +327,13 @@ def update_booking_status(current_user, booking_id):
         if activity.organizer_user_id != current_user.id:
             return ResponseService.error('无权限修改此活动的预约状态', status_code=403)
 
+        # 修改状态并同步名额（改回 booked 时需要占用名额）
         old_status = booking.status
-        booking.status = new_status
-        booking.notes = notes
-        booking.updated_at = datetime.now()
-        db.session.commit()
+        updated, error_msg = seat_reservation.change_status(booking_id, new_status, {'notes': notes})
+        if not updated:
+            return ResponseService.error(error_msg, status_code=400)
+        if old_status == seat_reservation.SEAT_STATUS and new_status != seat_reservation.SEAT_STATUS:
+            booking_admission.schedule_promotion(booking.activity_id)
 
         print(f"【预约状态更新】预约ID: {booking_id}, 状态: {old_status} -> {new_status}")
 
@@ -354,6 +372,9 @@ def batch_update_bookings(current_user, activity_id):
         if not booking_ids:
             return ResponseService.error('预约ID列表不能为空', status_code=400)
 
+        if not isinstance(booking_ids, list):
+            return ResponseService.error('预约ID列表格式错误', status_code=400)
+
         # 验证操作类型
         operation_map = {
             'confirm_attendance': 'attended',
@@ -372,42 +393,8 @@ def batch_update_bookings(current_user, activity_id):
         if activity.organizer_user_id != current_user.id:
             return ResponseService.error('无权限批量操作此活动的预约', status_code=403)
 
-        # 查询要操作的预约
-        bookings = ActivityBooking.query.filter(
-            ActivityBooking.id.in_(booking_ids),
-            ActivityBooking.activity_id == activity_id
-        ).all()
-
-        if not bookings:
-            return ResponseService.error('未找到可操作的预约记录', status_code=404)
-
-        new_status = operation_map[operation]
-        success_count = 0
-        error_count = 0
-        errors = []
-
-        for booking in bookings:
-            try:
-                old_status = booking.status
-                booking.status = new_status
-                booking.updated_at = datetime.now()
-                success_count += 1
-                print(f"【批量操作预约】预约ID: {booking.id}, 状态: {old_status} -> {new_status}")
-
-            except Exception as e:
-                error_count += 1
-                errors.append(f"预约ID {booking.id}: {str(e)}")
-
-        if success_count > 0:
-            db.session.commit()
-
-        return ResponseService.success({
-            'operation': operation,
-            'activity_id': activity_id,
-            'success_count': success_count,
-            'error_count': error_count,
-            'errors': errors
-        }, message=f'批量操作完成，成功: {success_count} 个，失败: {error_count} 个')
+        # 按批集合更新，返回每个预约ID的结果
+        return ActivityBookingHelper.batch_update(activity_id, operation, operation_map[operation], booking_ids)
 
     except Exception as e:
         db.session.rollback()
@@ -445,42 +432,22 @@ def get_booking_statistics(current_user, activity_id):
 def check_availability(activity_id):
     """
     检查活动预约可用性（无需认证）
+    读取可用性缓存；请求头 If-None-Match 与当前 ETag 一致时返回 304（无响应体）
     """
     try:
-        # 验证活动是否存在
-        activity = Activity.query.get(activity_id)
-        if not activity:
+        entry = availability_cache.get(activity_id)
+        if entry is None:
             return ResponseService.error('活动不存在', status_code=404)
+        availability, etag = entry
 
-        # 验证活动是否可预约
-        can_book, error_msg = ActivityValidator.is_activity_bookable(activity)
-
-        # 获取当前预约统计
-        try:
-            statistics = ActivityStatistics.get_booking_statistics(activity_id)
-        except ValueError:
-            statistics = {
-                'activity_id': activity_id,
-                'total_bookings': 0,
-                'current_booked': 0,
-                'max_participants': activity.max_participants
-            }
-
-        availability = {
-            'activity_id': activity_id,
-            'title': activity.title,
-            'status': activity.status,
-            'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
-            'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
-            'max_participants': activity.max_participants,
-            'current_booked': statistics.get('current_booked', 0),
-            'available_spots': statistics.get('available_spots', None),
-            'is_bookable': can_book,
-            'error_message': error_msg if not can_book else None,
-            'booking_deadline': activity.end_time.isoformat().replace('+00:00', 'Z') if activity.end_time else None
-        }
-
-        return ResponseService.success(data=availability, message='可用性查询成功')
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response, status_code = ResponseService.success(data=availability, message='可用性查询成功')
+            response.status_code = status_code
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
 
     except Exception as e:
         return ResponseService.error(f'可用性查询失败: {str(e)}', status_code=500)
@@ -573,8 +540,9 @@ def delete_booking(current_user, booking_id):
             'deleted_by': current_user.account
         }
 
-        db.session.delete(booking)
-        db.session.commit()
+        # 删除 booked 状态的预约时同时释放名额，由候补名单转正
+        if seat_reservation.delete_booking(booking_id) and deleted_info['status'] == seat_reservation.SEAT_STATUS:
+            booking_admission.schedule_promotion(deleted_info['activity_id'])
 
         print(f"【预约记录删除】预约ID: {booking_id}, 操作者: {current_user.account}")
 
@@ -591,6 +559,10 @@ def export_bookings(current_user, activity_id):
     """
     导出活动预约列表（管理员/组织者操作）
     需要认证：是
+
+    查询参数:
+        status: 预约状态筛选（可选）
+        format: json（默认，一次返回全部数据）/ csv / ndjson（流式下载，适合大型活动）
     """
     try:
         # 验证活动权限
@@ -602,34 +574,16 @@ def export_bookings(current_user, activity_id):
             return ResponseService.error('无权限导出此活动的预约列表', status_code=403)
 
         status = request.args.get('status', '').strip()
+        export_format = request.args.get('format', 'json').strip().lower()
+        if export_format != 'json' and export_format not in BookingExporter.FORMATS:
+            return ResponseService.error('导出格式仅支持 json、csv、ndjson', status_code=400)
 
-        # 构建查询
-        query = ActivityBooking.query.filter_by(activity_id=activity_id)
-        if status:
-            query = query.filter(ActivityBooking.status == status)
-
-        # 获取所有预约记录
-        bookings = query.order_by(ActivityBooking.booking_time.desc()).all()
-
-        export_data = []
-        for booking in bookings:
-            # 获取用户信息
-            user = User.query.filter_by(account=booking.user_account, is_deleted=0).first()
+        exporter = BookingExporter(activity, status)
+        if export_format != 'json':
+            print(f"【预约流式导出】活动ID: {activity_id}, 格式: {export_format}, 用户: {current_user.account}")
+            return exporter.response(export_format)
 
-            booking_data = {
-                '预约ID': booking.id,
-                '活动ID': booking.activity_id,
-                '活动标题': activity.title,
-                '用户账号': booking.user_account,
-                '用户姓名': user.username if user else '用户已注销',
-                '用户手机': user.phone if user else '',
-                '用户邮箱': user.email if user else '',
-                '预约时间': booking.booking_time.strftime('%Y-%m-%d %H:%M:%S'),
-                '预约状态': booking.status,
-                '备注': booking.notes or '',
-                '更新时间': booking.updated_at.strftime('%Y-%m-%d %H:%M:%S') if booking.updated_at else ''
-            }
-            export_data.append(booking_data)
+        export_data = list(exporter.rows())
 
         export_info = {
             'activity_id': activity_id,
@@ -0,0 +1,127 @@
+# API_activities 流式导出模块
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from flask import Response, stream_with_context
+from components import db
+from components.models import ActivityBooking, User
+
+
+class BookingExporter:
+    """
+    活动预约流式导出
+
+    原导出接口 .all() 加载全部预约后逐条执行 User.query 查询用户信息，再拼成一个 JSON 响应返回，
+    万人活动需要上万次查询且整个响应都在内存中构建。导出器用一条 LEFT JOIN user_info 的查询读取预约与用户信息，
+    按 yield_per 分批从游标取行（服务端游标可用时使用服务端游标），每取到一批就写入响应，内存占用与预约数量无关。
+
+    用法:
+        exporter = BookingExporter(activity, status)
+        return exporter.response('csv')      # 或 'ndjson'
+        rows = list(exporter.rows())         # 兼容原 JSON 导出
+    """
+
+    # 支持的流式导出格式：格式 -> (Content-Type, 文件扩展名)
+    FORMATS = {
+        'csv': ('text/csv; charset=utf-8', 'csv'),
+        'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson')
+    }
+
+    # 导出列（顺序即 CSV 列顺序）
+    FIELDS = ('预约ID', '活动ID', '活动标题', '用户账号', '用户姓名', '用户手机', '用户邮箱',
+              '预约时间', '预约状态', '备注', '更新时间')
+
+    # 每批从游标读取的行数（同时也是写入响应的批大小）
+    BATCH_SIZE = 500
+
+    def __init__(self, activity, status: Optional[str] = None):
+        self.activity = activity
+        self.status = status or None
+
+    def _statement(self):
+        """预约 LEFT JOIN 未注销用户，按预约时间倒序"""
+        bookings = ActivityBooking.__table__
+        users = User.__table__
+        stmt = db.select(
+            bookings.c.id, bookings.c.activity_id, bookings.c.user_account, bookings.c.booking_time,
+            bookings.c.status, bookings.c.notes, bookings.c.updated_at,
+            users.c.username, users.c.phone, users.c.email
+        ).select_from(bookings.outerjoin(users, db.and_(
+            users.c.account == bookings.c.user_account, users.c.is_deleted == 0
+        ))).where(bookings.c.activity_id == self.activity.id)
+        if self.status:
+            stmt = stmt.where(bookings.c.status == self.status)
+        return stmt.order_by(bookings.c.booking_time.desc(), bookings.c.id.desc())
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """逐行生成导出数据（字段与原导出接口一致）"""
+        result = db.session.execute(self._statement().execution_options(yield_per=self.BATCH_SIZE))
+        for row in result:
+            registered = row.username is not None
+            yield {
+                '预约ID': row.id,
+                '活动ID': row.activity_id,
+                '活动标题': self.activity.title,
+                '用户账号': row.user_account,
+                '用户姓名': row.username if registered else '用户已注销',
+                '用户手机': row.phone if registered else '',
+                '用户邮箱': (row.email or '') if registered else '',
+                '预约时间': row.booking_time.strftime('%Y-%m-%d %H:%M:%S'),
+                '预约状态': row.status,
+                '备注': row.notes or '',
+                '更新时间': row.updated_at.strftime('%Y-%m-%d %H:%M:%S') if row.updated_at else ''
+            }
+
+    def _csv_chunks(self) -> Iterator[str]:
+        """CSV（带 UTF-8 BOM，Excel 打开中文表头不乱码）"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        writer.writerow(self.FIELDS)
+        for index, row in enumerate(self.rows(), 1):
+            writer.writerow([row[field] for field in self.FIELDS])
+            if index % self.BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _ndjson_chunks(self) -> Iterator[str]:
+        """NDJSON（每行一条预约）"""
+        lines = []
+        for row in self.rows():
+            lines.append(json.dumps(row, ensure_ascii=False))
+            if len(lines) >= self.BATCH_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    def _guarded(self, chunks: Iterator[str]) -> Iterator[str]:
+        """
+        响应头已发出后无法再返回错误响应：导出中断时回滚、记录日志并重新抛出，
+        由服务器中断分块响应，客户端看到下载失败而不是一个被截断但看似完整的文件
+        """
+        try:
+            yield from chunks
+        except Exception as e:
+            db.session.rollback()
+            print(f"【预约导出中断】活动ID: {self.activity.id}, 错误: {str(e)}")
+            raise
+
+    def response(self, export_format: str) -> Response:
+        """构建流式下载响应"""
+        content_type, extension = self.FORMATS[export_format]
+        chunks = self._csv_chunks() if export_format == 'csv' else self._ndjson_chunks()
+        filename = f"activity_{self.activity.id}_bookings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        return Response(
+            stream_with_context(self._guarded(chunks)),
+            content_type=content_type,
+            headers={
+                'Content-Disposition': f'attachment; filename={filename}',
+                'X-Accel-Buffering': 'no'
+            }
+        )
@@ -0,0 +1,99 @@
+# API_activities 批量加载模块
+
+from typing import Dict, Iterable, List, Optional
+from config import Config
+from components import db
+from components.models import Activity, ActivityBooking
+
+
+class ActivityProjection:
+    """
+    活动列表投影
+
+    活动列表接口逐条执行 ActivityBooking.query.filter_by(...).count() 统计预约人数，
+    "我的活动"还对每条预约执行 Activity.query.get，一页数据需要 2N 条查询。投影先收集当前页的活动ID，
+    预约人数按 (活动, 状态) 一条 IN + GROUP BY 查询，预约对应的活动一条 IN 查询，序列化时从内存字典中读取。
+
+    ACTIVITY_PARTICIPANTS_FROM_COUNTER 为 True 时（current_participants 已回填并由名额预约引擎维护），
+    已预约人数直接读取活动的计数列，只需要已预约人数时不再查询预约表。
+
+    用法:
+        projection = ActivityProjection().load_counts(activities)
+        projection.booked_count(activity.id)
+
+        projection = ActivityProjection().load_booking_activities(bookings)
+        projection.activity(booking.activity_id)
+    """
+
+    # 统计的预约状态
+    BOOKING_STATUSES = ('booked', 'attended', 'cancelled')
+
+    def __init__(self, use_counter: Optional[bool] = None):
+        self.use_counter = Config.ACTIVITY_PARTICIPANTS_FROM_COUNTER if use_counter is None else use_counter
+        self._activities: Dict[int, Optional[Activity]] = {}
+        self._counts: Dict[int, Dict[str, int]] = {}
+        self._counters: Dict[int, int] = {}
+
+    @staticmethod
+    def _collect_ids(values: Iterable[Optional[int]], loaded: Dict[int, object]) -> List[int]:
+        """收集尚未加载的非空ID（去重）"""
+        return list({value for value in values if value is not None and value not in loaded})
+
+    def load_counts(self, activities, all_statuses: bool = False) -> 'ActivityProjection':
+        """
+        加载活动的预约人数
+
+        Args:
+            activities: 活动列表
+            all_statuses: 是否需要已签到、已取消人数（否则只保证已预约人数）
+        """
+        if self.use_counter:
+            for activity in activities:
+                self._counters[activity.id] = activity.current_participants or 0
+            if not all_statuses:
+                return self
+
+        activity_ids = self._collect_ids((activity.id for activity in activities), self._counts)
+        if not activity_ids:
+            return self
+        for activity_id in activity_ids:
+            self._counts[activity_id] = dict.fromkeys(self.BOOKING_STATUSES, 0)
+        rows = db.session.query(
+            ActivityBooking.activity_id, ActivityBooking.status, db.func.count(ActivityBooking.id)
+        ).filter(
+            ActivityBooking.activity_id.in_(activity_ids)
+        ).group_by(ActivityBooking.activity_id, ActivityBooking.status).all()
+        for activity_id, status, count in rows:
+            if status in self._counts[activity_id]:
+                self._counts[activity_id][status] = count
+        return self
+
+    def load_activities(self, activity_ids: Iterable[Optional[int]]) -> 'ActivityProjection':
+        """按ID批量加载活动（一条 IN 查询）"""
+        activity_ids = self._collect_ids(activity_ids, self._activities)
+        if not activity_ids:
+            return self
+        for activity_id in activity_ids:
+            self._activities[activity_id] = None
+        for activity in Activity.query.filter(Activity.id.in_(activity_ids)).all():
+            self._activities[activity.id] = activity
+        return self
+
+    def load_booking_activities(self, bookings) -> 'ActivityProjection':
+        """加载预约对应的活动"""
+        return self.load_activities(booking.activity_id for booking in bookings)
+
+    def activity(self, activity_id: int) -> Optional[Activity]:
+        return self._activities.get(activity_id)
+
+    def booked_count(self, activity_id: int) -> int:
+        """已预约人数（计数列优先）"""
+        if activity_id in self._counters:
+            return self._counters[activity_id]
+        return self._counts.get(activity_id, {}).get('booked', 0)
+
+    def booking_counts(self, activity_id: int) -> Dict[str, int]:
+        """各状态的预约人数（需以 all_statuses=True 加载）"""
+        counts = dict(self._counts.get(activity_id) or dict.fromkeys(self.BOOKING_STATUSES, 0))
+        counts['booked'] = self.booked_count(activity_id)
+        return counts
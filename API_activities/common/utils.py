@@ -3,8 +3,12 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy import text
-from components import db
+from config import Config
+from components import db, seat_reservation
 from components.models import Activity, ActivityBooking, ActivityRating
+from components.response_service import ResponseService
+from components.booking_admission import booking_admission, TICKET_BOOKED, TICKET_REJECTED
+from components.activity_rating_summary import rating_summary
 
 
 class ActivityValidator:
@@ -183,42 +187,26 @@ class ActivityStatistics:
         Returns:
             Dict: 评分统计信息
         """
-        # 验证活动是否存在
-        activity = Activity.query.get(activity_id)
-        if not activity:
+        # 活动与评分汇总行一次主键查询（汇总表由 components.activity_rating_summary 增量维护）
+        summary = rating_summary.get_summary(activity_id)
+        if summary is None:
             raise ValueError("活动不存在")
 
-        # 评分统计
-        stats = db.session.execute(text("""
-            SELECT
-                COUNT(*) as total_ratings,
-                AVG(score) as average_score,
-                MIN(score) as min_score,
-                MAX(score) as max_score,
-                SUM(CASE WHEN score = 5 THEN 1 ELSE 0 END) as five_star_count,
-                SUM(CASE WHEN score = 4 THEN 1 ELSE 0 END) as four_star_count,
-                SUM(CASE WHEN score = 3 THEN 1 ELSE 0 END) as three_star_count,
-                SUM(CASE WHEN score = 2 THEN 1 ELSE 0 END) as two_star_count,
-                SUM(CASE WHEN score = 1 THEN 1 ELSE 0 END) as one_star_count
-            FROM activity_rating
-            WHERE activity_id = :activity_id
-        """), {"activity_id": activity_id}).fetchone()
-
-        total_ratings = stats.total_ratings or 0
+        total_ratings = summary['rating_count']
         rating_distribution = {
-            '5_star': stats.five_star_count or 0,
-            '4_star': stats.four_star_count or 0,
-            '3_star': stats.three_star_count or 0,
-            '2_star': stats.two_star_count or 0,
-            '1_star': stats.one_star_count or 0
+            '5_star': summary['star_5'],
+            '4_star': summary['star_4'],
+            '3_star': summary['star_3'],
+            '2_star': summary['star_2'],
+            '1_star': summary['star_1']
         }
 
         return {
             'activity_id': activity_id,
             'total_ratings': total_ratings,
-            'average_score': round(float(stats.average_score), 2) if stats.average_score else 0,
-            'min_score': stats.min_score or 0,
-            'max_score': stats.max_score or 0,
+            'average_score': round(summary['score_sum'] / total_ratings, 2) if total_ratings else 0,
+            'min_score': summary['min_score'] or 0,
+            'max_score': summary['max_score'] or 0,
             'rating_distribution': rating_distribution,
             'rating_percentage': {
                 '5_star': round((rating_distribution['5_star'] / max(1, total_ratings)) * 100, 1),
@@ -362,4 +350,126 @@ class ActivitySearchHelper:
         if 'end_time_to' in filters and filters['end_time_to']:
             query = query.filter(Activity.end_time <= filters['end_time_to'])
 
-        return query
\ No newline at end of file
+        return query
+
+class ActivityBookingHelper:
+    """预约接口辅助工具类（预约排队与名额预约引擎的响应组装）"""
+
+    @staticmethod
+    def booking_data(booking: ActivityBooking, include_notes: bool = True) -> Dict[str, Any]:
+        """预约成功时返回的预约数据"""
+        data = {
+            'id': booking.id,
+            'activity_id': booking.activity_id,
+            'user_account': booking.user_account,
+            'status': booking.status,
+            'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z')
+        }
+        if include_notes:
+            data['notes'] = booking.notes
+        return data
+
+    @staticmethod
+    def book(user_account: str, activity_id: int, notes: str, success_message: str) -> tuple:
+        """
+        预约活动并返回接口响应
+
+        启用预约排队时提交到排队，等待 BOOKING_QUEUE_SYNC_WAIT 秒仍未写入的返回 202 与排队凭证；
+        未启用时在当前线程内直接预约。
+
+        Returns:
+            tuple: ResponseService 响应
+        """
+        if booking_admission.enabled:
+            ticket = booking_admission.submit(activity_id, user_account, notes)
+            booking_admission.wait(ticket, timeout=Config.BOOKING_QUEUE_SYNC_WAIT)
+            return ActivityBookingHelper.ticket_response(ticket, success_message)
+
+        result = seat_reservation.reserve(activity_id, user_account, notes)
+        if not result.success:
+            status_code = 404 if result.result == seat_reservation.RESERVE_NOT_FOUND else 400
+            return ResponseService.error(result.message, status_code=status_code)
+        print(f"【预约成功】预约ID: {result.booking_id}, 用户: {user_account}, 结果: {result.result}")
+        data = ActivityBookingHelper.booked_data(result.booking_id, activity_id, user_account, result.result)
+        return ResponseService.success(data=data, message=success_message)
+
+    @staticmethod
+    def booked_data(booking_id: int, activity_id: int, user_account: str, result: str) -> Dict[str, Any]:
+        """
+        已提交预约的返回数据
+
+        预约可能由排队线程在其他会话中提交：先结束当前请求的事务再读取（请求会话可能已因认证查询持有快照，
+        MySQL REPEATABLE READ 下看不到该提交）。预约已提交但读取不到时（如已被删除）按预约结果返回。
+        """
+        db.session.rollback()
+        booking = db.session.get(ActivityBooking, booking_id)
+        if booking is None:
+            return {
+                'id': booking_id,
+                'activity_id': activity_id,
+                'user_account': user_account,
+                'status': seat_reservation.SEAT_STATUS
+            }
+        return ActivityBookingHelper.booking_data(booking, result == seat_reservation.RESERVE_BOOKED)
+
+    @staticmethod
+    def ticket_response(ticket, success_message: str = '预约成功') -> tuple:
+        """
+        按排队凭证状态返回接口响应
+
+        已预约返回预约数据；被拒绝返回原预约接口的错误；排队中或已加入候补返回 202 与凭证。
+        """
+        if ticket.status == TICKET_BOOKED:
+            print(f"【预约成功】预约ID: {ticket.booking_id}, 用户: {ticket.user_account}, 结果: {ticket.result}")
+            data = ActivityBookingHelper.booked_data(
+                ticket.booking_id, ticket.activity_id, ticket.user_account, ticket.result
+            )
+            data['ticket_id'] = ticket.id
+            return ResponseService.success(data=data, message=success_message)
+        if ticket.status == TICKET_REJECTED:
+            status_code = 404 if ticket.result == seat_reservation.RESERVE_NOT_FOUND else 400
+            return ResponseService.error(ticket.message, data=ticket.to_dict(), status_code=status_code)
+        return ResponseService.success(data=ticket.to_dict(), message=ticket.message, status_code=202)
+
+    # 批量操作的预约结果说明
+    BATCH_ERROR_MESSAGES = {
+        seat_reservation.BATCH_NOT_FOUND: '预约记录不存在或不属于该活动',
+        seat_reservation.BATCH_CONFLICT: '预约状态已被修改，请刷新后重试',
+        seat_reservation.BATCH_INVALID: '预约ID无效'
+    }
+
+    @staticmethod
+    def batch_update(activity_id: int, operation: str, new_status: str, booking_ids: list) -> tuple:
+        """
+        批量修改预约状态并返回接口响应
+
+        集合操作按批执行（seat_reservation.change_status_batch），返回每个预约ID的结果；
+        释放名额时安排候补转正。没有任何预约属于该活动时返回 404。
+        """
+        outcomes, released = seat_reservation.change_status_batch(
+            activity_id, booking_ids, new_status, chunk_size=Config.BOOKING_BATCH_CHUNK_SIZE
+        )
+        if all(outcome['result'] in ActivityBookingHelper.BATCH_ERROR_MESSAGES for outcome in outcomes):
+            return ResponseService.error('未找到可操作的预约记录', status_code=404)
+        if released:
+            booking_admission.schedule_promotion(activity_id)
+
+        errors = [
+            f"预约ID {outcome['booking_id']}: {ActivityBookingHelper.BATCH_ERROR_MESSAGES[outcome['result']]}"
+            for outcome in outcomes if outcome['result'] in ActivityBookingHelper.BATCH_ERROR_MESSAGES
+        ]
+        updated_count = sum(1 for outcome in outcomes if outcome['result'] == seat_reservation.BATCH_UPDATED)
+        success_count = len(outcomes) - len(errors)
+        print(f"【批量操作预约】活动ID: {activity_id}, 状态 -> {new_status}, 更新: {updated_count}, "
+              f"未变化: {success_count - updated_count}, 失败: {len(errors)}, 释放名额: {released}")
+
+        return ResponseService.success({
+            'operation': operation,
+            'activity_id': activity_id,
+            'success_count': success_count,
+            'updated_count': updated_count,
+            'error_count': len(errors),
+            'released_seats': released,
+            'errors': errors,
+            'results': outcomes
+        }, message=f'批量操作完成，成功: {success_count} 个，失败: {len(errors)} 个')
@@ -4,6 +4,7 @@ from flask import Blueprint, request
 from components import db, token_required
 from components.models import Activity, ActivityDiscuss, ActivityDiscussComment, User
 from components.response_service import ResponseService
+from components.search_index import search_index, SEARCH_DOC_ACTIVITY_DISCUSS
 from datetime import datetime
 from sqlalchemy import text
 
@@ -576,10 +577,10 @@ def search_discussions(activity_id):
         page = int(request.args.get('page', 1))
         size = int(request.args.get('size', 20))
 
-        # 搜索讨论
-        query = ActivityDiscuss.query.filter(
-            ActivityDiscuss.activity_id == activity_id,
-            ActivityDiscuss.content.like(f'%{keyword}%')
+        # 搜索讨论（倒排索引，按相关度排序，相关度相同时按发布时间倒序）
+        query = search_index.apply(
+            ActivityDiscuss.query.filter(ActivityDiscuss.activity_id == activity_id),
+            SEARCH_DOC_ACTIVITY_DISCUSS, keyword, rank=True
         ).order_by(ActivityDiscuss.create_time.desc())
 
         pagination = query.paginate(page=page, per_page=size)
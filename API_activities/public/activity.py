@@ -4,11 +4,16 @@ from flask import Blueprint, request
 from components import db
 from components.models import Activity
 from components.response_service import ResponseService
-from datetime import datetime
+from components.search_index import search_index, SEARCH_DOC_ACTIVITY
+from ..common.loaders import ActivityProjection
+from datetime import datetime, timedelta
 
 # 创建活动公开访问模块蓝图
 bp_activities_public = Blueprint('activities_public', __name__, url_prefix='/api/public/activities')
 
+# 公开可见的活动状态（已结束的活动由 components.activity_lifecycle 改为 completed）
+PUBLIC_STATUSES = ('published', 'completed')
+
 # 公开的活动列表查询（无需登录）
 @bp_activities_public.route('/activities', methods=['GET'])
 def get_public_activities():
@@ -21,7 +26,7 @@ def get_public_activities():
         size = int(request.args.get('size', 10))
         keyword = request.args.get('keyword', '').strip()
         organizer_display = request.args.get('organizer_display', '').strip()
-        status = request.args.get('status', 'published')  # 默认只显示已发布的活动
+        status = request.args.get('status')  # 默认显示已发布与已结束的活动
         start_date = request.args.get('start_date', '').strip()
         end_date = request.args.get('end_date', '').strip()
 
@@ -29,15 +34,14 @@ def get_public_activities():
         query = Activity.query
 
         # 状态筛选
-        if status:
+        if status is None:
+            query = query.filter(Activity.status.in_(PUBLIC_STATUSES))
+        elif status:
             query = query.filter(Activity.status == status)
 
-        # 关键词搜索（标题和描述）
+        # 关键词搜索（标题和描述，倒排索引）
         if keyword:
-            query = query.filter(
-                (Activity.title.like(f'%{keyword}%')) |
-                (Activity.description.like(f'%{keyword}%'))
-            )
+            query = search_index.apply(query, SEARCH_DOC_ACTIVITY, keyword)
 
         # 组织者筛选
         if organizer_display:
@@ -63,6 +67,9 @@ def get_public_activities():
         activities = pagination.items
         total = pagination.total
 
+        # 一条分组查询统计当前页各活动的预约人数
+        projection = ActivityProjection().load_counts(activities)
+
         result_list = []
         for activity in activities:
             # 计算活动状态
@@ -74,16 +81,6 @@ def get_public_activities():
             else:
                 activity_status = "已结束"
 
-            # 获取报名人数（如果有预约表的话）
-            try:
-                from components.models import ActivityBooking
-                booking_count = ActivityBooking.query.filter_by(
-                    activity_id=activity.id,
-                    status='confirmed'
-                ).count()
-            except:
-                booking_count = 0
-
             item = {
                 'id': activity.id,
                 'title': activity.title,
@@ -93,7 +90,7 @@ def get_public_activities():
                 'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
                 'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
                 'max_participants': activity.max_participants,
-                'current_participants': booking_count,
+                'current_participants': projection.booked_count(activity.id),
                 'activity_status': activity_status,
                 'status': activity.status,
                 'created_at': activity.created_at.isoformat().replace('+00:00', 'Z')
@@ -118,7 +115,7 @@ def get_public_activity_detail(activity_id):
     获取公开的活动详情（无需登录）
     """
     try:
-        activity = Activity.query.filter_by(id=activity_id, status='published').first()
+        activity = Activity.query.filter(Activity.id == activity_id, Activity.status.in_(PUBLIC_STATUSES)).first()
         if not activity:
             return ResponseService.error('活动不存在或未发布', status_code=404)
 
@@ -186,8 +183,8 @@ def get_public_activities_statistics():
     try:
         from sqlalchemy import func
 
-        # 基本统计（仅已发布活动）
-        total_published = Activity.query.filter_by(status='published').count()
+        # 基本统计（已发布与已结束的活动）
+        total_published = Activity.query.filter(Activity.status.in_(PUBLIC_STATUSES)).count()
 
         # 活动状态统计
         now = datetime.utcnow()
@@ -205,16 +202,16 @@ def get_public_activities_statistics():
             Activity.end_time >= now
         ).count()
 
-        # 已结束的活动
-        completed_count = Activity.query.filter(
-            Activity.status == 'published',
-            Activity.end_time < now
-        ).count()
+        # 已结束的活动（已由生命周期任务改为 completed，或尚未迁移的已发布活动）
+        completed_count = Activity.query.filter(db.or_(
+            Activity.status == 'completed',
+            db.and_(Activity.status == 'published', Activity.end_time < now)
+        )).count()
 
         # 最近30天发布的活动
-        thirty_days_ago = datetime.utcnow() - datetime.timedelta(days=30)
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
         recent_count = Activity.query.filter(
-            Activity.status == 'published',
+            Activity.status.in_(PUBLIC_STATUSES),
             Activity.created_at >= thirty_days_ago
         ).count()
 
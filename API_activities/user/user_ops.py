@@ -4,7 +4,10 @@ from flask import Blueprint, request
 from components import db, token_required
 from components.models import Activity, ActivityBooking, ActivityRating, ActivityDiscuss, User
 from components.response_service import ResponseService
-from ..common.utils import ActivityValidator, ActivityStatistics
+from components import seat_reservation
+from components.booking_admission import booking_admission
+from ..common.utils import ActivityValidator, ActivityStatistics, ActivityBookingHelper
+from ..common.loaders import ActivityProjection
 from datetime import datetime
 
 # 创建用户操作模块蓝图
@@ -21,67 +24,9 @@ def book_activity(current_user, activity_id):
     try:
         print(f"【用户预约活动请求】用户: {current_user.account}, 活动ID: {activity_id}")
 
-        # 验证活动是否存在
-        activity = Activity.query.get(activity_id)
-        if not activity:
-            return ResponseService.error('活动不存在', status_code=404)
-
-        # 验证活动是否可预约
-        can_book, error_msg = ActivityValidator.is_activity_bookable(activity)
-        if not can_book:
-            return ResponseService.error(error_msg, status_code=400)
-
-        # 检查用户预约冲突
-        has_conflict, existing_booking = ActivityValidator.check_user_booking_conflict(
-            current_user.account, activity_id
-        )
-
-        if has_conflict:
-            return ResponseService.error('您已经预约过该活动', status_code=400)
-
-        # 如果有取消过的预约记录，重新激活
-        if existing_booking and existing_booking.status == 'cancelled':
-            existing_booking.status = 'booked'
-            existing_booking.notes = None
-            existing_booking.updated_at = datetime.now()
-            db.session.commit()
-
-            print(f"【预约重新激活】预约ID: {existing_booking.id}, 用户: {current_user.account}")
-
-            booking_data = {
-                'id': existing_booking.id,
-                'activity_id': existing_booking.activity_id,
-                'user_account': existing_booking.user_account,
-                'status': existing_booking.status,
-                'booking_time': existing_booking.booking_time.isoformat().replace('+00:00', 'Z')
-            }
-
-            return ResponseService.success(data=booking_data, message='活动预约成功')
-
-        # 创建新预约
-        data = request.get_json() or {}
-        booking = ActivityBooking(
-            activity_id=activity_id,
-            user_account=current_user.account,
-            status='booked',
-            notes=data.get('notes', '')
-        )
-
-        db.session.add(booking)
-        db.session.commit()
-
-        print(f"【预约创建成功】预约ID: {booking.id}, 用户: {current_user.account}")
-
-        booking_data = {
-            'id': booking.id,
-            'activity_id': booking.activity_id,
-            'user_account': booking.user_account,
-            'status': booking.status,
-            'notes': booking.notes,
-            'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z')
-        }
-
-        return ResponseService.success(data=booking_data, message='活动预约成功')
+        # 提交到预约排队（未启用时直接占用名额并写入预约）
+        data = request.get_json(silent=True) or {}
+        return ActivityBookingHelper.book(current_user.account, activity_id, data.get('notes', ''), '活动预约成功')
 
     except Exception as e:
         db.session.rollback()
@@ -113,10 +58,11 @@ def cancel_booking(current_user, activity_id):
         if activity and activity.status == 'completed':
             return ResponseService.error('活动已结束，无法取消预约', status_code=400)
 
-        # 更新预约状态为取消
-        booking.status = 'cancelled'
-        booking.updated_at = datetime.now()
-        db.session.commit()
+        # 更新预约状态为取消并释放名额
+        if not seat_reservation.cancel(booking.id):
+            return ResponseService.error('未找到有效的预约记录', status_code=404)
+        # 释放的名额由候补名单按顺序转正
+        booking_admission.schedule_promotion(activity_id)
 
         print(f"【预约取消成功】预约ID: {booking.id}, 用户: {current_user.account}")
 
@@ -572,7 +518,8 @@ def get_my_activities(current_user):
         role = request.args.get('role', 'all')  # organizer/participant/all
         status = request.args.get('status', '').strip()
 
-        result_list = []
+        organizer_activities = []
+        participant_bookings = []
 
         if role in ['organizer', 'all']:
             # 获取用户创建的活动
@@ -582,29 +529,6 @@ def get_my_activities(current_user):
 
             organizer_activities = organizer_query.order_by(Activity.updated_at.desc()).all()
 
-            for activity in organizer_activities:
-                # 统计预约人数
-                current_bookings = ActivityBooking.query.filter_by(
-                    activity_id=activity.id, status='booked'
-                ).count()
-
-                item = {
-                    'id': activity.id,
-                    'title': activity.title,
-                    'description': activity.description,
-                    'location': activity.location,
-                    'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
-                    'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
-                    'max_participants': activity.max_participants,
-                    'current_participants': current_bookings,
-                    'tags': activity.tags,
-                    'status': activity.status,
-                    'role': 'organizer',
-                    'created_at': activity.created_at.isoformat().replace('+00:00', 'Z'),
-                    'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z')
-                }
-                result_list.append(item)
-
         if role in ['participant', 'all']:
             # 获取用户参与的活动
             participant_query = ActivityBooking.query.filter_by(user_account=current_user.account)
@@ -614,38 +538,59 @@ def get_my_activities(current_user):
 
             participant_bookings = participant_query.order_by(ActivityBooking.booking_time.desc()).all()
 
-            for booking in participant_bookings:
-                activity = Activity.query.get(booking.activity_id)
-                if not activity:
-                    continue
-
-                # 避免重复添加（如果用户既是创建者也是参与者）
-                if any(item['id'] == activity.id for item in result_list):
-                    continue
-
-                # 统计预约人数
-                current_bookings = ActivityBooking.query.filter_by(
-                    activity_id=activity.id, status='booked'
-                ).count()
-
-                item = {
-                    'id': activity.id,
-                    'title': activity.title,
-                    'description': activity.description,
-                    'location': activity.location,
-                    'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
-                    'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
-                    'max_participants': activity.max_participants,
-                    'current_participants': current_bookings,
-                    'tags': activity.tags,
-                    'status': activity.status,
-                    'role': 'participant',
-                    'booking_status': booking.status,
-                    'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z'),
-                    'created_at': activity.created_at.isoformat().replace('+00:00', 'Z'),
-                    'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z')
-                }
-                result_list.append(item)
+        # 批量加载预约对应的活动与各活动的预约人数
+        projection = ActivityProjection().load_booking_activities(participant_bookings)
+        participant_activities = [projection.activity(booking.activity_id) for booking in participant_bookings]
+        projection.load_counts(organizer_activities, all_statuses=True)
+        projection.load_counts([activity for activity in participant_activities if activity])
+
+        result_list = []
+        listed_ids = set()
+
+        for activity in organizer_activities:
+            item = {
+                'id': activity.id,
+                'title': activity.title,
+                'description': activity.description,
+                'location': activity.location,
+                'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
+                'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
+                'max_participants': activity.max_participants,
+                'current_participants': projection.booked_count(activity.id),
+                'booking_counts': projection.booking_counts(activity.id),
+                'tags': activity.tags,
+                'status': activity.status,
+                'role': 'organizer',
+                'created_at': activity.created_at.isoformat().replace('+00:00', 'Z'),
+                'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z')
+            }
+            result_list.append(item)
+            listed_ids.add(activity.id)
+
+        for booking, activity in zip(participant_bookings, participant_activities):
+            # 避免重复添加（如果用户既是创建者也是参与者）
+            if not activity or activity.id in listed_ids:
+                continue
+
+            item = {
+                'id': activity.id,
+                'title': activity.title,
+                'description': activity.description,
+                'location': activity.location,
+                'start_time': activity.start_time.isoformat().replace('+00:00', 'Z'),
+                'end_time': activity.end_time.isoformat().replace('+00:00', 'Z'),
+                'max_participants': activity.max_participants,
+                'current_participants': projection.booked_count(activity.id),
+                'tags': activity.tags,
+                'status': activity.status,
+                'role': 'participant',
+                'booking_status': booking.status,
+                'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z'),
+                'created_at': activity.created_at.isoformat().replace('+00:00', 'Z'),
+                'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z')
+            }
+            result_list.append(item)
+            listed_ids.add(activity.id)
 
         # 按更新时间排序
         result_list.sort(key=lambda x: x['updated_at'], reverse=True)
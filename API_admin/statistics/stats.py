@@ -823,6 +823,53 @@ def get_system_usage_stats(current_user):
             'data': None
         }), 500
 
+# 进程内缓存统计接口
+@bp_admin_stats.route('/cache-stats', methods=['GET'])
+@super_admin_required
+def get_cache_stats(current_user):
+    """
+    获取当前工作进程内各类缓存的命中统计
+    统计为进程级数据，多进程部署时每个进程各自独立
+    """
+    try:
+        from components.principal_cache import principal_cache
+        from components.forum_hot_ranking import hot_ranking
+        from components.view_counter import view_counter
+        from components.search_index import search_index
+        from components.forum_category_stats import category_stats
+        from components.forum_dashboard import forum_dashboard
+        from components.booking_admission import booking_admission
+        from components.activity_availability import availability_cache
+        from components.activity_lifecycle import lifecycle_scheduler
+        from components.activity_rating_summary import rating_summary
+        from API_forum.common.utils import sensitive_filter
+
+        return jsonify({
+            'success': True,
+            'message': '缓存统计查询成功',
+            'data': {
+                'principal_cache': principal_cache.get_stats(),
+                'forum_hot_ranking': hot_ranking.get_stats(),
+                'view_counter': view_counter.get_stats(),
+                'search_index': search_index.get_stats(),
+                'forum_category_stats': category_stats.get_stats(),
+                'forum_dashboard': forum_dashboard.get_stats(),
+                'booking_admission': booking_admission.get_stats(),
+                'activity_availability': availability_cache.get_stats(),
+                'activity_lifecycle': lifecycle_scheduler.get_stats(),
+                'activity_rating_summary': rating_summary.get_stats(),
+                'sensitive_words': sensitive_filter.get_stats()
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"【缓存统计异常】错误: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'缓存统计查询失败：{str(e)}',
+            'data': None
+        }), 500
+
 # 数据导出接口
 @bp_admin_stats.route('/export', methods=['POST'])
 @super_admin_required
@@ -19,4 +19,9 @@ def register_forum_blueprints(app):
     app.register_blueprint(admin_bp)
     app.register_blueprint(bp_forum_public)
 
+    # 启动热门帖子排行的后台定时刷新（测试环境不启动）
+    if not app.testing:
+        from components.forum_hot_ranking import hot_ranking
+        hot_ranking.start_scheduler(app)
+
     print("[成功] API_forum 所有蓝图注册完成")
\ No newline at end of file
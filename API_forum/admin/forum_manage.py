@@ -4,15 +4,16 @@ from flask import request, jsonify
 from datetime import datetime, timedelta
 from components import token_required, db
 from components.models.forum_models import (
-    ForumPost, ForumFloor, ForumReply, ForumLike, ForumVisit
+    ForumPost, ForumFloor, ForumReply
 )
-from components.models.user_models import User
 from components.response_service import ResponseService
+from components.view_counter import get_view_count, VIEW_TARGET_FORUM_POST
+from components.forum_dashboard import forum_dashboard
 from . import admin_bp
 from ..common.utils import (
-    sensitive_filter, PaginationHelper, validate_content,
-    ForumStatsHelper, post_sorter
+    sensitive_filter, PaginationHelper, validate_content, post_sorter
 )
+from ..common.loaders import ForumBatchLoader
 
 
 def check_admin_permission(user):
@@ -22,15 +23,29 @@ def check_admin_permission(user):
     return user.role in ['ADMIN', 'SUPER_ADMIN']
 
 
-def post_to_dict(post, include_content=True, include_user_info=False):
-    """将帖子对象转换为字典"""
+def author_to_dict(author):
+    """将作者用户记录转换为字典"""
+    return {
+        'id': author.id,
+        'username': author.username,
+        'email': author.email,
+        'role': author.role,
+        'is_deleted': author.is_deleted
+    }
+
+
+def post_to_dict(post, include_content=True, include_user_info=False, loader=None):
+    """将帖子对象转换为字典（列表接口传入批量加载器避免逐条查询）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_posts([post], authors=include_user_info)
+
     result = {
         'id': post.id,
         'title': post.title,
         'category': post.category,
-        'view_count': post.view_count,
-        'like_count': post.calculate_like_count(),
-        'comment_count': post.calculate_comment_count(),
+        'view_count': get_view_count(VIEW_TARGET_FORUM_POST, post),
+        'like_count': loader.like_count('post', post.id),
+        'comment_count': loader.comment_count(post.id),
         'status': post.status,
         'author_display': post.author_display,
         'author_user_id': post.author_user_id,
@@ -42,28 +57,25 @@ def post_to_dict(post, include_content=True, include_user_info=False):
         result['content'] = post.content
 
     if include_user_info and post.author_user_id:
-        author = User.query.get(post.author_user_id)
+        author = loader.author(post.author_user_id)
         if author:
-            result['author_info'] = {
-                'id': author.id,
-                'username': author.username,
-                'email': author.email,
-                'role': author.role,
-                'is_deleted': author.is_deleted
-            }
+            result['author_info'] = author_to_dict(author)
 
     return result
 
 
-def floor_to_dict(floor, include_user_info=False):
-    """将楼层对象转换为字典"""
+def floor_to_dict(floor, include_user_info=False, loader=None):
+    """将楼层对象转换为字典（列表接口传入批量加载器避免逐条查询）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_floors([floor], authors=include_user_info)
+
     result = {
         'id': floor.id,
         'post_id': floor.post_id,
         'content': floor.content,
         'floor_number': floor.floor_number,
-        'like_count': floor.calculate_like_count(),
-        'reply_count': floor.calculate_reply_count(),
+        'like_count': loader.like_count('floor', floor.id),
+        'reply_count': loader.reply_count(floor.id),
         'status': floor.status,
         'author_display': floor.author_display,
         'author_user_id': floor.author_user_id,
@@ -72,26 +84,23 @@ def floor_to_dict(floor, include_user_info=False):
     }
 
     if include_user_info and floor.author_user_id:
-        author = User.query.get(floor.author_user_id)
+        author = loader.author(floor.author_user_id)
         if author:
-            result['author_info'] = {
-                'id': author.id,
-                'username': author.username,
-                'email': author.email,
-                'role': author.role,
-                'is_deleted': author.is_deleted
-            }
+            result['author_info'] = author_to_dict(author)
 
     return result
 
 
-def reply_to_dict(reply, include_user_info=False):
-    """将回复对象转换为字典"""
+def reply_to_dict(reply, include_user_info=False, loader=None):
+    """将回复对象转换为字典（列表接口传入批量加载器避免逐条查询）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_replies([reply], authors=include_user_info)
+
     result = {
         'id': reply.id,
         'floor_id': reply.floor_id,
         'content': reply.content,
-        'like_count': reply.calculate_like_count(),
+        'like_count': loader.like_count('reply', reply.id),
         'status': reply.status,
         'author_display': reply.author_display,
         'author_user_id': reply.author_user_id,
@@ -102,15 +111,9 @@ def reply_to_dict(reply, include_user_info=False):
     }
 
     if include_user_info and reply.author_user_id:
-        author = User.query.get(reply.author_user_id)
+        author = loader.author(reply.author_user_id)
         if author:
-            result['author_info'] = {
-                'id': author.id,
-                'username': author.username,
-                'email': author.email,
-                'role': author.role,
-                'is_deleted': author.is_deleted
-            }
+            result['author_info'] = author_to_dict(author)
 
     return result
 
@@ -158,30 +161,19 @@ def get_all_posts():
         if author_id:
             query = query.filter(ForumPost.author_user_id == int(author_id))
 
-        # 执行查询
-        posts = query.all()
-
-        # 排序
-        sorted_posts = post_sorter.sort_posts(posts, sort_by)
-
-        # 手动分页
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_posts = sorted_posts[start:end]
-        total = len(sorted_posts)
-
-        # 格式化响应
-        posts_data = [post_to_dict(post, include_content=False, include_user_info=True) for post in paginated_posts]
+        # 数据库端排序与分页，只读取当前页的数据
+        pagination = post_sorter.apply_sort(query, sort_by).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        total = pagination.total
 
-        response_data = {
-            'total': total,
-            'page': page,
-            'size': per_page,
-            'pages': (total + per_page - 1) // per_page,
-            'has_prev': page > 1,
-            'has_next': end < total,
-            'items': posts_data
-        }
+        # 格式化响应（批量加载当前页的作者与计数）
+        loader = ForumBatchLoader().load_posts(pagination.items, authors=True)
+        response_data = PaginationHelper.format_pagination_response(
+            pagination,
+            pagination.items,
+            lambda post: post_to_dict(post, include_content=False, include_user_info=True, loader=loader)
+        )
 
         return ResponseService.success(
             data=response_data,
@@ -338,11 +330,12 @@ def get_all_floors():
             page=page, per_page=per_page, error_out=False
         )
 
-        # 格式化响应
+        # 格式化响应（批量加载当前页的作者与计数）
+        loader = ForumBatchLoader().load_floors(pagination.items, authors=True)
         response_data = PaginationHelper.format_pagination_response(
             pagination,
             pagination.items,
-            lambda floor: floor_to_dict(floor, include_user_info=True)
+            lambda floor: floor_to_dict(floor, include_user_info=True, loader=loader)
         )
 
         return ResponseService.success(
@@ -410,11 +403,12 @@ def get_all_replies():
             page=page, per_page=per_page, error_out=False
         )
 
-        # 格式化响应
+        # 格式化响应（批量加载当前页的作者与计数）
+        loader = ForumBatchLoader().load_replies(pagination.items, authors=True)
         response_data = PaginationHelper.format_pagination_response(
             pagination,
             pagination.items,
-            lambda reply: reply_to_dict(reply, include_user_info=True)
+            lambda reply: reply_to_dict(reply, include_user_info=True, loader=loader)
         )
 
         return ResponseService.success(
@@ -456,49 +450,8 @@ def get_forum_stats():
     try:
         days = int(request.args.get('days', 7))
 
-        # 获取基础统计
-        stats = ForumStatsHelper.get_post_stats(days)
-
-        # 添加更详细的统计信息
-        total_users = User.query.filter_by(is_deleted=0).count()
-        active_users = User.query.filter(
-            User.is_deleted == 0,
-            User.last_login >= datetime.now() - timedelta(days=days)
-        ).count()
-
-        # 内容统计
-        total_floors = ForumFloor.query.count()
-        total_replies = ForumReply.query.count()
-        total_likes = ForumLike.query.count()
-        total_visits = ForumVisit.query.count()
-
-        # 时间范围内的统计
-        time_threshold = datetime.now() - timedelta(days=days)
-        recent_posts = ForumPost.query.filter(ForumPost.created_at >= time_threshold).count()
-        recent_floors = ForumFloor.query.filter(ForumFloor.created_at >= time_threshold).count()
-        recent_replies = ForumReply.query.filter(ForumReply.created_at >= time_threshold).count()
-
-        stats_data = {
-            'basic_stats': stats,
-            'user_stats': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'new_users': User.query.filter(User.created_at >= time_threshold).count()
-            },
-            'content_stats': {
-                'total_posts': stats['total'],
-                'total_floors': total_floors,
-                'total_replies': total_replies,
-                'total_likes': total_likes,
-                'total_visits': total_visits
-            },
-            'recent_activity': {
-                'posts': recent_posts,
-                'floors': recent_floors,
-                'replies': recent_replies,
-                'likes': ForumLike.query.filter(ForumLike.created_at >= time_threshold).count()
-            }
-        }
+        # 统计快照：每张表一条多聚合查询，按 days 短时缓存，并发请求共享同一次计算
+        stats_data = forum_dashboard.get(days)
 
         return ResponseService.success(
             data=stats_data,
@@ -514,27 +467,18 @@ def get_forum_stats():
 def get_categories_stats():
     """获取分类统计信息"""
     try:
-        # 获取所有分类及其统计
-        categories_stats = db.session.query(
-            ForumPost.category,
-            db.func.count(ForumPost.id).label('posts_count'),
-            db.func.sum(ForumPost.view_count).label('total_views'),
-            db.func.sum(ForumPost.like_count).label('total_likes')
-        ).filter(
-            ForumPost.category.isnot(None),
-            ForumPost.category != ''
-        ).group_by(ForumPost.category).all()
+        from components.forum_category_stats import category_stats
 
+        # 读取分类统计汇总表（合并所有状态）
         categories_data = []
-        for stat in categories_stats:
-            category_data = {
-                'name': stat.category,
-                'posts_count': stat.posts_count,
-                'total_views': stat.total_views or 0,
-                'total_likes': stat.total_likes or 0,
-                'avg_views_per_post': (stat.total_views or 0) / stat.posts_count if stat.posts_count > 0 else 0
-            }
-            categories_data.append(category_data)
+        for stat in category_stats.get_category_rows():
+            categories_data.append({
+                'name': stat['name'],
+                'posts_count': stat['post_count'],
+                'total_views': stat['total_views'],
+                'total_likes': stat['total_likes'],
+                'avg_views_per_post': stat['total_views'] / stat['post_count'] if stat['post_count'] > 0 else 0
+            })
 
         return ResponseService.success(
             data=categories_data,
@@ -578,19 +522,8 @@ def add_sensitive_words():
         if not isinstance(words, list) or not words:
             return ResponseService.error('敏感词列表不能为空', status_code=400)
 
-        # 添加新敏感词
-        added_words = []
-        for word in words:
-            word = word.strip()
-            if word and word not in sensitive_filter.sensitive_words:
-                sensitive_filter.sensitive_words.append(word)
-                added_words.append(word)
-
-        # 重新编译正则表达式
-        sensitive_filter.pattern = __import__('re').compile(
-            '|'.join(map(__import__('re').escape, sensitive_filter.sensitive_words)),
-            __import__('re').IGNORECASE
-        )
+        # 写入敏感词表并立即重建过滤器的自动机
+        added_words = sensitive_filter.add_words(words)
 
         print(f"【管理员添加敏感词】添加数量: {len(added_words)}")
 
@@ -0,0 +1,317 @@
+# API_forum 批量加载模块
+
+from typing import Dict, Iterable, List, Optional
+from components import db
+from components.models.forum_models import ForumPost, ForumFloor, ForumReply, ForumLike
+from components.models.user_models import User
+
+
+class ForumBatchLoader:
+    """
+    论坛列表批量加载器
+
+    列表接口逐条调用 calculate_like_count / calculate_comment_count 并逐条查询作者，
+    一页数据需要 3N 条查询。加载器先收集当前页的ID，每类数据只执行一条 IN + GROUP BY 查询，
+    序列化时从内存字典中读取，列表接口的查询数与每页条数无关。
+
+    用法:
+        loader = ForumBatchLoader().load_posts(posts, authors=True)
+        loader.like_count('post', post.id)
+        loader.comment_count(post.id)
+        loader.author(post.author_user_id)
+
+        loader = ForumBatchLoader().load_floors(floors).load_recent_replies(floors, limit=3)
+        loader.recent_replies(floor.id)
+    """
+
+    # 点赞表中各目标类型对应的关联字段（与模型的 calculate_like_count 保持一致）
+    LIKE_TARGET_COLUMNS = {
+        'post': ForumLike.post_id,
+        'floor': ForumLike.floor_id,
+        'reply': ForumLike.reply_id
+    }
+
+    def __init__(self):
+        self._authors: Dict[int, Optional[User]] = {}
+        self._like_counts: Dict[str, Dict[int, int]] = {target: {} for target in self.LIKE_TARGET_COLUMNS}
+        self._comment_counts: Dict[int, int] = {}
+        self._reply_counts: Dict[int, int] = {}
+        self._recent_replies: Dict[int, List[ForumReply]] = {}
+
+    @staticmethod
+    def _collect_ids(values: Iterable[Optional[int]], loaded: Dict[int, object]) -> List[int]:
+        """收集尚未加载的非空ID（去重）"""
+        return list({value for value in values if value is not None and value not in loaded})
+
+    def load_posts(self, posts, authors: bool = False) -> 'ForumBatchLoader':
+        """
+        加载帖子的点赞数、评论数（已发布楼层数），可选加载作者
+
+        Args:
+            posts: 帖子列表
+            authors: 是否加载作者用户记录
+        """
+        self._load_like_counts('post', [post.id for post in posts])
+        self._load_comment_counts([post.id for post in posts])
+        if authors:
+            self._load_authors([post.author_user_id for post in posts])
+        return self
+
+    def load_floors(self, floors, authors: bool = False, reply_counts: Optional[Dict[int, int]] = None) -> 'ForumBatchLoader':
+        """
+        加载楼层的点赞数、回复数（已发布回复数），可选加载作者
+
+        Args:
+            floors: 楼层列表
+            authors: 是否加载作者用户记录
+            reply_counts: 已查询到的回复数（如 ForumFloor.get_floors_by_post 的结果），传入时不再重复统计
+        """
+        if reply_counts:
+            self._reply_counts.update(reply_counts)
+        self._load_like_counts('floor', [floor.id for floor in floors])
+        self._load_reply_counts([floor.id for floor in floors])
+        if authors:
+            self._load_authors([floor.author_user_id for floor in floors])
+        return self
+
+    def load_replies(self, replies, authors: bool = False) -> 'ForumBatchLoader':
+        """
+        加载回复的点赞数，可选加载作者
+
+        Args:
+            replies: 回复列表
+            authors: 是否加载作者用户记录
+        """
+        self._load_like_counts('reply', [reply.id for reply in replies])
+        if authors:
+            self._load_authors([reply.author_user_id for reply in replies])
+        return self
+
+    def load_recent_replies(self, floors, limit: int = 3,
+                            recent_replies: Optional[Dict[int, List[ForumReply]]] = None) -> 'ForumBatchLoader':
+        """
+        加载每个楼层最近的 limit 条已发布回复及这些回复的点赞数
+
+        楼层最近回复通过 ForumReply.get_recent_replies_by_floors 一条窗口函数查询获取，
+        回复点赞数再用一条分组查询获取。
+
+        Args:
+            floors: 楼层列表
+            limit: 每个楼层的回复条数
+            recent_replies: 已查询到的最近回复，传入时不再重复查询
+        """
+        if recent_replies is None:
+            ids = self._collect_ids([floor.id for floor in floors], self._recent_replies)
+            recent_replies = ForumReply.get_recent_replies_by_floors(ids, limit=limit) if ids else {}
+        self._recent_replies.update(recent_replies)
+        self.load_replies([reply for replies in recent_replies.values() for reply in replies])
+        return self
+
+    def _load_like_counts(self, target_type: str, target_ids: List[int]):
+        loaded = self._like_counts[target_type]
+        ids = self._collect_ids(target_ids, loaded)
+        if not ids:
+            return
+
+        column = self.LIKE_TARGET_COLUMNS[target_type]
+        rows = db.session.query(column, db.func.count(ForumLike.id)).filter(
+            ForumLike.target_type == target_type,
+            column.in_(ids)
+        ).group_by(column).all()
+
+        loaded.update({target_id: 0 for target_id in ids})
+        loaded.update({target_id: count for target_id, count in rows})
+
+    def _load_comment_counts(self, post_ids: List[int]):
+        ids = self._collect_ids(post_ids, self._comment_counts)
+        if not ids:
+            return
+
+        rows = db.session.query(ForumFloor.post_id, db.func.count(ForumFloor.id)).filter(
+            ForumFloor.post_id.in_(ids),
+            ForumFloor.status == 'published'
+        ).group_by(ForumFloor.post_id).all()
+
+        self._comment_counts.update({post_id: 0 for post_id in ids})
+        self._comment_counts.update({post_id: count for post_id, count in rows})
+
+    def _load_reply_counts(self, floor_ids: List[int]):
+        ids = self._collect_ids(floor_ids, self._reply_counts)
+        if not ids:
+            return
+
+        self._reply_counts.update(ForumReply.count_by_floors(ids))
+
+    def _load_authors(self, user_ids: List[Optional[int]]):
+        ids = self._collect_ids(user_ids, self._authors)
+        if not ids:
+            return
+
+        self._authors.update({user_id: None for user_id in ids})
+        for user in User.query.filter(User.id.in_(ids)).all():
+            self._authors[user.id] = user
+
+    def like_count(self, target_type: str, target_id: int) -> int:
+        """获取目标的点赞数"""
+        return self._like_counts[target_type].get(target_id, 0)
+
+    def comment_count(self, post_id: int) -> int:
+        """获取帖子的评论数"""
+        return self._comment_counts.get(post_id, 0)
+
+    def reply_count(self, floor_id: int) -> int:
+        """获取楼层的回复数"""
+        return self._reply_counts.get(floor_id, 0)
+
+    def recent_replies(self, floor_id: int) -> List[ForumReply]:
+        """获取楼层最近的回复（按创建时间倒序）"""
+        return self._recent_replies.get(floor_id, [])
+
+    def author(self, user_id: Optional[int], include_deleted: bool = True) -> Optional[User]:
+        """
+        获取作者用户记录
+
+        Args:
+            user_id: 作者用户ID
+            include_deleted: 是否返回已注销的用户
+        """
+        if user_id is None:
+            return None
+        user = self._authors.get(user_id)
+        if user is not None and not include_deleted and user.is_deleted != 0:
+            return None
+        return user
+
+
+class ForumTargetPrefetcher:
+    """
+    论坛多态目标预加载器
+
+    "我的点赞 / 楼层 / 回复 / 浏览记录" 列表逐条 query.get 点赞目标及其所属帖子，一页需要 1~3N 条查询。
+    预加载器按目标类型分组收集当前页的ID，每种类型执行一条 IN 查询，并通过 LEFT JOIN 同时取出
+    上级楼层号与所属帖子标题，序列化时从内存字典中读取。
+
+    用法:
+        targets = ForumTargetPrefetcher().load_likes(likes)
+        targets.target('floor', like.floor_id)
+        targets.post_title(floor.post_id)
+
+        targets = ForumTargetPrefetcher().load_floor_parents([reply.floor_id for reply in replies])
+        targets.floor_parent(reply.floor_id)
+    """
+
+    # 点赞表中各目标类型对应的关联字段
+    LIKE_TARGET_ATTRIBUTES = {'post': 'post_id', 'floor': 'floor_id', 'reply': 'reply_id'}
+
+    def __init__(self):
+        self._targets: Dict[str, Dict[int, object]] = {'post': {}, 'floor': {}, 'reply': {}}
+        # 帖子ID -> 标题（帖子不存在时为 None）
+        self._post_titles: Dict[int, Optional[str]] = {}
+        # 楼层ID -> (楼层号, 帖子ID)（楼层不存在时为 None）
+        self._floor_parents: Dict[int, Optional[tuple]] = {}
+
+    def load_likes(self, likes) -> 'ForumTargetPrefetcher':
+        """按目标类型分组加载点赞目标（帖子、楼层、回复）及其所属帖子标题"""
+        grouped: Dict[str, List[int]] = {target: [] for target in self.LIKE_TARGET_ATTRIBUTES}
+        for like in likes:
+            attribute = self.LIKE_TARGET_ATTRIBUTES.get(like.target_type)
+            if attribute:
+                grouped[like.target_type].append(getattr(like, attribute))
+        self.load_posts(grouped['post'])
+        self.load_floors(grouped['floor'])
+        self.load_replies(grouped['reply'])
+        return self
+
+    def load_posts(self, post_ids: Iterable[Optional[int]]) -> 'ForumTargetPrefetcher':
+        """加载帖子（一条 IN 查询）"""
+        loaded = self._targets['post']
+        ids = ForumBatchLoader._collect_ids(post_ids, loaded)
+        if not ids:
+            return self
+
+        loaded.update({post_id: None for post_id in ids})
+        for post in ForumPost.query.filter(ForumPost.id.in_(ids)).all():
+            loaded[post.id] = post
+            self._post_titles[post.id] = post.title
+        return self
+
+    def load_floors(self, floor_ids: Iterable[Optional[int]]) -> 'ForumTargetPrefetcher':
+        """加载楼层及所属帖子标题（一条 IN + LEFT JOIN 查询）"""
+        loaded = self._targets['floor']
+        ids = ForumBatchLoader._collect_ids(floor_ids, loaded)
+        if not ids:
+            return self
+
+        loaded.update({floor_id: None for floor_id in ids})
+        rows = db.session.query(ForumFloor, ForumPost.title).outerjoin(
+            ForumPost, ForumPost.id == ForumFloor.post_id
+        ).filter(ForumFloor.id.in_(ids)).all()
+        for floor, post_title in rows:
+            loaded[floor.id] = floor
+            self._floor_parents[floor.id] = (floor.floor_number, floor.post_id)
+            self._remember_post_title(floor.post_id, post_title)
+        return self
+
+    def load_replies(self, reply_ids: Iterable[Optional[int]]) -> 'ForumTargetPrefetcher':
+        """加载回复及所属楼层号、帖子标题（一条 IN + LEFT JOIN 查询）"""
+        loaded = self._targets['reply']
+        ids = ForumBatchLoader._collect_ids(reply_ids, loaded)
+        if not ids:
+            return self
+
+        loaded.update({reply_id: None for reply_id in ids})
+        rows = db.session.query(
+            ForumReply, ForumFloor.floor_number, ForumFloor.post_id, ForumPost.title
+        ).outerjoin(
+            ForumFloor, ForumFloor.id == ForumReply.floor_id
+        ).outerjoin(
+            ForumPost, ForumPost.id == ForumFloor.post_id
+        ).filter(ForumReply.id.in_(ids)).all()
+        for reply, floor_number, post_id, post_title in rows:
+            loaded[reply.id] = reply
+            self._remember_floor_parent(reply.floor_id, floor_number, post_id, post_title)
+        return self
+
+    def load_floor_parents(self, floor_ids: Iterable[Optional[int]]) -> 'ForumTargetPrefetcher':
+        """只加载楼层号与所属帖子标题（不加载楼层内容，一条 IN + LEFT JOIN 查询）"""
+        ids = ForumBatchLoader._collect_ids(floor_ids, self._floor_parents)
+        if not ids:
+            return self
+
+        self._floor_parents.update({floor_id: None for floor_id in ids})
+        rows = db.session.query(
+            ForumFloor.id, ForumFloor.floor_number, ForumFloor.post_id, ForumPost.title
+        ).outerjoin(
+            ForumPost, ForumPost.id == ForumFloor.post_id
+        ).filter(ForumFloor.id.in_(ids)).all()
+        for floor_id, floor_number, post_id, post_title in rows:
+            self._remember_floor_parent(floor_id, floor_number, post_id, post_title)
+        return self
+
+    def _remember_floor_parent(self, floor_id, floor_number, post_id, post_title):
+        if floor_number is None:
+            # LEFT JOIN 未命中：楼层已不存在
+            self._floor_parents.setdefault(floor_id, None)
+            return
+        self._floor_parents[floor_id] = (floor_number, post_id)
+        self._remember_post_title(post_id, post_title)
+
+    def _remember_post_title(self, post_id, post_title):
+        if post_id is not None and self._post_titles.get(post_id) is None:
+            self._post_titles[post_id] = post_title
+
+    def target(self, target_type: str, target_id: Optional[int]):
+        """获取已加载的帖子、楼层或回复（不存在时返回 None）"""
+        return self._targets.get(target_type, {}).get(target_id)
+
+    def post(self, post_id: Optional[int]) -> Optional[ForumPost]:
+        """获取已加载的帖子"""
+        return self._targets['post'].get(post_id)
+
+    def post_title(self, post_id: Optional[int]) -> Optional[str]:
+        """获取帖子标题（帖子不存在时返回 None）"""
+        return self._post_titles.get(post_id)
+
+    def floor_parent(self, floor_id: Optional[int]) -> Optional[tuple]:
+        """获取楼层的 (楼层号, 帖子ID)（楼层不存在时返回 None）"""
+        return self._floor_parents.get(floor_id)
@@ -1,28 +1,44 @@
 # API_forum 公共工具模块
 
-import re
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from flask import request
 from components.models.forum_models import ForumPost, ForumFloor, ForumReply
 from components import db
+from components.sensitive_words import SensitiveWordDictionary
+from config import Config
 
 
 class SensitiveWordFilter:
-    """敏感词过滤工具类"""
+    """
+    敏感词过滤工具类
+
+    基于 components.sensitive_words 的 Aho–Corasick 自动机，匹配耗时与词库规模无关；
+    词库从配置文件与 sensitive_words 表加载，来源变化后自动热替换。
+    """
 
-    def __init__(self, sensitive_words: List[str] = None):
+    def __init__(self, sensitive_words: List[str] = None, words_file: Optional[str] = None,
+                 use_database: bool = True, reload_interval: int = 60):
         """
         初始化敏感词过滤器
 
         Args:
-            sensitive_words: 敏感词列表，如果为空则使用默认敏感词库
+            sensitive_words: 敏感词列表；显式传入时只使用该列表，不读取文件与数据库
+            words_file: 敏感词文件路径
+            use_database: 是否从 sensitive_words 表加载
+            reload_interval: 检查词库来源变化的间隔（秒）
         """
-        self.sensitive_words = sensitive_words or [
-            '违禁词1', '违禁词2', '违禁词3',  # 实际项目中应从配置或数据库加载
-            '垃圾信息', '广告', '违法', '暴力', '色情'
-        ]
-        self.pattern = re.compile('|'.join(map(re.escape, self.sensitive_words)), re.IGNORECASE)
+        if sensitive_words:
+            self.dictionary = SensitiveWordDictionary(sensitive_words, use_database=False, reload_interval=-1)
+        else:
+            self.dictionary = SensitiveWordDictionary(
+                words_file=words_file, use_database=use_database, reload_interval=reload_interval
+            )
+
+    @property
+    def sensitive_words(self) -> List[str]:
+        """当前生效的敏感词列表"""
+        return list(self.dictionary.snapshot.words)
 
     def filter_content(self, content: str) -> str:
         """
@@ -38,8 +54,7 @@ class SensitiveWordFilter:
             return content
 
         # 将敏感词替换为 ***
-        filtered_content = self.pattern.sub('***', content)
-        return filtered_content
+        return self.dictionary.snapshot.matcher.replace(content, '***')
 
     def contains_sensitive_word(self, content: str) -> bool:
         """
@@ -54,7 +69,7 @@ class SensitiveWordFilter:
         if not content:
             return False
 
-        return bool(self.pattern.search(content))
+        return self.dictionary.snapshot.matcher.contains(content)
 
     def get_sensitive_words(self, content: str) -> List[str]:
         """
@@ -69,16 +84,76 @@ class SensitiveWordFilter:
         if not content:
             return []
 
-        return list(set(match.group() for match in self.pattern.finditer(content)))
+        return list(set(self.dictionary.snapshot.matcher.find_all(content)))
+
+    def add_words(self, words: List[str]) -> List[str]:
+        """
+        添加敏感词：写入 sensitive_words 表后立即重建本进程的自动机
+        （其他进程在下一次检查间隔到达时加载）
+
+        Returns:
+            实际新增的敏感词
+        """
+        from components.models import SensitiveWord
+
+        existing = set(self.sensitive_words)
+        added_words = []
+        for word in words:
+            word = (word or '').strip()
+            if word and word not in existing and word not in added_words:
+                added_words.append(word)
+
+        if not self.dictionary.use_database:
+            self.dictionary.replace_words(self.sensitive_words + added_words)
+            return added_words
+
+        if added_words:
+            stored = {row.word for row in SensitiveWord.query.filter(SensitiveWord.word.in_(added_words))}
+            for word in added_words:
+                if word in stored:
+                    SensitiveWord.query.filter_by(word=word).update({'is_active': True, 'updated_at': datetime.now()})
+                else:
+                    db.session.add(SensitiveWord(word=word))
+            db.session.commit()
+        self.dictionary.reload(force=True)
+        return added_words
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取词库状态"""
+        return self.dictionary.get_stats()
 
 
 class PostSorter:
     """帖子排序工具类"""
 
+    # 排序方式对应的排序键（均为 forum_posts 上带 (status, 排序键) 复合索引的存储列）
+    SORT_COLUMNS = {
+        'latest': ForumPost.created_at,
+        'hottest': ForumPost.hot_score,
+        'most_viewed': ForumPost.view_count,
+        'most_liked': ForumPost.like_count
+    }
+
+    @staticmethod
+    def apply_sort(query, sort_by: str = 'latest'):
+        """
+        将排序方式转换为数据库端 ORDER BY，配合分页只读取当前页的数据
+
+        Args:
+            query: 帖子查询对象
+            sort_by: 排序方式 ('latest', 'hottest', 'most_viewed', 'most_liked')，未知方式按最新排序
+
+        Returns:
+            追加排序条件后的查询对象
+        """
+        sort_column = PostSorter.SORT_COLUMNS.get(sort_by, ForumPost.created_at)
+        # 以主键作为次级排序键，保证分页结果稳定
+        return query.order_by(sort_column.desc(), ForumPost.id.desc())
+
     @staticmethod
     def sort_posts(posts: List[ForumPost], sort_by: str = 'latest') -> List[ForumPost]:
         """
-        根据指定方式排序帖子
+        根据指定方式排序内存中的帖子列表（与 apply_sort 使用相同的存储字段）
 
         Args:
             posts: 帖子列表
@@ -87,49 +162,59 @@ class PostSorter:
         Returns:
             排序后的帖子列表
         """
-        if sort_by == 'latest':
-            # 按创建时间倒序
-            return sorted(posts, key=lambda x: x.created_at, reverse=True)
-        elif sort_by == 'hottest':
-            # 按热度计算（点赞数 + 评论数 + 浏览数/10）
-            return sorted(posts, key=lambda x: x.calculate_like_count() + x.calculate_comment_count() + x.view_count/10, reverse=True)
+        if sort_by == 'hottest':
+            # 按热度分倒序（点赞数 + 评论数 + 浏览数/10）
+            return sorted(posts, key=lambda x: x.hot_score or 0, reverse=True)
         elif sort_by == 'most_viewed':
             # 按浏览量倒序
-            return sorted(posts, key=lambda x: x.view_count, reverse=True)
+            return sorted(posts, key=lambda x: x.view_count or 0, reverse=True)
         elif sort_by == 'most_liked':
             # 按点赞数倒序
-            return sorted(posts, key=lambda x: x.calculate_like_count(), reverse=True)
+            return sorted(posts, key=lambda x: x.like_count or 0, reverse=True)
         else:
             # 默认按创建时间倒序
             return sorted(posts, key=lambda x: x.created_at, reverse=True)
 
     @staticmethod
-    def get_hot_posts(hours: int = 24, limit: int = 10) -> List[ForumPost]:
+    def get_hot_posts(hours: int = 24, limit: int = 10, category: Optional[str] = None) -> List[ForumPost]:
         """
-        获取热门帖子
+        获取热门帖子（读取物化的时间衰减排行，见 components.forum_hot_ranking）
+
+        排行只包含统计窗口（FORUM_HOT_WINDOW_HOURS）内发布的帖子，hours 超出窗口时改为数据库按热度分排序，
+        不截断到窗口内
 
         Args:
             hours: 多少小时内的热门帖子
             limit: 返回数量限制
+            category: 分类，为空时返回全站热门
 
         Returns:
             热门帖子列表
         """
         from datetime import timedelta
+        from components.forum_hot_ranking import hot_ranking
+
+        if hours and hours > hot_ranking.window_hours:
+            query = ForumPost.query.filter(
+                ForumPost.created_at >= datetime.now() - timedelta(hours=hours),
+                ForumPost.status == 'published'
+            )
+            if category:
+                query = query.filter(ForumPost.category == category)
+            return PostSorter.apply_sort(query, 'hottest').limit(limit).all()
+
+        post_ids = [post_id for post_id, _ in hot_ranking.get_hot_post_ids(limit, category, hours)]
+        if not post_ids:
+            return []
 
-        # 计算时间范围
-        time_threshold = datetime.now() - timedelta(hours=hours)
-
-        # 查询指定时间内的帖子
-        recent_posts = ForumPost.query.filter(
-            ForumPost.created_at >= time_threshold,
-            ForumPost.status == 'published'
-        ).all()
-
-        # 按热度排序
-        hot_posts = PostSorter.sort_posts(recent_posts, 'hottest')
-
-        return hot_posts[:limit]
+        # 按排行顺序取回帖子（排行刷新前已删除或下线的帖子在此过滤）
+        posts_by_id = {
+            post.id: post for post in ForumPost.query.filter(
+                ForumPost.id.in_(post_ids),
+                ForumPost.status == 'published'
+            ).all()
+        }
+        return [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
 
 
 class PaginationHelper:
@@ -294,22 +379,10 @@ class ForumStatsHelper:
         Returns:
             统计信息字典
         """
-        from datetime import timedelta
-
-        time_threshold = datetime.now() - timedelta(days=days)
-
-        total_posts = ForumPost.query.count()
-        recent_posts = ForumPost.query.filter(
-            ForumPost.created_at >= time_threshold
-        ).count()
-        published_posts = ForumPost.query.filter_by(status='published').count()
+        from components.forum_dashboard import forum_dashboard
 
-        return {
-            'total': total_posts,
-            'recent': recent_posts,
-            'published': published_posts,
-            'draft': total_posts - published_posts
-        }
+        # 读取论坛统计快照（一条多聚合查询计算，按 days 短时缓存）
+        return dict(forum_dashboard.get(days)['basic_stats'])
 
     @staticmethod
     def get_user_participation_stats(user_id: int, days: int = 30) -> Dict[str, int]:
@@ -351,7 +424,11 @@ class ForumStatsHelper:
 
 
 # 全局实例
-sensitive_filter = SensitiveWordFilter()
+sensitive_filter = SensitiveWordFilter(
+    words_file=Config.SENSITIVE_WORDS_FILE,
+    use_database=Config.SENSITIVE_WORDS_USE_DATABASE,
+    reload_interval=Config.SENSITIVE_WORDS_RELOAD_INTERVAL
+)
 post_sorter = PostSorter()
 
 
@@ -380,12 +457,13 @@ def validate_content(content: str, min_length: int = 1, max_length: int = 10000)
     return {'valid': True, 'message': '内容验证通过'}
 
 
-def create_nested_reply_structure(replies: List[ForumReply]) -> List[Dict[str, Any]]:
+def create_nested_reply_structure(replies: List[ForumReply], loader=None) -> List[Dict[str, Any]]:
     """
     创建嵌套回复结构
 
     Args:
         replies: 回复列表
+        loader: 已加载回复点赞数的 ForumBatchLoader，为空时逐条统计
 
     Returns:
         嵌套结构的回复列表
@@ -399,7 +477,7 @@ def create_nested_reply_structure(replies: List[ForumReply]) -> List[Dict[str, A
             'id': reply.id,
             'content': reply.content,
             'author_display': reply.author_display,
-            'like_count': reply.calculate_like_count(),
+            'like_count': loader.like_count('reply', reply.id) if loader else reply.calculate_like_count(),
             'quote_content': reply.quote_content,
             'quote_author': reply.quote_author,
             'created_at': reply.created_at.isoformat() if reply.created_at else None,
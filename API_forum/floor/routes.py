@@ -10,17 +10,23 @@ from ..common.utils import (
     sensitive_filter, PaginationHelper, PermissionHelper,
     validate_content, create_nested_reply_structure
 )
+from ..common.loaders import ForumBatchLoader
 
 
-def floor_to_dict(floor, include_replies=False, replies_limit=3):
-    """将楼层对象转换为字典"""
+def floor_to_dict(floor, include_replies=False, replies_limit=3, loader=None):
+    """将楼层对象转换为字典（列表接口传入批量加载器避免逐条查询计数与回复）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_floors([floor])
+        if include_replies:
+            loader.load_recent_replies([floor], limit=replies_limit)
+
     result = {
         'id': floor.id,
         'post_id': floor.post_id,
         'content': floor.content,
         'floor_number': floor.floor_number,
-        'like_count': floor.calculate_like_count(),
-        'reply_count': floor.calculate_reply_count(),
+        'like_count': loader.like_count('floor', floor.id),
+        'reply_count': loader.reply_count(floor.id),
         'status': floor.status,
         'author_display': floor.author_display,
         'created_at': floor.created_at.isoformat() if floor.created_at else None,
@@ -28,14 +34,8 @@ def floor_to_dict(floor, include_replies=False, replies_limit=3):
     }
 
     if include_replies:
-        # 获取最近的回复
-        recent_replies = ForumReply.query.filter_by(
-            floor_id=floor.id,
-            status='published'
-        ).order_by(ForumReply.created_at.desc()).limit(replies_limit).all()
-
-        result['recent_replies'] = create_nested_reply_structure(recent_replies)
-        result['total_replies'] = floor.calculate_reply_count()
+        result['recent_replies'] = create_nested_reply_structure(loader.recent_replies(floor.id), loader=loader)
+        result['total_replies'] = loader.reply_count(floor.id)
 
     return result
 
@@ -58,20 +58,23 @@ def get_floors_by_post(post_id):
         include_replies = request.args.get('include_replies', 'false').lower() == 'true'
         replies_limit = min(int(request.args.get('replies_limit', 3)), 10)
 
-        # 使用模型的内置方法获取楼层
-        floors_data = ForumFloor.get_floors_by_post(post_id, page, per_page)
-
-        # 转换楼层数据
-        floors_list = []
-        for floor_data in floors_data['floors']:
-            floor = floor_data['floor']
-            floor_dict = floor_to_dict(floor, include_replies, replies_limit)
+        # 使用模型的内置方法获取楼层（最近回复与回复总数批量查询）
+        floors_data = ForumFloor.get_floors_by_post(
+            post_id, page, per_page, replies_limit=replies_limit if include_replies else 0
+        )
 
-            if include_replies:
-                floor_dict['recent_replies'] = create_nested_reply_structure(floor_data['recent_replies'])
-                floor_dict['total_replies'] = floor_data['total_replies']
+        # 批量加载楼层与回复的点赞数，复用已查询到的回复总数和最近回复
+        floors = [floor_data['floor'] for floor_data in floors_data['floors']]
+        loader = ForumBatchLoader().load_floors(floors, reply_counts={
+            floor_data['floor'].id: floor_data['total_replies'] for floor_data in floors_data['floors']
+        })
+        if include_replies:
+            loader.load_recent_replies(floors, recent_replies={
+                floor_data['floor'].id: floor_data['recent_replies'] for floor_data in floors_data['floors']
+            })
 
-            floors_list.append(floor_dict)
+        # 转换楼层数据
+        floors_list = [floor_to_dict(floor, include_replies, replies_limit, loader=loader) for floor in floors]
 
         # 格式化分页信息
         pagination = floors_data['pagination']
@@ -116,7 +119,8 @@ def get_floor_detail(floor_id):
             per_page = min(int(request.args.get('size', 20)), 100)
 
             replies_pagination = ForumReply.get_replies_by_floor(floor_id, page, per_page)
-            replies_data = create_nested_reply_structure(replies_pagination.items)
+            replies_loader = ForumBatchLoader().load_replies(replies_pagination.items)
+            replies_data = create_nested_reply_structure(replies_pagination.items, loader=replies_loader)
 
             result['replies'] = {
                 'total': replies_pagination.total,
@@ -346,10 +350,11 @@ def get_floors_by_user(user_id):
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
         # 格式化响应
+        loader = ForumBatchLoader().load_floors(pagination.items)
         response_data = PaginationHelper.format_pagination_response(
             pagination,
             pagination.items,
-            lambda floor: floor_to_dict(floor, include_replies=False)
+            lambda floor: floor_to_dict(floor, include_replies=False, loader=loader)
         )
 
         return ResponseService.success(
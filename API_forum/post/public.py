@@ -6,6 +6,9 @@ from components.models import ForumPost, ForumFloor, ForumReply
 from components.response_service import ResponseService
 from components.models import User
 from datetime import datetime
+from components.view_counter import get_view_count, VIEW_TARGET_FORUM_POST
+from components.search_index import search_index, SEARCH_DOC_FORUM_POST
+from ..common.loaders import ForumBatchLoader
 
 # 创建论坛公开访问模块蓝图
 bp_forum_public = Blueprint('forum_public', __name__, url_prefix='/api/public/forum')
@@ -30,24 +33,24 @@ def get_public_forum_posts():
         if category:
             query = query.filter(ForumPost.category == category)
 
-        # 关键词搜索
+        # 关键词搜索（倒排索引）
         if keyword:
-            query = query.filter(
-                (ForumPost.title.like(f'%{keyword}%')) |
-                (ForumPost.content.like(f'%{keyword}%'))
-            )
+            query = search_index.apply(query, SEARCH_DOC_FORUM_POST, keyword)
 
         # 分页查询
         pagination = query.order_by(ForumPost.created_at.desc()).paginate(page=page, per_page=size)
         posts = pagination.items
         total = pagination.total
 
+        # 批量加载当前页的作者、点赞数和评论数
+        loader = ForumBatchLoader().load_posts(posts, authors=True)
+
         result_list = []
         for post in posts:
             # 获取作者基础信息
             author_info = {}
             if post.author_user_id:
-                author = User.query.filter_by(id=post.author_user_id, is_deleted=0).first()
+                author = loader.author(post.author_user_id, include_deleted=False)
                 if author:
                     author_info = {
                         'username': author.username,
@@ -60,9 +63,9 @@ def get_public_forum_posts():
                 'title': post.title,
                 'category': post.category,
                 'summary': post.content[:200] + '...' if len(post.content) > 200 else post.content,
-                'view_count': post.view_count or 0,
-                'like_count': post.calculate_like_count(),
-                'comment_count': post.calculate_comment_count(),
+                'view_count': get_view_count(VIEW_TARGET_FORUM_POST, post),
+                'like_count': loader.like_count('post', post.id),
+                'comment_count': loader.comment_count(post.id),
                 'author_display': post.author_display,
                 'author_info': author_info,
                 'created_at': post.created_at.isoformat().replace('+00:00', 'Z'),
@@ -92,9 +95,8 @@ def get_public_forum_post_detail(post_id):
         if not post:
             return ResponseService.error('帖子不存在或未发布', status_code=404)
 
-        # 增加浏览次数
-        post.view_count = (post.view_count or 0) + 1
-        db.session.commit()
+        # 增加浏览次数（写入缓冲，批量落库）
+        view_count = post.increment_view_count()
 
         # 获取作者信息
         author_info = {}
@@ -114,7 +116,7 @@ def get_public_forum_post_detail(post_id):
             'title': post.title,
             'content': post.content,
             'category': post.category,
-            'view_count': post.view_count or 0,
+            'view_count': view_count,
             'like_count': post.calculate_like_count(),
             'comment_count': post.calculate_comment_count(),
             'author_display': post.author_display,
@@ -154,12 +156,15 @@ def get_public_forum_floors(post_id):
         floors = pagination.items
         total = pagination.total
 
+        # 批量加载当前页的作者、点赞数和回复数
+        loader = ForumBatchLoader().load_floors(floors, authors=True)
+
         floors_data = []
         for floor in floors:
             # 获取楼层作者信息
             author_info = {}
             if floor.author_user_id:
-                author = User.query.filter_by(id=floor.author_user_id, is_deleted=0).first()
+                author = loader.author(floor.author_user_id, include_deleted=False)
                 if author:
                     author_info = {
                         'username': author.username,
@@ -171,8 +176,8 @@ def get_public_forum_floors(post_id):
                 'id': floor.id,
                 'floor_number': floor.floor_number,
                 'content': floor.content,
-                'like_count': floor.calculate_like_count(),
-                'reply_count': floor.calculate_reply_count(),
+                'like_count': loader.like_count('floor', floor.id),
+                'reply_count': loader.reply_count(floor.id),
                 'author_display': floor.author_display,
                 'author_info': author_info,
                 'created_at': floor.created_at.isoformat().replace('+00:00', 'Z')
@@ -197,30 +202,13 @@ def get_public_forum_categories():
     获取论坛帖子分类统计（无需登录）
     """
     try:
-        from sqlalchemy import func
-
-        # 获取各分类统计
-        category_stats = db.session.query(
-            ForumPost.category,
-            func.count(ForumPost.id).label('post_count'),
-            func.sum(ForumPost.view_count).label('total_views'),
-            func.sum(ForumPost.like_count).label('total_likes')
-        ).filter(
-            ForumPost.category.isnot(None),
-            ForumPost.category != '',
-            ForumPost.status == 'published'
-        ).group_by(ForumPost.category).all()
+        from components.forum_category_stats import category_stats
 
+        # 读取分类统计汇总表（由帖子写入、点赞与浏览落库增量维护）
         categories_data = []
-        for stat in category_stats:
-            category_data = {
-                'name': stat.category,
-                'post_count': stat.post_count or 0,
-                'total_views': stat.total_views or 0,
-                'total_likes': stat.total_likes or 0,
-                'avg_views_per_post': round((stat.total_views or 0) / stat.post_count, 2) if stat.post_count > 0 else 0
-            }
-            categories_data.append(category_data)
+        for stat in category_stats.get_category_rows(status='published'):
+            stat['avg_views_per_post'] = round(stat['total_views'] / stat['post_count'], 2) if stat['post_count'] > 0 else 0
+            categories_data.append(stat)
 
         return ResponseService.success(data=categories_data, message="分类统计查询成功")
 
@@ -5,22 +5,29 @@ from datetime import datetime
 from components import token_required, db
 from components.models.forum_models import ForumPost, ForumVisit
 from components.response_service import ResponseService
+from components.view_counter import get_view_count, VIEW_TARGET_FORUM_POST
+from components.forum_hot_ranking import hot_ranking
+from components.search_index import search_index, SEARCH_DOC_FORUM_POST
 from . import post_bp
 from ..common.utils import (
     sensitive_filter, post_sorter, PaginationHelper,
     PermissionHelper, validate_content
 )
+from ..common.loaders import ForumBatchLoader
 
 
-def post_to_dict(post, include_content=True):
-    """将帖子对象转换为字典"""
+def post_to_dict(post, include_content=True, loader=None):
+    """将帖子对象转换为字典（列表接口传入批量加载器避免逐条查询计数）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_posts([post])
+
     result = {
         'id': post.id,
         'title': post.title,
         'category': post.category,
-        'view_count': post.view_count,
-        'like_count': post.calculate_like_count(),
-        'comment_count': post.calculate_comment_count(),
+        'view_count': get_view_count(VIEW_TARGET_FORUM_POST, post),
+        'like_count': loader.like_count('post', post.id),
+        'comment_count': loader.comment_count(post.id),
         'status': post.status,
         'author_display': post.author_display,
         'created_at': post.created_at.isoformat() if post.created_at else None,
@@ -57,35 +64,20 @@ def get_posts():
         if status:
             query = query.filter(ForumPost.status == status)
         if keyword:
-            query = query.filter(
-                (ForumPost.title.like(f'%{keyword}%')) |
-                (ForumPost.content.like(f'%{keyword}%'))
-            )
-
-        # 执行查询
-        posts = query.all()
+            query = search_index.apply(query, SEARCH_DOC_FORUM_POST, keyword)
 
-        # 排序
-        sorted_posts = post_sorter.sort_posts(posts, sort_by)
-
-        # 手动分页
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_posts = sorted_posts[start:end]
-        total = len(sorted_posts)
+        # 数据库端排序与分页，只读取当前页的数据
+        pagination = post_sorter.apply_sort(query, sort_by).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        total = pagination.total
 
-        # 格式化响应
+        # 格式化响应（批量加载当前页的计数）
+        loader = ForumBatchLoader().load_posts(pagination.items)
         response_data = PaginationHelper.format_pagination_response(
-            type('Pagination', (), {
-                'total': total,
-                'page': page,
-                'per_page': per_page,
-                'pages': (total + per_page - 1) // per_page,
-                'has_prev': page > 1,
-                'has_next': end < total
-            })(),
-            paginated_posts,
-            post_to_dict
+            pagination,
+            pagination.items,
+            lambda post: post_to_dict(post, loader=loader)
         )
 
         return ResponseService.success(
@@ -262,14 +254,21 @@ def delete_post(current_user, post_id):
 
 @post_bp.route('/hot', methods=['GET'])
 def get_hot_posts():
-    """获取热门帖子"""
+    """获取热门帖子（读取物化的时间衰减排行）"""
     try:
         hours = int(request.args.get('hours', 24))
         limit = min(int(request.args.get('limit', 10)), 50)  # 限制最大返回数量
+        category = request.args.get('category', '').strip() or None
 
-        hot_posts = post_sorter.get_hot_posts(hours, limit)
+        hot_posts = post_sorter.get_hot_posts(hours, limit, category)
 
-        posts_data = [post_to_dict(post, include_content=False) for post in hot_posts]
+        loader = ForumBatchLoader().load_posts(hot_posts)
+        posts_data = []
+        for post in hot_posts:
+            post_dict = post_to_dict(post, include_content=False, loader=loader)
+            # 当前时刻的时间衰减热度
+            post_dict['hot_score'] = round(hot_ranking.decayed_score(post.hot_score, post.created_at), 4)
+            posts_data.append(post_dict)
 
         return ResponseService.success(
             data=posts_data,
@@ -285,13 +284,10 @@ def get_hot_posts():
 def get_categories():
     """获取帖子分类列表"""
     try:
-        # 获取所有不同的分类
-        categories = db.session.query(ForumPost.category).filter(
-            ForumPost.category.isnot(None),
-            ForumPost.category != ''
-        ).distinct().all()
+        from components.forum_category_stats import category_stats
 
-        category_list = [cat[0] for cat in categories if cat[0]]
+        # 从分类统计汇总表读取所有有帖子的分类
+        category_list = [stat['name'] for stat in category_stats.get_category_rows()]
 
         return ResponseService.success(
             data=category_list,
@@ -316,22 +312,22 @@ def search_posts():
         page = pagination_params['page']
         per_page = pagination_params['per_page']
 
-        # 搜索查询
-        query = ForumPost.query.filter(
-            ForumPost.status == 'published',
-            (ForumPost.title.like(f'%{keyword}%')) |
-            (ForumPost.content.like(f'%{keyword}%'))
+        # 搜索查询（倒排索引，按相关度排序，相关度相同时按发布时间倒序）
+        query = search_index.apply(
+            ForumPost.query.filter(ForumPost.status == 'published'),
+            SEARCH_DOC_FORUM_POST, keyword, rank=True
         )
 
         pagination = query.order_by(ForumPost.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
-        # 格式化响应
+        # 格式化响应（批量加载当前页的计数）
+        loader = ForumBatchLoader().load_posts(pagination.items)
         response_data = PaginationHelper.format_pagination_response(
             pagination,
             pagination.items,
-            lambda post: post_to_dict(post, include_content=False)
+            lambda post: post_to_dict(post, include_content=False, loader=loader)
         )
 
         return ResponseService.success(
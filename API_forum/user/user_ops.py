@@ -5,22 +5,27 @@ from datetime import datetime, timedelta
 from components import token_required, db
 from components.models.forum_models import ForumPost, ForumFloor, ForumReply, ForumLike, ForumVisit
 from components.response_service import ResponseService
+from components.view_counter import get_view_count, VIEW_TARGET_FORUM_POST
 from . import user_bp
 from ..common.utils import (
     sensitive_filter, PaginationHelper, validate_content,
     ForumStatsHelper
 )
+from ..common.loaders import ForumBatchLoader, ForumTargetPrefetcher
 
 
-def post_to_dict(post, include_content=True):
-    """将帖子对象转换为字典"""
+def post_to_dict(post, include_content=True, loader=None):
+    """将帖子对象转换为字典（列表接口传入批量加载器避免逐条查询计数）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_posts([post])
+
     result = {
         'id': post.id,
         'title': post.title,
         'category': post.category,
-        'view_count': post.view_count,
-        'like_count': post.calculate_like_count(),
-        'comment_count': post.calculate_comment_count(),
+        'view_count': get_view_count(VIEW_TARGET_FORUM_POST, post),
+        'like_count': loader.like_count('post', post.id),
+        'comment_count': loader.comment_count(post.id),
         'status': post.status,
         'author_display': post.author_display,
         'created_at': post.created_at.isoformat() if post.created_at else None,
@@ -33,15 +38,18 @@ def post_to_dict(post, include_content=True):
     return result
 
 
-def floor_to_dict(floor):
-    """将楼层对象转换为字典"""
+def floor_to_dict(floor, loader=None):
+    """将楼层对象转换为字典（列表接口传入批量加载器避免逐条查询计数）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_floors([floor])
+
     return {
         'id': floor.id,
         'post_id': floor.post_id,
         'content': floor.content,
         'floor_number': floor.floor_number,
-        'like_count': floor.calculate_like_count(),
-        'reply_count': floor.calculate_reply_count(),
+        'like_count': loader.like_count('floor', floor.id),
+        'reply_count': loader.reply_count(floor.id),
         'status': floor.status,
         'author_display': floor.author_display,
         'created_at': floor.created_at.isoformat() if floor.created_at else None,
@@ -49,13 +57,16 @@ def floor_to_dict(floor):
     }
 
 
-def reply_to_dict(reply):
-    """将回复对象转换为字典"""
+def reply_to_dict(reply, loader=None):
+    """将回复对象转换为字典（列表接口传入批量加载器避免逐条查询计数）"""
+    if loader is None:
+        loader = ForumBatchLoader().load_replies([reply])
+
     return {
         'id': reply.id,
         'floor_id': reply.floor_id,
         'content': reply.content,
-        'like_count': reply.calculate_like_count(),
+        'like_count': loader.like_count('reply', reply.id),
         'status': reply.status,
         'author_display': reply.author_display,
         'quote_content': reply.quote_content,
@@ -103,11 +114,12 @@ def get_my_posts(current_user):
             page=page, per_page=per_page, error_out=False
         )
 
-        # 格式化响应
+        # 格式化响应（批量加载当前页的计数）
+        loader = ForumBatchLoader().load_posts(pagination.items)
         response_data = PaginationHelper.format_pagination_response(
             pagination,
             pagination.items,
-            lambda post: post_to_dict(post)
+            lambda post: post_to_dict(post, loader=loader)
         )
 
         return ResponseService.success(
@@ -145,13 +157,15 @@ def get_my_floors(current_user):
             page=page, per_page=per_page, error_out=False
         )
 
-        # 获取帖子信息
+        # 批量加载当前页楼层的计数与所属帖子
+        loader = ForumBatchLoader().load_floors(pagination.items)
+        targets = ForumTargetPrefetcher().load_posts([floor.post_id for floor in pagination.items])
         floors_data = []
         for floor in pagination.items:
-            floor_dict = floor_to_dict(floor)
+            floor_dict = floor_to_dict(floor, loader=loader)
 
-            # 获取帖子信息
-            post = ForumPost.query.get(floor.post_id)
+            # 帖子信息
+            post = targets.post(floor.post_id)
             if post:
                 floor_dict['post_title'] = post.title
                 floor_dict['post_status'] = post.status
@@ -204,21 +218,24 @@ def get_my_replies(current_user):
             page=page, per_page=per_page, error_out=False
         )
 
-        # 获取楼层和帖子信息
+        # 批量加载当前页回复的计数，以及所属楼层号与帖子标题（一条 JOIN 查询）
+        loader = ForumBatchLoader().load_replies(pagination.items)
+        targets = ForumTargetPrefetcher().load_floor_parents([reply.floor_id for reply in pagination.items])
         replies_data = []
         for reply in pagination.items:
-            reply_dict = reply_to_dict(reply)
+            reply_dict = reply_to_dict(reply, loader=loader)
 
-            # 获取楼层信息
-            floor = ForumFloor.query.get(reply.floor_id)
-            if floor:
-                reply_dict['floor_number'] = floor.floor_number
+            # 楼层信息
+            parent = targets.floor_parent(reply.floor_id)
+            if parent:
+                floor_number, post_id = parent
+                reply_dict['floor_number'] = floor_number
 
-                # 获取帖子信息
-                post = ForumPost.query.get(floor.post_id)
-                if post:
-                    reply_dict['post_title'] = post.title
-                    reply_dict['post_id'] = post.id
+                # 帖子信息
+                post_title = targets.post_title(post_id)
+                if post_title is not None:
+                    reply_dict['post_title'] = post_title
+                    reply_dict['post_id'] = post_id
 
             replies_data.append(reply_dict)
 
@@ -559,7 +576,8 @@ def get_my_likes(current_user):
             page=page, per_page=per_page, error_out=False
         )
 
-        # 获取详细信息
+        # 按目标类型分组批量加载点赞目标及所属帖子标题
+        targets = ForumTargetPrefetcher().load_likes(pagination.items)
         likes_data = []
         for like in pagination.items:
             like_dict = {
@@ -569,9 +587,9 @@ def get_my_likes(current_user):
                 'created_at': like.created_at.isoformat() if like.created_at else None
             }
 
-            # 根据目标类型获取详细信息
+            # 根据目标类型组装详细信息
             if like.target_type == 'post' and like.post_id:
-                post = ForumPost.query.get(like.post_id)
+                post = targets.post(like.post_id)
                 if post:
                     like_dict['target_info'] = {
                         'title': post.title,
@@ -579,23 +597,23 @@ def get_my_likes(current_user):
                         'author_display': post.author_display
                     }
             elif like.target_type == 'floor' and like.floor_id:
-                floor = ForumFloor.query.get(like.floor_id)
+                floor = targets.target('floor', like.floor_id)
                 if floor:
-                    post = ForumPost.query.get(floor.post_id)
+                    post_title = targets.post_title(floor.post_id)
                     like_dict['target_info'] = {
                         'content': floor.content[:100] + '...' if len(floor.content) > 100 else floor.content,
                         'floor_number': floor.floor_number,
-                        'post_title': post.title if post else '帖子已删除',
+                        'post_title': post_title if post_title is not None else '帖子已删除',
                         'author_display': floor.author_display
                     }
             elif like.target_type == 'reply' and like.reply_id:
-                reply = ForumReply.query.get(like.reply_id)
+                reply = targets.target('reply', like.reply_id)
                 if reply:
-                    floor = ForumFloor.query.get(reply.floor_id)
-                    post = ForumPost.query.get(floor.post_id) if floor else None
+                    parent = targets.floor_parent(reply.floor_id)
+                    post_title = targets.post_title(parent[1]) if parent else None
                     like_dict['target_info'] = {
                         'content': reply.content[:100] + '...' if len(reply.content) > 100 else reply.content,
-                        'post_title': post.title if post else '帖子已删除',
+                        'post_title': post_title if post_title is not None else '帖子已删除',
                         'author_display': reply.author_display
                     }
 
@@ -653,7 +671,8 @@ def get_my_stats(current_user):
             ForumPost.created_at.desc()
         ).limit(5).all()
 
-        recent_posts_data = [post_to_dict(post, include_content=False) for post in recent_posts]
+        loader = ForumBatchLoader().load_posts(recent_posts)
+        recent_posts_data = [post_to_dict(post, include_content=False, loader=loader) for post in recent_posts]
 
         stats_data = {
             'basic_stats': basic_stats,
@@ -688,10 +707,11 @@ def get_my_visits(current_user):
             ForumVisit.last_visit_at.desc()
         ).paginate(page=page, per_page=per_page, error_out=False)
 
-        # 获取帖子信息
+        # 批量加载浏览过的帖子
+        targets = ForumTargetPrefetcher().load_posts([visit.post_id for visit in pagination.items])
         visits_data = []
         for visit in pagination.items:
-            post = ForumPost.query.get(visit.post_id)
+            post = targets.post(visit.post_id)
             if post:
                 visit_dict = {
                     'id': visit.id,
@@ -7,27 +7,13 @@ from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
-from components import db, token_required
+from components import db, token_required, token_admin_required, get_auth_context
 from API_notice.common.utils import NoticeUtils, NoticePermissionUtils, NoticeQueryUtils
 from components.models.notice_models import Notice, NoticeAttachment
-from components.models.user_models import Admin
 
 
-# 管理员权限装饰器
-def admin_required(f):
-    """管理员权限验证装饰器"""
-    def decorated_function(current_user, *args, **kwargs):
-        # 检查当前用户是否为管理员
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
-        if not current_admin:
-            return jsonify({
-                'success': False,
-                'message': '需要管理员权限',
-                'data': None
-            }), 403
-        return f(current_user, *args, **kwargs)
-    decorated_function.__name__ = f.__name__
-    return decorated_function
+# 管理员权限装饰器（读取请求级认证解析中已加载的管理员记录）
+admin_required = token_admin_required
 
 
 # 创建管理员公告管理蓝图
@@ -88,7 +74,7 @@ def create_notice(current_user):
             }), 400
 
         # 获取当前管理员信息
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         if not current_admin:
             return jsonify({
                 'success': False,
@@ -218,7 +204,7 @@ def update_notice(current_user, notice_id):
             }), 404
 
         # 获取当前管理员信息
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         if not current_admin:
             return jsonify({
                 'success': False,
@@ -352,7 +338,7 @@ def delete_notice(current_user, notice_id):
             }), 404
 
         # 获取当前管理员信息
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         if not current_admin:
             return jsonify({
                 'success': False,
@@ -537,7 +523,7 @@ def get_admin_notice_detail(current_user, notice_id):
         read_stats = NoticeUtils.get_notice_read_statistics(notice_id)
 
         # 获取当前管理员信息
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
 
         # 检查权限
         can_edit = False
@@ -609,7 +595,7 @@ def toggle_notice_top(current_user, notice_id):
             }), 400
 
         # 获取当前管理员信息
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         if not current_admin:
             return jsonify({
                 'success': False,
@@ -4,30 +4,16 @@
 
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
-from components import db, token_required
+from components import db, token_required, token_admin_required, get_auth_context
 import logging
 
 logger = logging.getLogger(__name__)
 from components.models.notice_models import Notice, NoticeAttachment
-from components.models.user_models import Admin
 from API_notice.common.utils import NoticePermissionUtils, NoticeQueryUtils
 
 
-# 管理员权限装饰器
-def admin_required(f):
-    """管理员权限验证装饰器"""
-    def decorated_function(current_user, *args, **kwargs):
-        # 检查当前用户是否为管理员
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
-        if not current_admin:
-            return jsonify({
-                'success': False,
-                'message': '需要管理员权限',
-                'data': None
-            }), 403
-        return f(current_user, *args, **kwargs)
-    decorated_function.__name__ = f.__name__
-    return decorated_function
+# 管理员权限装饰器（读取请求级认证解析中已加载的管理员记录）
+admin_required = token_admin_required
 
 
 # 创建公告分类管理蓝图
@@ -233,7 +219,7 @@ def get_notice_types(current_user):
         logger.info(f"【公告类型查询】用户: {current_user.account}")
 
         # 检查用户类型
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         is_admin = current_admin is not None
 
         # 根据用户类型过滤可见的公告类型
@@ -303,7 +289,7 @@ def get_notice_type_detail(current_user, type_code):
             }), 404
 
         # 检查用户类型
-        current_admin = Admin.query.filter_by(account=current_user.account).first()
+        current_admin = get_auth_context().admin
         is_admin = current_admin is not None
 
         # 权限检查
@@ -5,6 +5,7 @@ from flask import Blueprint, request
 from components import db
 from components.models import Notice
 from components.response_service import ResponseService
+from components.search_index import search_index, SEARCH_DOC_NOTICE
 from datetime import datetime, timedelta
 import logging
 
@@ -35,9 +36,9 @@ def get_public_notices():
         if notice_type:
             query = query.filter(Notice.notice_type == notice_type)
 
-        # 标题搜索
+        # 标题搜索（倒排索引）
         if release_title:
-            query = query.filter(Notice.release_title.like(f'%{release_title}%'))
+            query = search_index.apply(query, SEARCH_DOC_NOTICE, release_title)
 
         # 发布时间范围筛选
         def parse_time(time_str):
@@ -7,8 +7,8 @@
 
 from flask import request, Blueprint
 from functools import wraps
-from components import token_required, db
-from components.models import ScienceArticle, ScienceArticleLike, ScienceArticleVisit, User, Admin
+from components import token_required, get_auth_context, db
+from components.models import ScienceArticle, ScienceArticleLike, ScienceArticleVisit, User
 from components.response_service import ResponseService
 from API_science.common.utils import (
     format_article_data,
@@ -150,7 +150,7 @@ def create_article_for_admin(current_user):
             return ResponseService.error(error_message, status_code=400)
 
         # 获取管理员关联的用户ID
-        admin = Admin.query.filter_by(account=current_user.account).first()
+        admin = get_auth_context().admin
         if not admin or not admin.user_id:
             return ResponseService.error('管理员关联用户信息异常', status_code=400)
 
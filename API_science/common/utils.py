@@ -8,9 +8,12 @@
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime
 from flask import request, jsonify
-from components import db
+from components import db, get_auth_context
 from components.models import ScienceArticle, ScienceArticleLike, ScienceArticleVisit, User, Admin
 from components.response_service import ResponseService
+from components.view_counter import view_counter, get_view_count, VIEW_TARGET_SCIENCE_ARTICLE
+from components import like_engine
+from components.search_index import search_index, SEARCH_DOC_SCIENCE_ARTICLE
 
 
 def validate_article_data(data: Dict[str, Any], require_all: bool = True) -> tuple:
@@ -65,9 +68,13 @@ def get_user_identifier(current_user) -> tuple:
     Returns:
         (user_id, user_type, user_obj)
     """
-    # 检查是否为管理员
+    # 检查是否为管理员（当前登录主体直接复用请求级认证解析中的管理员记录）
     if hasattr(current_user, 'role'):
-        admin = Admin.query.filter_by(account=current_user.account).first()
+        ctx = get_auth_context()
+        if ctx.is_authenticated and ctx.principal is current_user:
+            admin = ctx.admin
+        else:
+            admin = Admin.query.filter_by(account=current_user.account).first()
         if admin:
             return admin.id, 'admin', admin
 
@@ -80,7 +87,7 @@ def get_user_identifier(current_user) -> tuple:
 
 def record_article_visit(article_id: int, current_user) -> tuple:
     """
-    记录文章浏览记录（避免重复记录）
+    记录文章浏览记录（每个用户每篇文章一条，写入缓冲后批量落库）
 
     Args:
         article_id: 文章ID
@@ -90,7 +97,7 @@ def record_article_visit(article_id: int, current_user) -> tuple:
         (success, message, visit_data)
     """
     try:
-        user_id, user_type, _ = get_user_identifier(current_user)
+        user_id, user_type, user_obj = get_user_identifier(current_user)
         if not user_id:
             return False, "用户身份验证失败", None
 
@@ -99,33 +106,25 @@ def record_article_visit(article_id: int, current_user) -> tuple:
         if not article:
             return False, "文章不存在", None
 
-        # 查找现有浏览记录
-        visit_record = None
+        # 浏览记录只关联 user_info，管理员按其关联的用户账号记录
+        visit_user_id = user_id
         if user_type == 'admin':
-            visit_record = ScienceArticleVisit.query.filter_by(admin_id=user_id, article_id=article_id).first()
-        else:
-            visit_record = ScienceArticleVisit.query.filter_by(user_id=user_id, article_id=article_id).first()
-
-        if visit_record:
-            # 更新最后浏览时间
-            visit_record.last_visit_at = datetime.now()
-            action = "更新浏览记录"
-        else:
-            # 创建新浏览记录
-            if user_type == 'admin':
-                visit_record = ScienceArticleVisit(admin_id=user_id, article_id=article_id)
-            else:
-                visit_record = ScienceArticleVisit(user_id=user_id, article_id=article_id)
-            db.session.add(visit_record)
-            action = "新增浏览记录"
+            visit_user_id = user_obj.user_id
+            if not visit_user_id:
+                return False, "管理员未关联用户账号，无法记录浏览", None
 
-        db.session.commit()
+        # 写入浏览计数缓冲，由 components.view_counter 批量 upsert
+        now = datetime.now()
+        first_visit_at, last_visit_at = view_counter.record_visit(
+            VIEW_TARGET_SCIENCE_ARTICLE, article_id, visit_user_id
+        ) or (now, now)
+        action = "记录浏览"
 
         visit_data = {
             'article_id': article_id,
             'action': action,
-            'first_visit_at': visit_record.first_visit_at.isoformat().replace('+00:00', 'Z'),
-            'last_visit_at': visit_record.last_visit_at.isoformat().replace('+00:00', 'Z')
+            'first_visit_at': first_visit_at.isoformat().replace('+00:00', 'Z'),
+            'last_visit_at': last_visit_at.isoformat().replace('+00:00', 'Z')
         }
 
         return True, f'{action}成功', visit_data
@@ -147,44 +146,33 @@ def toggle_article_like(article_id: int, current_user) -> tuple:
         (success, message, like_data)
     """
     try:
-        user_id, user_type, _ = get_user_identifier(current_user)
+        user_id, user_type, user_obj = get_user_identifier(current_user)
         if not user_id:
             return False, "用户身份验证失败", None
 
-        # 检查文章是否存在
-        article = ScienceArticle.query.get(article_id)
-        if not article:
+        # 检查文章是否存在（只查询主键，不加载文章对象）
+        if not db.session.query(ScienceArticle.id).filter(ScienceArticle.id == article_id).first():
             return False, "文章不存在", None
 
-        # 查找现有点赞记录
-        like_record = None
+        # 点赞表只关联 user_info，管理员按其关联的用户账号点赞
+        like_user_id = user_id
         if user_type == 'admin':
-            like_record = ScienceArticleLike.query.filter_by(admin_id=user_id, article_id=article_id).first()
-        else:
-            like_record = ScienceArticleLike.query.filter_by(user_id=user_id, article_id=article_id).first()
-
-        if like_record:
-            # 取消点赞
-            db.session.delete(like_record)
-            article.like_count = max(0, (article.like_count or 0) - 1)
-            action = "取消点赞"
-            is_liked = False
-        else:
-            # 新增点赞
-            if user_type == 'admin':
-                like_record = ScienceArticleLike(admin_id=user_id, article_id=article_id)
-            else:
-                like_record = ScienceArticleLike(user_id=user_id, article_id=article_id)
-            db.session.add(like_record)
-            article.like_count = (article.like_count or 0) + 1
-            action = "点赞"
-            is_liked = True
-
-        db.session.commit()
+            like_user_id = user_obj.user_id
+            if not like_user_id:
+                return False, "管理员未关联用户账号，无法点赞", None
+
+        # 插入点赞记录（已存在时删除）并在数据库端调整计数，同一事务内完成
+        is_liked = like_engine.toggle_like(
+            ScienceArticleLike,
+            {'user_id': like_user_id, 'article_id': article_id, 'created_at': datetime.now()},
+            ['user_id', 'article_id'],
+            ScienceArticle, article_id
+        )
+        action = "点赞" if is_liked else "取消点赞"
 
         like_data = {
             'article_id': article_id,
-            'like_count': article.like_count,
+            'like_count': like_engine.get_like_count(ScienceArticle, article_id),
             'is_liked': is_liked,
             'action': action
         }
@@ -208,24 +196,19 @@ def get_like_status(article_ids: List[int], current_user) -> tuple:
         (success, message, like_status_data)
     """
     try:
-        user_id, user_type, _ = get_user_identifier(current_user)
+        user_id, user_type, user_obj = get_user_identifier(current_user)
         if not user_id:
             return False, "用户身份验证失败", None
 
         if not article_ids:
             return False, "文章ID列表不能为空", None
 
-        # 查询用户对这些文章的点赞状态
-        if user_type == 'admin':
-            liked_records = ScienceArticleLike.query.filter(
-                ScienceArticleLike.admin_id == user_id,
-                ScienceArticleLike.article_id.in_(article_ids)
-            ).all()
-        else:
-            liked_records = ScienceArticleLike.query.filter(
-                ScienceArticleLike.user_id == user_id,
-                ScienceArticleLike.article_id.in_(article_ids)
-            ).all()
+        # 查询用户对这些文章的点赞状态（管理员按其关联的用户账号查询，与点赞时一致）
+        like_user_id = user_obj.user_id if user_type == 'admin' else user_id
+        liked_records = ScienceArticleLike.query.filter(
+            ScienceArticleLike.user_id == like_user_id,
+            ScienceArticleLike.article_id.in_(article_ids)
+        ).all()
 
         # 构建结果：文章ID -> 是否点赞
         like_status = {article_id: False for article_id in article_ids}
@@ -263,7 +246,7 @@ def format_article_data(article: ScienceArticle, include_content: bool = True, i
         'cover_image': article.cover_image,
         'status': article.status,
         'like_count': article.like_count or 0,
-        'view_count': article.view_count or 0,
+        'view_count': get_view_count(VIEW_TARGET_SCIENCE_ARTICLE, article),
         'author_display': article.author_display,
         'published_at': article.published_at.isoformat().replace('+00:00', 'Z') if article.published_at else None,
         'created_at': article.created_at.isoformat().replace('+00:00', 'Z'),
@@ -338,12 +321,8 @@ def build_article_query(status: Optional[str] = None, keyword: Optional[str] = N
     if author_id:
         query = query.filter(ScienceArticle.author_user_id == author_id)
 
-    # 关键词搜索（标题和内容）
+    # 关键词搜索（标题和内容，倒排索引）
     if keyword:
-        keyword = f'%{keyword}%'
-        query = query.filter(
-            (ScienceArticle.title.like(keyword)) |
-            (ScienceArticle.content.like(keyword))
-        )
+        query = search_index.apply(query, SEARCH_DOC_SCIENCE_ARTICLE, keyword)
 
     return query
\ No newline at end of file
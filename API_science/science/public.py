@@ -5,6 +5,8 @@ from components import db
 from components.models import ScienceArticle
 from components.response_service import ResponseService
 from components.models import User
+from components.view_counter import view_counter, get_view_count, VIEW_TARGET_SCIENCE_ARTICLE
+from components.search_index import search_index, SEARCH_DOC_SCIENCE_ARTICLE
 from datetime import datetime
 
 # 创建科普公开访问模块蓝图
@@ -28,10 +30,7 @@ def get_public_science_articles():
 
         # 关键词搜索
         if keyword:
-            query = query.filter(
-                (ScienceArticle.title.like(f'%{keyword}%')) |
-                (ScienceArticle.content.like(f'%{keyword}%'))
-            )
+            query = search_index.apply(query, SEARCH_DOC_SCIENCE_ARTICLE, keyword)
 
         # 作者筛选
         if author_account:
@@ -72,7 +71,7 @@ def get_public_science_articles():
                 'summary': article.content[:200] + '...' if len(article.content) > 200 else article.content,
                 'cover_image': article.cover_image,
                 'like_count': article.like_count,
-                'view_count': article.view_count,
+                'view_count': get_view_count(VIEW_TARGET_SCIENCE_ARTICLE, article),
                 'published_at': article.published_at.isoformat().replace('+00:00', 'Z') if article.published_at else None,
                 'created_at': article.created_at.isoformat().replace('+00:00', 'Z'),
                 'author_account': article.author_account,
@@ -103,9 +102,8 @@ def get_public_science_article_detail(article_id):
         if not article:
             return ResponseService.error('文章不存在或未发布', status_code=404)
 
-        # 增加浏览次数
-        article.view_count += 1
-        db.session.commit()
+        # 增加浏览次数（写入缓冲，批量落库）
+        view_counter.record_view(VIEW_TARGET_SCIENCE_ARTICLE, article.id)
 
         # 获取作者信息
         author_info = {}
@@ -134,7 +132,7 @@ def get_public_science_article_detail(article_id):
             'content': article.content,
             'cover_image': article.cover_image,
             'like_count': article.like_count,
-            'view_count': article.view_count,
+            'view_count': get_view_count(VIEW_TARGET_SCIENCE_ARTICLE, article),
             'published_at': article.published_at.isoformat().replace('+00:00', 'Z') if article.published_at else None,
             'created_at': article.created_at.isoformat().replace('+00:00', 'Z'),
             'updated_at': article.updated_at.isoformat().replace('+00:00', 'Z') if article.updated_at else None,
@@ -5,6 +5,7 @@ from flask import request
 from components import token_required, db
 from components.models import Admin, User
 from components.response_service import ResponseService, handle_api_exception
+from components.principal_cache import invalidate_principal
 from . import admin_bp
 from ..common.utils import (
     UserDataProcessor, UserValidator, UserPermissionChecker,
@@ -201,6 +202,7 @@ def manage_users(current_user):
                 setattr(user, field, value)
 
             db.session.commit()
+            invalidate_principal(user)
 
             print(f"【管理员更新用户】管理员: {current_user.account}, 目标用户: {user.account}")
 
@@ -7,6 +7,8 @@ from flask import request, jsonify
 from components import db
 from components.models import Admin, User
 from components.response_service import ResponseService
+from components.principal_cache import invalidate_principal
+from components.password_hasher import PasswordHasherBusyError
 from config import Config
 from . import auth_bp
 from ..common.utils import UserQueryHelper, validate_user_data
@@ -48,6 +50,17 @@ def login():
             print(f"【登录失败】用户已注销: {account}")
             return ResponseService.error('用户账号已注销', status_code=403)
 
+        # 透明升级：已存储哈希的成本参数过时时，用本次明文密码重新哈希
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+                invalidate_principal(user)
+                print(f"【密码哈希升级】账号: {account}")
+            except PasswordHasherBusyError:
+                # 升级失败不影响本次登录，下次登录再尝试
+                db.session.rollback()
+
         # 生成JWT token
         token_payload = {
             'user_id': user.id,
@@ -78,6 +91,9 @@ def login():
             message="登录成功"
         )
 
+    except PasswordHasherBusyError:
+        print(f"【登录繁忙】密码哈希服务排队已满")
+        return ResponseService.error('服务繁忙，请稍后重试', status_code=503)
     except Exception as e:
         print(f"【登录异常】错误: {str(e)}")
         return ResponseService.error(f'登录失败: {str(e)}', status_code=500)
@@ -301,6 +317,9 @@ def register():
             message="注册成功"
         )
 
+    except PasswordHasherBusyError:
+        db.session.rollback()
+        return ResponseService.error('服务繁忙，请稍后重试', status_code=503)
     except Exception as e:
         db.session.rollback()
         print(f"【用户注册异常】错误: {str(e)}")
@@ -368,11 +387,15 @@ def change_password():
         # 设置新密码
         user.set_password(new_password)
         db.session.commit()
+        invalidate_principal(user)
 
         print(f"【密码修改成功】用户: {user.account}")
 
         return ResponseService.success(message="密码修改成功")
 
+    except PasswordHasherBusyError:
+        db.session.rollback()
+        return ResponseService.error('服务繁忙，请稍后重试', status_code=503)
     except Exception as e:
         db.session.rollback()
         print(f"【修改密码异常】错误: {str(e)}")
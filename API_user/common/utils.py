@@ -142,30 +142,53 @@ class UserQueryHelper:
 
     @staticmethod
     def find_user_by_identifier(identifier):
+        """
+        按账号/手机号/邮箱查找登录用户（单条查询）
+
+        六个候选条件以 UNION ALL 合并，按原有优先级排序后取第一条：
+        管理员账号 > 用户账号 > 管理员手机号 > 用户手机号 > 管理员邮箱 > 用户邮箱。
+        每个分支都命中索引（account/phone/email），再 LEFT JOIN 回两张表取完整记录，
+        无论命中与否都只需一次数据库往返。
+        """
+        from sqlalchemy import literal, union_all, and_
+        from components import db
         from components.models.user_models import User, Admin
 
-        admin = Admin.query.filter_by(account=identifier).first()
-        if admin:
-            return admin, 'admin'
-        user = User.query.filter_by(account=identifier, is_deleted=0).first()
-        if user:
-            return user, 'user'
-
-        admin = Admin.query.filter_by(phone=identifier).first()
-        if admin:
+        if not identifier:
+            return None, None
+
+        def candidate(model, column, rank):
+            query = db.select(
+                literal(rank).label('match_rank'),
+                model.id.label('record_id')
+            ).where(column == identifier)
+            if model is User:
+                query = query.where(User.is_deleted == 0)
+            return query
+
+        # 偶数优先级为管理员表，奇数为用户表
+        matched = union_all(
+            candidate(Admin, Admin.account, 0),
+            candidate(User, User.account, 1),
+            candidate(Admin, Admin.phone, 2),
+            candidate(User, User.phone, 3),
+            candidate(Admin, Admin.email, 4),
+            candidate(User, User.email, 5),
+        ).order_by('match_rank', 'record_id').limit(1).subquery('matched')
+
+        is_admin = matched.c.match_rank.in_([0, 2, 4])
+        row = db.session.query(Admin, User).select_from(matched).outerjoin(
+            Admin, and_(is_admin, Admin.id == matched.c.record_id)
+        ).outerjoin(
+            User, and_(~is_admin, User.id == matched.c.record_id)
+        ).first()
+
+        if row is None:
+            return None, None
+        admin, user = row
+        if admin is not None:
             return admin, 'admin'
-        user = User.query.filter_by(phone=identifier, is_deleted=0).first()
-        if user:
-            return user, 'user'
-
-        admin = Admin.query.filter_by(email=identifier).first()
-        if admin:
-            return admin, 'admin'
-        user = User.query.filter_by(email=identifier, is_deleted=0).first()
-        if user:
-            return user, 'user'
-
-        return None, None
+        return user, 'user'
 
 def validate_user_data(data, required_fields=None, optional_fields=None):
     """通用用户数据验证函数"""
@@ -5,6 +5,8 @@ from flask import request
 from components import token_required, db, LocalImageStorage
 from components.models import User, Admin
 from components.response_service import ResponseService, UserInfoService, handle_api_exception
+from components.principal_cache import invalidate_principal
+from components.password_hasher import PasswordHasherBusyError
 from . import user_bp
 from ..common.utils import UserDataProcessor, UserValidator, validate_user_data
 
@@ -135,6 +137,7 @@ def update_user_info(current_user):
     try:
         updated_count = target_user.__class__.query.filter_by(id=target_user.id).update(update_data)
         db.session.commit()
+        invalidate_principal(target_user)
 
         print(f"【用户信息更新成功】用户: {target_user.account}, 更新字段数: {len(update_data)}")
 
@@ -323,6 +326,9 @@ def delete_user_account(current_user):
             message="账号注销成功"
         )
 
+    except PasswordHasherBusyError:
+        db.session.rollback()
+        return ResponseService.error('服务繁忙，请稍后重试', status_code=503)
     except Exception as e:
         db.session.rollback()
         print(f"【用户注销异常】错误: {str(e)}")
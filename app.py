@@ -55,6 +55,18 @@ def create_app(config_object=None):
     # 初始化数据库
     db.init_app(app)
 
+    # 全文检索：读取检索后端配置并注册倒排索引的增量维护事件
+    from components.search_index import search_index
+    search_index.init_app(app)
+
+    # 论坛分类统计：注册帖子写入事件，增量维护 forum_category_stats 汇总表
+    from components.forum_category_stats import category_stats
+    category_stats.init_app(app)
+
+    # 活动评分汇总：注册评分写入事件，增量维护 activity_rating_summary 汇总表
+    from components.activity_rating_summary import rating_summary
+    rating_summary.init_app(app)
+
     # 注册主要蓝图
     app.register_blueprint(api_user_bp)   # 重构后的用户接口
     app.register_blueprint(common_bp)     # 公共接口
@@ -118,6 +130,22 @@ def create_app(config_object=None):
             test_admin = Admin.create_with_user(admin_data, '123456')  # 密码：123456
             print("【初始化】测试管理员创建成功")
 
+    # 启动浏览计数写缓冲的后台落库
+    from components.view_counter import view_counter
+    view_counter.init_app(app)
+
+    # 启动活动预约排队的后台写入线程
+    from components.booking_admission import booking_admission
+    booking_admission.init_app(app)
+
+    # 注册活动可用性缓存的失效事件
+    from components.activity_availability import availability_cache
+    availability_cache.init_app(app)
+
+    # 启动活动生命周期定时任务（活动结束、草稿过期、公告到期）
+    from components.activity_lifecycle import lifecycle_scheduler
+    lifecycle_scheduler.init_app(app)
+
     # 必须返回 app 实例
     return app
 
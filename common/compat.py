@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from components import token_required, db, LocalImageStorage
 from components.models import Activity, ActivityBooking, Attachment
 from components.response_service import ResponseService
+from API_activities.common.loaders import ActivityProjection
 from datetime import datetime
 
 compat_bp = Blueprint('compat', __name__, url_prefix='/api')
@@ -20,7 +21,8 @@ def alias_get_my_activities(current_user):
         role = request.args.get('role', 'all')
         status = request.args.get('status', '').strip()
 
-        result_list = []
+        organizer_activities = []
+        participant_bookings = []
 
         if role in ['organizer', 'all']:
             organizer_query = Activity.query.filter_by(organizer_user_id=current_user.id)
@@ -28,62 +30,63 @@ def alias_get_my_activities(current_user):
                 organizer_query = organizer_query.filter(Activity.status == status)
             organizer_activities = organizer_query.order_by(Activity.updated_at.desc()).all()
 
-            for activity in organizer_activities:
-                try:
-                    current_bookings = ActivityBooking.query.filter_by(activity_id=activity.id, status='booked').count()
-                except Exception:
-                    current_bookings = 0
-                item = {
-                    'id': activity.id,
-                    'title': activity.title,
-                    'description': activity.description,
-                    'location': activity.location,
-                    'start_time': activity.start_time.isoformat().replace('+00:00', 'Z') if activity.start_time else None,
-                    'end_time': activity.end_time.isoformat().replace('+00:00', 'Z') if activity.end_time else None,
-                    'max_participants': activity.max_participants,
-                    'current_participants': current_bookings,
-                    'tags': getattr(activity, 'tags', None),
-                    'status': activity.status,
-                    'role': 'organizer',
-                    'created_at': activity.created_at.isoformat().replace('+00:00', 'Z') if activity.created_at else None,
-                    'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z') if activity.updated_at else None
-                }
-                result_list.append(item)
-
         if role in ['participant', 'all']:
             participant_query = ActivityBooking.query.filter_by(user_account=current_user.account)
             if status:
                 participant_query = participant_query.join(Activity).filter(Activity.status == status)
             participant_bookings = participant_query.order_by(ActivityBooking.booking_time.desc()).all()
 
-            for booking in participant_bookings:
-                activity = Activity.query.get(booking.activity_id)
-                if not activity:
-                    continue
-                if any(item['id'] == activity.id for item in result_list):
-                    continue
-                try:
-                    current_bookings = ActivityBooking.query.filter_by(activity_id=activity.id, status='booked').count()
-                except Exception:
-                    current_bookings = 0
-                item = {
-                    'id': activity.id,
-                    'title': activity.title,
-                    'description': activity.description,
-                    'location': activity.location,
-                    'start_time': activity.start_time.isoformat().replace('+00:00', 'Z') if activity.start_time else None,
-                    'end_time': activity.end_time.isoformat().replace('+00:00', 'Z') if activity.end_time else None,
-                    'max_participants': activity.max_participants,
-                    'current_participants': current_bookings,
-                    'tags': getattr(activity, 'tags', None),
-                    'status': activity.status,
-                    'role': 'participant',
-                    'booking_status': booking.status,
-                    'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z') if booking.booking_time else None,
-                    'created_at': activity.created_at.isoformat().replace('+00:00', 'Z') if activity.created_at else None,
-                    'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z') if activity.updated_at else None
-                }
-                result_list.append(item)
+        # 批量加载预约对应的活动与各活动的预约人数
+        projection = ActivityProjection().load_booking_activities(participant_bookings)
+        participant_activities = [projection.activity(booking.activity_id) for booking in participant_bookings]
+        projection.load_counts(organizer_activities, all_statuses=True)
+        projection.load_counts([activity for activity in participant_activities if activity])
+
+        result_list = []
+        listed_ids = set()
+
+        for activity in organizer_activities:
+            item = {
+                'id': activity.id,
+                'title': activity.title,
+                'description': activity.description,
+                'location': activity.location,
+                'start_time': activity.start_time.isoformat().replace('+00:00', 'Z') if activity.start_time else None,
+                'end_time': activity.end_time.isoformat().replace('+00:00', 'Z') if activity.end_time else None,
+                'max_participants': activity.max_participants,
+                'current_participants': projection.booked_count(activity.id),
+                'booking_counts': projection.booking_counts(activity.id),
+                'tags': getattr(activity, 'tags', None),
+                'status': activity.status,
+                'role': 'organizer',
+                'created_at': activity.created_at.isoformat().replace('+00:00', 'Z') if activity.created_at else None,
+                'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z') if activity.updated_at else None
+            }
+            result_list.append(item)
+            listed_ids.add(activity.id)
+
+        for booking, activity in zip(participant_bookings, participant_activities):
+            if not activity or activity.id in listed_ids:
+                continue
+            item = {
+                'id': activity.id,
+                'title': activity.title,
+                'description': activity.description,
+                'location': activity.location,
+                'start_time': activity.start_time.isoformat().replace('+00:00', 'Z') if activity.start_time else None,
+                'end_time': activity.end_time.isoformat().replace('+00:00', 'Z') if activity.end_time else None,
+                'max_participants': activity.max_participants,
+                'current_participants': projection.booked_count(activity.id),
+                'tags': getattr(activity, 'tags', None),
+                'status': activity.status,
+                'role': 'participant',
+                'booking_status': booking.status,
+                'booking_time': booking.booking_time.isoformat().replace('+00:00', 'Z') if booking.booking_time else None,
+                'created_at': activity.created_at.isoformat().replace('+00:00', 'Z') if activity.created_at else None,
+                'updated_at': activity.updated_at.isoformat().replace('+00:00', 'Z') if activity.updated_at else None
+            }
+            result_list.append(item)
+            listed_ids.add(activity.id)
 
         result_list.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
 
@@ -5,6 +5,7 @@ from datetime import datetime  # 导入datetime模块
 from components import token_required, LocalImageStorage, db  # 新增db导入
 from components.models import Admin, User, ScienceArticle, Activity, ScienceArticleLike, ScienceArticleVisit, Attachment  # 导入模型
 from components.response_service import ResponseService, UserInfoService, format_datetime, handle_api_exception
+from components.principal_cache import invalidate_principal
 from common import common_bp
 from sqlalchemy.exc import SQLAlchemyError  # 导入SQLAlchemy的错误处理
 
@@ -139,6 +140,7 @@ def upload_user_avatar(current_user):
         # 更新新头像URL
         old_record.avatar = save_result['url']
         db.session.commit()
+        invalidate_principal(old_record)
         print(f"【头像上传成功】{table_name} ID: {record_id}, 新头像URL: {save_result['url']}")
 
         return jsonify({
@@ -293,6 +295,7 @@ def update_user_basic_info(current_user):
     try:
         updated_count = target_user.__class__.query.filter_by(id=target_user.id).update(update_data)
         db.session.commit()
+        invalidate_principal(target_user)
 
         print(f"【用户信息更新成功】用户: {target_user.account}, 更新字段数: {len(update_data)}")
 
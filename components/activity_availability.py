@@ -0,0 +1,205 @@
+# ./components/activity_availability.py
+
+"""
+活动可用性缓存
+预约开放期间客户端持续轮询公开的可用性接口，每次轮询都加载活动并统计预约人数。此处按活动缓存可用性快照：
+
+- 快照包含剩余名额、活动状态、是否可预约与版本号（version，本进程内每次失效后递增），
+  缓存 ACTIVITY_AVAILABILITY_CACHE_TTL 秒（TTL + LRU），活动不存在也缓存，避免无效ID穿透
+- 缓存失效后同一活动只有一个请求查询数据库（一条语句：活动列 + 已预约人数子查询），其余等待共享结果
+- 失效：预约、取消、修改预约状态（components.seat_reservation）与 ORM 修改活动（Activity after_update/after_delete）
+  把活动ID记入会话，事务提交后才失效（回滚则丢弃），并发轮询不会把未提交的旧值重新缓存
+- 接口按快照内容（不含版本号）生成 ETag，多进程部署时各进程的 ETag 一致；If-None-Match 命中返回 304
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from config import Config
+from components.models import db
+from components.single_flight import Flight
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 会话中待失效的活动ID（session.info 键）
+PENDING_KEY = 'activity_availability_pending'
+
+
+def touch(activity_id, session=None):
+    """记录活动可用性已修改（所在事务提交后失效缓存）"""
+    session = session if session is not None else db.session
+    session.info.setdefault(PENDING_KEY, set()).add(activity_id)
+
+
+class ActivityAvailabilityCache:
+    """按活动ID缓存可用性快照的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl=5, max_size=10000, wait_timeout=10):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        # 活动ID -> (过期时间, (快照, ETag) 或 None)
+        self._entries = OrderedDict()
+        # 活动ID -> 版本号
+        self._versions = {}
+        self._inflight = {}
+        self._listeners_registered = False
+        self._stats = {'hits': 0, 'misses': 0, 'shared': 0, 'invalidations': 0, 'evictions': 0}
+
+    def init_app(self, app):
+        """注册活动写入与会话提交事件"""
+        self.register_listeners()
+
+    def register_listeners(self):
+        """注册事件（只注册一次）"""
+        if self._listeners_registered:
+            return
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        from components.models import Activity
+
+        def _activity_changed(mapper, connection, target):
+            session = db.inspect(target).session
+            if session is not None:
+                touch(target.id, session)
+
+        def _after_commit(session):
+            for activity_id in session.info.pop(PENDING_KEY, ()):
+                self.invalidate(activity_id)
+
+        def _after_rollback(session):
+            session.info.pop(PENDING_KEY, None)
+
+        event.listen(Activity, 'after_update', _activity_changed)
+        event.listen(Activity, 'after_delete', _activity_changed)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_rollback', _after_rollback)
+        self._listeners_registered = True
+
+    # ========== 读取 ==========
+
+    def get(self, activity_id):
+        """
+        读取活动可用性（缓存失效时计算或等待进行中的计算）
+
+        Returns:
+            tuple[dict, str] | None: (快照, ETag)，活动不存在时为 None（调用方不应修改快照）
+        """
+        with self._lock:
+            entry = self._entries.get(activity_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(activity_id)
+                self._stats['hits'] += 1
+                return entry[1]
+            flight = self._inflight.get(activity_id)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[activity_id] = Flight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['shared'] += 1
+            version = self._versions.get(activity_id, 0)
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                raise TimeoutError('活动可用性查询超时')
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            value = self.compute(activity_id, version)
+            flight.result = value
+            with self._lock:
+                # 计算期间已失效的结果不写入缓存
+                if self._versions.get(activity_id, 0) == version:
+                    self._entries[activity_id] = (time.monotonic() + self.ttl, value)
+                    self._entries.move_to_end(activity_id)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self._stats['evictions'] += 1
+            return value
+        except Exception as e:
+            flight.error = e
+            logger.warning("【活动可用性查询失败】活动#%s: %s", activity_id, str(e))
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(activity_id, None)
+            flight.event.set()
+
+    def compute(self, activity_id, version=0):
+        """查询活动与已预约人数并组装快照（需在应用上下文中调用）"""
+        from components.models import Activity, ActivityBooking
+
+        activities = Activity.__table__
+        if Config.ACTIVITY_PARTICIPANTS_FROM_COUNTER:
+            booked = db.func.coalesce(activities.c.current_participants, 0)
+        else:
+            bookings = ActivityBooking.__table__
+            booked = db.select(db.func.count()).where(
+                bookings.c.activity_id == activities.c.id, bookings.c.status == 'booked'
+            ).scalar_subquery()
+        row = db.session.execute(db.select(
+            activities.c.title, activities.c.status, activities.c.start_time, activities.c.end_time,
+            activities.c.max_participants, booked.label('booked')
+        ).where(activities.c.id == activity_id)).first()
+        if row is None:
+            return None
+
+        # 与 ActivityValidator.is_activity_bookable 的判断顺序一致
+        current_booked = row.booked or 0
+        error_msg = None
+        if row.status != 'published':
+            error_msg = f"当前活动状态({row.status})不允许预约"
+        elif row.end_time and row.end_time < datetime.now():
+            error_msg = "活动已结束，无法预约"
+        elif row.max_participants and current_booked >= row.max_participants:
+            error_msg = "活动预约人数已满"
+
+        snapshot = {
+            'activity_id': activity_id,
+            'title': row.title,
+            'status': row.status,
+            'start_time': row.start_time.isoformat().replace('+00:00', 'Z'),
+            'end_time': row.end_time.isoformat().replace('+00:00', 'Z'),
+            'max_participants': row.max_participants,
+            'current_booked': current_booked,
+            'available_spots': max(0, row.max_participants - current_booked) if row.max_participants else None,
+            'is_bookable': error_msg is None,
+            'error_message': error_msg,
+            'booking_deadline': row.end_time.isoformat().replace('+00:00', 'Z') if row.end_time else None
+        }
+        digest = hashlib.sha1(json.dumps(snapshot, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        snapshot['version'] = version
+        return snapshot, digest[:20]
+
+    # ========== 失效 ==========
+
+    def invalidate(self, activity_id):
+        """使活动的缓存失效并递增版本号"""
+        with self._lock:
+            self._entries.pop(activity_id, None)
+            self._versions[activity_id] = self._versions.get(activity_id, 0) + 1
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """获取缓存状态"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), ttl=self.ttl, max_size=self.max_size)
+
+
+# 进程级单例
+availability_cache = ActivityAvailabilityCache(
+    ttl=Config.ACTIVITY_AVAILABILITY_CACHE_TTL,
+    max_size=Config.ACTIVITY_AVAILABILITY_CACHE_MAX_SIZE
+)
@@ -0,0 +1,265 @@
+# ./components/activity_lifecycle.py
+
+"""
+活动生命周期调度
+活动的"即将开始/进行中/已结束"在每次请求时逐行计算，没有任何任务把已结束的 published 活动批量改为 completed，
+按状态筛选会返回过期数据。此处按集合执行状态迁移：
+
+- 已结束活动：status = 'published' AND end_time < 当前时间 -> completed
+- 过期草稿：status = 'draft' AND start_time < 当前时间 -> cancelled（ACTIVITY_LIFECYCLE_CANCEL_STALE_DRAFTS）
+- 到期公告：expiration <= 当前 UTC 时间且尚未标记到期 -> status = 'EXPIRED', is_expired = True
+  （与 Notice.check_expiration 一致，公告时间为 UTC naive）
+- 活动迁移按主键分批：一条查询取一批ID，一条条件 UPDATE 迁移，同一事务把这些活动仍在候补中的记录改为 expired，
+  提交后失效活动可用性缓存；条件 UPDATE 可重复执行，多个进程同时执行也不会重复迁移
+
+运行方式：
+- 进程内定时：init_app 启动后台线程，每 ACTIVITY_LIFECYCLE_INTERVAL 秒执行一次；
+  多进程部署时通过 scheduler_leases 表的租约选出一个进程执行（条件 UPDATE 获取/续期，
+  主节点失联超过 ACTIVITY_LIFECYCLE_LEASE_TTL 秒后由其他进程接管）
+- 命令行：scripts/activity_lifecycle_tick.py 执行一次（适合 cron）
+"""
+
+import atexit
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 租约名称
+LEASE_NAME = 'activity_lifecycle'
+
+
+def _owner_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def acquire_lease(name, owner, ttl, now=None):
+    """
+    获取或续期租约（已由自己持有或已过期时成功）
+
+    Returns:
+        bool: 当前进程是否持有租约
+    """
+    from components.models import SchedulerLease
+
+    leases = SchedulerLease.__table__
+    now = now or datetime.now()
+    expires_at = now + timedelta(seconds=ttl)
+    try:
+        acquired = db.session.execute(leases.update().where(
+            leases.c.name == name, db.or_(leases.c.owner == owner, leases.c.expires_at < now)
+        ).values(owner=owner, expires_at=expires_at, updated_at=now)).rowcount == 1
+        if not acquired:
+            exists = db.session.execute(db.select(leases.c.name).where(leases.c.name == name)).first()
+            if exists is None:
+                db.session.execute(leases.insert().values(name=name, owner=owner, expires_at=expires_at, updated_at=now))
+                acquired = True
+        db.session.commit()
+        return acquired
+    except IntegrityError:
+        # 其他进程同时创建了租约
+        db.session.rollback()
+        return False
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def release_lease(name, owner):
+    """释放自己持有的租约（进程退出时调用，其他进程无需等待租约过期）"""
+    from components.models import SchedulerLease
+
+    leases = SchedulerLease.__table__
+    try:
+        db.session.execute(leases.update().where(
+            leases.c.name == name, leases.c.owner == owner
+        ).values(expires_at=datetime.now()))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def _transition_activities(from_status, to_status, time_column, now, chunk_size):
+    """
+    按主键分批迁移活动状态，返回 (迁移的活动数, 过期的候补记录数)
+    """
+    from components.models import Activity, ActivityWaitlist
+    from components import activity_availability
+
+    activities = Activity.__table__
+    waitlist = ActivityWaitlist.__table__
+    changed = expired = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(db.select(activities.c.id).where(
+            activities.c.status == from_status, activities.c[time_column] < now, activities.c.id > last_id
+        ).order_by(activities.c.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        try:
+            changed += db.session.execute(activities.update().where(
+                activities.c.id.in_(ids), activities.c.status == from_status
+            ).values(status=to_status, updated_at=now)).rowcount
+            expired += db.session.execute(waitlist.update().where(
+                waitlist.c.activity_id.in_(ids), waitlist.c.status == 'waiting'
+            ).values(status='expired')).rowcount
+            for activity_id in ids:
+                activity_availability.touch(activity_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        last_id = ids[-1]
+        if len(ids) < chunk_size:
+            break
+    return changed, expired
+
+
+def expire_notices(now_utc=None):
+    """到期公告批量标记为 EXPIRED，返回更新行数"""
+    from components.models import Notice
+
+    notices = Notice.__table__
+    now_utc = now_utc or datetime.utcnow()
+    try:
+        count = db.session.execute(notices.update().where(
+            notices.c.expiration.isnot(None),
+            notices.c.expiration <= now_utc,
+            db.or_(notices.c.is_expired.is_(False), notices.c.status != 'EXPIRED')
+        ).values(status='EXPIRED', is_expired=True, update_time=notices.c.update_time)).rowcount
+        db.session.commit()
+        return count
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+class ActivityLifecycleScheduler:
+    """活动生命周期定时任务（进程内定时 + 租约选主）"""
+
+    def __init__(self, enabled=True, interval=60, lease_ttl=180, chunk_size=500, cancel_stale_drafts=True):
+        self.enabled = enabled
+        self.interval = interval
+        self.lease_ttl = lease_ttl
+        self.chunk_size = chunk_size
+        self.cancel_stale_drafts = cancel_stale_drafts
+        self.owner = _owner_id()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._is_leader = False
+        self._stats = {
+            'runs': 0,
+            'skipped_not_leader': 0,
+            'failures': 0,
+            'completed': 0,
+            'drafts_cancelled': 0,
+            'waitlist_expired': 0,
+            'notices_expired': 0,
+            'last_run_ms': None,
+            'last_run_at': None
+        }
+
+    def init_app(self, app):
+        """绑定应用并启动后台定时线程（测试环境不启动）"""
+        self._app = app
+        if app.testing or not self.enabled or self.interval <= 0 or self._thread is not None:
+            return
+
+        def _loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    with app.app_context():
+                        self.run_if_leader()
+                except Exception as e:
+                    with self._lock:
+                        self._stats['failures'] += 1
+                    logger.warning("【活动生命周期调度失败】%s", str(e))
+
+        self._thread = threading.Thread(target=_loop, name='activity-lifecycle', daemon=True)
+        self._thread.start()
+
+    def run_if_leader(self):
+        """持有租约时执行一次，返回本次迁移结果（未持有租约时为 None）"""
+        leader = acquire_lease(LEASE_NAME, self.owner, self.lease_ttl)
+        with self._lock:
+            self._is_leader = leader
+            if not leader:
+                self._stats['skipped_not_leader'] += 1
+        return self.tick() if leader else None
+
+    def tick(self, now=None):
+        """
+        执行一次状态迁移（需在应用上下文中调用）
+
+        Returns:
+            dict: 各类迁移的行数
+        """
+        started = time.perf_counter()
+        now = now or datetime.now()
+        result = {'completed': 0, 'drafts_cancelled': 0, 'waitlist_expired': 0, 'notices_expired': 0}
+
+        completed, expired = _transition_activities('published', 'completed', 'end_time', now, self.chunk_size)
+        result['completed'] = completed
+        result['waitlist_expired'] += expired
+        if self.cancel_stale_drafts:
+            cancelled, expired = _transition_activities('draft', 'cancelled', 'start_time', now, self.chunk_size)
+            result['drafts_cancelled'] = cancelled
+            result['waitlist_expired'] += expired
+        result['notices_expired'] = expire_notices()
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            self._stats['runs'] += 1
+            for key, value in result.items():
+                self._stats[key] += value
+            self._stats['last_run_ms'] = elapsed_ms
+            self._stats['last_run_at'] = now.isoformat()
+        if any(result.values()):
+            logger.info("【活动生命周期】活动结束: %s, 草稿取消: %s, 候补过期: %s, 公告到期: %s, 耗时: %sms",
+                        result['completed'], result['drafts_cancelled'], result['waitlist_expired'],
+                        result['notices_expired'], elapsed_ms)
+        return result
+
+    def shutdown(self):
+        """停止定时线程并释放租约"""
+        self._stop.set()
+        if self._app is None or not self._is_leader:
+            return
+        try:
+            with self._app.app_context():
+                release_lease(LEASE_NAME, self.owner)
+        except Exception as e:
+            logger.warning("【活动生命周期租约释放失败】%s", str(e))
+
+    def get_stats(self):
+        """获取调度状态"""
+        with self._lock:
+            return dict(
+                self._stats,
+                enabled=self.enabled,
+                interval=self.interval,
+                running=self._thread is not None,
+                is_leader=self._is_leader,
+                owner=self.owner
+            )
+
+
+# 进程级单例
+lifecycle_scheduler = ActivityLifecycleScheduler(
+    enabled=Config.ACTIVITY_LIFECYCLE_ENABLED,
+    interval=Config.ACTIVITY_LIFECYCLE_INTERVAL,
+    lease_ttl=Config.ACTIVITY_LIFECYCLE_LEASE_TTL,
+    chunk_size=Config.ACTIVITY_LIFECYCLE_CHUNK_SIZE,
+    cancel_stale_drafts=Config.ACTIVITY_LIFECYCLE_CANCEL_STALE_DRAFTS
+)
+atexit.register(lifecycle_scheduler.shutdown)
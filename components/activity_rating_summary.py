@@ -0,0 +1,236 @@
+# ./components/activity_rating_summary.py
+
+"""
+活动评分汇总表维护
+评分统计接口原先每次请求都对 activity_rating 执行 AVG/MIN/MAX 与 5 个星级的条件求和。此处维护汇总表
+activity_rating_summary（每个活动一行），读取评分统计只需一次主键查询：
+
+- 评分写入：ActivityRating 的 after_insert/after_update/after_delete 事件中，按评分写入前后的 (活动, 分数)
+  计算评分数、总分与星级人数的增量，在同一事务中 upsert 到汇总表（发表、修改分数、删除评分均覆盖）
+- 最低/最高分：增量写入后在同一事务中按星级人数重算（CASE WHEN star_1 > 0 THEN 1 ...），删除评分后依然准确
+- 活动删除时汇总行随外键级联删除
+- 对账：rebuild() 从评分表重新聚合并整表替换，返回与原汇总表不一致的行数（scripts/rebuild_activity_rating_summary.py）；
+  上线前的存量评分与绕过 ORM 直接修改评分表后需执行对账
+"""
+
+import threading
+from datetime import datetime
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 星级（评分值 1-5）
+STARS = (1, 2, 3, 4, 5)
+
+# 增量维护的计数列
+COUNT_COLUMNS = ('rating_count', 'score_sum') + tuple(f'star_{star}' for star in STARS)
+
+# 写入前需要取得旧值的评分字段（计算增量用）
+TRACKED_FIELDS = ('activity_id', 'score')
+
+
+def _merge(deltas, activity_id, score, sign=1):
+    """把一条评分的贡献合并到 deltas[activity_id]"""
+    if activity_id is None or score is None:
+        return
+    bucket = deltas.setdefault(activity_id, dict.fromkeys(COUNT_COLUMNS, 0))
+    bucket['rating_count'] += sign
+    bucket['score_sum'] += sign * score
+    if score in STARS:
+        bucket[f'star_{score}'] += sign
+
+
+def _previous_values(target):
+    """评分在本次写入之前的字段值（未修改的字段取当前值）"""
+    state = db.inspect(target)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    return values
+
+
+def _score_bounds(table):
+    """按星级人数计算最低/最高分的表达式"""
+    min_score = db.case(*[(table.c[f'star_{star}'] > 0, star) for star in STARS], else_=None)
+    max_score = db.case(*[(table.c[f'star_{star}'] > 0, star) for star in reversed(STARS)], else_=None)
+    return min_score, max_score
+
+
+def _upsert_deltas(connection, deltas):
+    """按数据库方言把增量 upsert 到汇总表，再重算受影响活动的最低/最高分"""
+    from components.db_compatibility import upsert_increments
+    from components.models import ActivityRatingSummary
+
+    table = ActivityRatingSummary.__table__
+    now = datetime.now()
+    rows = [
+        dict(values, activity_id=activity_id, updated_at=now)
+        for activity_id, values in deltas.items() if any(values.values())
+    ]
+    if not rows:
+        return 0
+
+    upsert_increments(connection, table, rows, ('activity_id',), COUNT_COLUMNS, ('updated_at',))
+
+    min_score, max_score = _score_bounds(table)
+    connection.execute(table.update().where(
+        table.c.activity_id.in_([row['activity_id'] for row in rows])
+    ).values(min_score=min_score, max_score=max_score, updated_at=table.c.updated_at))
+    return len(rows)
+
+
+class ActivityRatingRollup:
+    """活动评分汇总表的增量维护、读取与对账"""
+
+    def __init__(self):
+        self._listeners_registered = False
+        self._lock = threading.Lock()
+        self._stats = {'rating_events': 0, 'reads': 0, 'failures': 0, 'rebuilds': 0, 'last_drift': None}
+
+    def init_app(self, app):
+        """注册评分写入事件"""
+        self.register_listeners()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # ========== 增量维护 ==========
+
+    def register_listeners(self):
+        """为 ActivityRating 注册写入事件（只注册一次）"""
+        if self._listeners_registered:
+            return
+        from sqlalchemy import event
+        from components.models import ActivityRating
+
+        # 修改字段时加载旧值（对象过期后直接赋值也能得到写入前的值）
+        for field in TRACKED_FIELDS:
+            event.listen(getattr(ActivityRating, field), 'set', lambda target, value, oldvalue, initiator: None,
+                         active_history=True)
+        event.listen(ActivityRating, 'after_insert', self._after_insert)
+        event.listen(ActivityRating, 'after_update', self._after_update)
+        event.listen(ActivityRating, 'after_delete', self._after_delete)
+        self._listeners_registered = True
+
+    def _apply_rating_event(self, connection, target, deltas):
+        try:
+            # 在保存点内写入：失败时只回滚保存点（PostgreSQL 中失败语句会使整个事务中止）
+            with connection.begin_nested():
+                _upsert_deltas(connection, deltas)
+            self._count('rating_events')
+        except Exception as e:
+            # 汇总表写入失败不影响评分写入，可通过对账修复
+            self._count('failures')
+            logger.warning("【评分汇总更新失败】评分#%s: %s", target.id, str(e))
+
+    def _after_insert(self, mapper, connection, target):
+        deltas = {}
+        _merge(deltas, target.activity_id, target.score)
+        self._apply_rating_event(connection, target, deltas)
+
+    def _after_update(self, mapper, connection, target):
+        state = db.inspect(target)
+        if not any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS):
+            return
+        previous = _previous_values(target)
+        deltas = {}
+        _merge(deltas, previous['activity_id'], previous['score'], sign=-1)
+        _merge(deltas, target.activity_id, target.score)
+        self._apply_rating_event(connection, target, deltas)
+
+    def _after_delete(self, mapper, connection, target):
+        previous = _previous_values(target)
+        deltas = {}
+        _merge(deltas, previous['activity_id'], previous['score'], sign=-1)
+        self._apply_rating_event(connection, target, deltas)
+
+    # ========== 读取 ==========
+
+    def get_summary(self, activity_id):
+        """
+        读取活动的评分汇总（活动与汇总行一次主键查询）
+
+        Returns:
+            dict | None: 汇总字段（没有评分时计数为0、最低/最高分为 None），活动不存在时为 None
+        """
+        from components.models import Activity, ActivityRatingSummary
+
+        activities = Activity.__table__
+        table = ActivityRatingSummary.__table__
+        row = db.session.execute(
+            db.select(activities.c.id, *[table.c[column] for column in COUNT_COLUMNS + ('min_score', 'max_score')])
+            .select_from(activities.outerjoin(table, table.c.activity_id == activities.c.id))
+            .where(activities.c.id == activity_id)
+        ).first()
+        self._count('reads')
+        if row is None:
+            return None
+        summary = {column: getattr(row, column) or 0 for column in COUNT_COLUMNS}
+        summary['min_score'] = row.min_score
+        summary['max_score'] = row.max_score
+        return summary
+
+    # ========== 对账 ==========
+
+    def rebuild(self):
+        """
+        从评分表重新聚合并整表替换汇总表（同一事务）
+
+        Returns:
+            dict: {'rows': 重建后的汇总行数, 'drift': 与原汇总表不一致的行数}
+        """
+        from components.models import ActivityRating, ActivityRatingSummary
+
+        ratings = ActivityRating.__table__
+        table = ActivityRatingSummary.__table__
+        star_counts = [
+            db.func.sum(db.case((ratings.c.score == star, 1), else_=0)).label(f'star_{star}') for star in STARS
+        ]
+        expected = {}
+        for row in db.session.execute(db.select(
+            ratings.c.activity_id,
+            db.func.count(ratings.c.id).label('rating_count'),
+            db.func.sum(ratings.c.score).label('score_sum'),
+            *star_counts
+        ).group_by(ratings.c.activity_id)):
+            expected[row.activity_id] = tuple(int(getattr(row, column) or 0) for column in COUNT_COLUMNS)
+        current = {
+            row.activity_id: tuple(getattr(row, column) for column in COUNT_COLUMNS)
+            for row in db.session.execute(db.select(table.c.activity_id, *[table.c[column] for column in COUNT_COLUMNS]))
+        }
+        empty = (0,) * len(COUNT_COLUMNS)
+        drift = sum(1 for key in set(expected) | set(current)
+                    if expected.get(key, empty) != current.get(key, empty))
+
+        now = datetime.now()
+        try:
+            db.session.execute(table.delete())
+            if expected:
+                db.session.execute(table.insert(), [
+                    dict(zip(COUNT_COLUMNS, values), activity_id=activity_id, updated_at=now)
+                    for activity_id, values in expected.items()
+                ])
+                min_score, max_score = _score_bounds(table)
+                db.session.execute(table.update().values(min_score=min_score, max_score=max_score))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        with self._lock:
+            self._stats['rebuilds'] += 1
+            self._stats['last_drift'] = drift
+        logger.info("【评分汇总对账完成】汇总行数: %s, 不一致行数: %s", len(expected), drift)
+        return {'rows': len(expected), 'drift': drift}
+
+    def get_stats(self):
+        """获取汇总表维护状态"""
+        with self._lock:
+            return dict(self._stats)
+
+
+# 进程级单例
+rating_summary = ActivityRatingRollup()
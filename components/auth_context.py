@@ -0,0 +1,99 @@
+# ./components/auth_context.py
+
+"""
+请求级认证解析
+同一请求内 JWT 只解码一次、主体与管理员记录只加载一次，结果保存在 flask.g 上，
+token_required、require_permission 以及各模块的管理员装饰器都读取这份结果。
+"""
+
+import jwt
+from flask import g, request
+from config import Config
+from components.principal_cache import load_principal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 解析失败原因
+AUTH_ERROR_MISSING = 'missing'      # 缺少令牌
+AUTH_ERROR_EXPIRED = 'expired'      # 令牌已过期
+AUTH_ERROR_INVALID = 'invalid'      # 令牌格式无效
+AUTH_ERROR_NOT_FOUND = 'not_found'  # 令牌有效但用户不存在
+
+
+class AuthContext:
+    """一次请求的认证解析结果"""
+
+    def __init__(self, payload=None, principal=None, admin=None, error=None):
+        self.payload = payload
+        self.principal = principal
+        self.admin = admin
+        self.error = error
+
+    @property
+    def is_authenticated(self):
+        return self.error is None and self.principal is not None
+
+    @property
+    def user_type(self):
+        """主体类型：'admin'（admin_info 记录）或 'user'（user_info 记录）"""
+        if not self.is_authenticated:
+            return None
+        return 'admin' if self.principal is self.admin else 'user'
+
+    @property
+    def role(self):
+        """主体角色（USER/ORG_USER/ADMIN/SUPER_ADMIN）"""
+        if not self.is_authenticated:
+            return None
+        return getattr(self.principal, 'role', None) or 'USER'
+
+    @property
+    def is_admin(self):
+        """主体是否拥有管理员记录"""
+        return self.is_authenticated and self.admin is not None
+
+
+def _extract_bearer_token():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        return None
+    if auth_header.startswith('Bearer '):
+        return auth_header[7:]
+    return auth_header
+
+
+def _resolve():
+    token = _extract_bearer_token()
+    if not token:
+        return AuthContext(error=AUTH_ERROR_MISSING)
+
+    try:
+        payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return AuthContext(error=AUTH_ERROR_EXPIRED)
+    except jwt.InvalidTokenError as e:
+        logger.warning("【令牌验证失败】令牌格式错误: %s", str(e))
+        return AuthContext(error=AUTH_ERROR_INVALID)
+
+    if 'user_id' not in payload:
+        return AuthContext(payload=payload, error=AUTH_ERROR_INVALID)
+
+    principal, admin = load_principal(payload.get('role'), payload['user_id'])
+    if principal is None:
+        return AuthContext(payload=payload, error=AUTH_ERROR_NOT_FOUND)
+    return AuthContext(payload=payload, principal=principal, admin=admin)
+
+
+def get_auth_context():
+    """
+    获取当前请求的认证解析结果（同一请求内只解析一次）
+
+    Returns:
+        AuthContext: 未登录或令牌无效时 error 字段记录失败原因
+    """
+    ctx = g.get('auth_context')
+    if ctx is None:
+        ctx = _resolve()
+        g.auth_context = ctx
+    return ctx
@@ -0,0 +1,451 @@
+# ./components/booking_admission.py
+
+"""
+活动预约排队（准入层）
+热门活动开放预约时，所有请求同时进入数据库争抢同一活动行。此处在预约接口与名额预约引擎之间加一层进程内排队：
+
+- 预约请求进入所属活动的有界队列（BOOKING_QUEUE_MAX_PENDING），立即得到排队凭证（ticket）
+- 后台线程池（BOOKING_QUEUE_WORKERS）按活动取出请求，每批 BOOKING_QUEUE_BATCH_SIZE 个交给
+  seat_reservation.reserve_batch 一次写入；同一活动同一时间只有一个线程写入，数据库写入并发受线程数限制
+- 预约接口等待 BOOKING_QUEUE_SYNC_WAIT 秒，期间完成的直接返回结果，否则返回凭证；
+  客户端凭凭证轮询或长轮询（等待状态变化，最长 BOOKING_QUEUE_POLL_TIMEOUT 秒）
+- 队列已满或名额已满的请求写入候补名单（activity_waitlist 表，持久化）；
+  取消预约等释放名额后调用 schedule_promotion，后台按加入顺序把候补转为预约
+- 凭证与队列为进程级数据，多进程部署时凭证只能在受理的进程查询（候补名单与预约记录不受影响）；
+  进程退出时等待已排队的请求写入完成
+- 未启动线程池时（测试环境或 BOOKING_QUEUE_WORKERS 为 0）在提交请求的线程内同步写入
+"""
+
+import atexit
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from components.models import db
+from components import seat_reservation
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 凭证状态
+TICKET_QUEUED = 'queued'
+TICKET_BOOKED = 'booked'
+TICKET_WAITLISTED = 'waitlisted'
+TICKET_REJECTED = 'rejected'
+
+
+class BookingTicket:
+    """一个预约请求的排队凭证"""
+
+    def __init__(self, activity_id, user_account, notes=''):
+        self.id = uuid.uuid4().hex
+        self.activity_id = activity_id
+        self.user_account = user_account
+        self.notes = notes
+        self.status = TICKET_QUEUED
+        # 名额预约引擎的结果（seat_reservation.RESERVE_*）
+        self.result = None
+        self.booking_id = None
+        self.message = '预约排队中'
+        self.created_at = datetime.now()
+        self.updated_at = time.monotonic()
+
+    def to_dict(self):
+        return {
+            'ticket_id': self.id,
+            'activity_id': self.activity_id,
+            'status': self.status,
+            'result': self.result,
+            'booking_id': self.booking_id,
+            'message': self.message,
+            'created_at': self.created_at.isoformat().replace('+00:00', 'Z')
+        }
+
+
+# ========== 候补名单 ==========
+
+def join_waitlist(activity_id, entries):
+    """
+    把预约请求写入候补名单（已在候补中的保持原顺序，已退出/已转正的重新排到末尾）
+
+    Args:
+        activity_id: 活动ID
+        entries: [(用户账号, 备注)]
+    """
+    from components.models import ActivityWaitlist
+
+    table = ActivityWaitlist.__table__
+    entries = dict(entries)
+    if not entries:
+        return
+    for attempt in range(2):
+        now = datetime.now()
+        try:
+            existing = dict(db.session.execute(db.select(table.c.user_account, table.c.status).where(
+                table.c.activity_id == activity_id, table.c.user_account.in_(list(entries))
+            )).all())
+            for account, notes in entries.items():
+                if existing.get(account) not in (None, 'waiting'):
+                    db.session.execute(table.update().where(
+                        table.c.activity_id == activity_id, table.c.user_account == account
+                    ).values(status='waiting', notes=notes, queued_at=now, booking_id=None, promoted_at=None))
+            new_rows = [{'activity_id': activity_id, 'user_account': account, 'status': 'waiting',
+                         'notes': notes, 'queued_at': now}
+                        for account, notes in entries.items() if account not in existing]
+            if new_rows:
+                db.session.execute(table.insert(), new_rows)
+            db.session.commit()
+            return
+        except IntegrityError:
+            # 并发写入了同一用户的候补记录，重新读取后再写一次
+            db.session.rollback()
+            if attempt:
+                raise
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def leave_waitlist(activity_id, user_account):
+    """退出候补名单，返回是否退出成功"""
+    from components.models import ActivityWaitlist
+
+    table = ActivityWaitlist.__table__
+    try:
+        left = db.session.execute(table.update().where(
+            table.c.activity_id == activity_id, table.c.user_account == user_account, table.c.status == 'waiting'
+        ).values(status='cancelled')).rowcount == 1
+        db.session.commit()
+        return left
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def get_waitlist_entry(activity_id, user_account):
+    """
+    读取用户的候补记录及排位
+
+    Returns:
+        tuple[ActivityWaitlist | None, int | None]: (候补记录, 候补中的排位（从1开始）)
+    """
+    from components.models import ActivityWaitlist
+
+    entry = ActivityWaitlist.query.filter_by(activity_id=activity_id, user_account=user_account).first()
+    if entry is None or entry.status != 'waiting':
+        return entry, None
+    ahead = ActivityWaitlist.query.filter(
+        ActivityWaitlist.activity_id == activity_id,
+        ActivityWaitlist.status == 'waiting',
+        db.or_(ActivityWaitlist.queued_at < entry.queued_at,
+               db.and_(ActivityWaitlist.queued_at == entry.queued_at, ActivityWaitlist.id < entry.id))
+    ).count()
+    return entry, ahead + 1
+
+
+class BookingAdmissionQueue:
+    """按活动分队列的预约准入层"""
+
+    def __init__(self, enabled=True, max_pending=500, batch_size=50, workers=4, poll_timeout=30, ticket_ttl=600):
+        self.enabled = enabled
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.workers = workers
+        self.poll_timeout = poll_timeout
+        self.ticket_ttl = ticket_ttl
+        self._lock = threading.Lock()
+        # 凭证状态变化时通知等待方
+        self._changed = threading.Condition(self._lock)
+        # 活动ID -> 待写入的凭证队列
+        self._queues = {}
+        # 正在写入的活动（同一活动只有一个写入任务）
+        self._draining = set()
+        # 需要执行候补转正的活动
+        self._promotion_due = set()
+        # 凭证ID -> 凭证
+        self._tickets = {}
+        # (活动ID, 用户账号) -> 候补中的凭证（转正时更新）
+        self._waitlisted = {}
+        self._last_purge = time.monotonic()
+        self._app = None
+        self._executor = None
+        self._stats = {
+            'submitted': 0, 'booked': 0, 'rejected': 0, 'waitlisted': 0, 'overflow': 0,
+            'batches': 0, 'promoted': 0, 'drain_failures': 0, 'last_batch_ms': None
+        }
+
+    def init_app(self, app):
+        """绑定应用并创建后台写入线程池（测试环境不创建，改为同步写入）"""
+        self._app = app
+        if app.testing or self.workers <= 0 or self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='booking-admission')
+
+    # ========== 凭证 ==========
+
+    def submit(self, activity_id, user_account, notes=''):
+        """
+        提交预约请求（需在应用上下文中调用）
+
+        Returns:
+            BookingTicket: 排队凭证（同步写入或队列已满时返回时已有结果）
+        """
+        ticket = BookingTicket(activity_id, user_account, notes)
+        with self._lock:
+            self._purge_expired()
+            self._stats['submitted'] += 1
+            self._tickets[ticket.id] = ticket
+            queue = self._queues.setdefault(activity_id, deque())
+            overflow = len(queue) >= self.max_pending
+            if not overflow:
+                queue.append(ticket)
+
+        if overflow:
+            self._overflow(ticket)
+        else:
+            self._schedule(activity_id)
+        return ticket
+
+    def get_ticket(self, ticket_id):
+        """读取凭证（不存在或已过期时返回 None）"""
+        with self._lock:
+            return self._tickets.get(ticket_id)
+
+    def wait(self, ticket, known_status=TICKET_QUEUED, timeout=None):
+        """等待凭证状态不再是 known_status（最长 timeout 秒，不超过 poll_timeout）"""
+        timeout = self.poll_timeout if timeout is None else min(max(timeout, 0), self.poll_timeout)
+        with self._changed:
+            self._changed.wait_for(lambda: ticket.status != known_status, timeout)
+        return ticket
+
+    def _resolve(self, ticket, status, result=None, booking_id=None, message=''):
+        with self._changed:
+            ticket.status = status
+            ticket.result = result
+            ticket.booking_id = booking_id
+            ticket.message = message
+            ticket.updated_at = time.monotonic()
+            waitlist_key = (ticket.activity_id, ticket.user_account)
+            if status == TICKET_WAITLISTED:
+                self._waitlisted[waitlist_key] = ticket
+            elif self._waitlisted.get(waitlist_key) is ticket:
+                del self._waitlisted[waitlist_key]
+            self._stats[status] += 1
+            self._changed.notify_all()
+
+    def _resolve_reservation(self, ticket, reservation):
+        if reservation.success:
+            self._resolve(ticket, TICKET_BOOKED, reservation.result, reservation.booking_id, '预约成功')
+        else:
+            self._resolve(ticket, TICKET_REJECTED, reservation.result, message=reservation.message)
+
+    def _purge_expired(self):
+        """在 _lock 内清理过期凭证（排队中的凭证不清理）"""
+        now = time.monotonic()
+        if now - self._last_purge < 10:
+            return
+        self._last_purge = now
+        expired = [ticket_id for ticket_id, ticket in self._tickets.items()
+                   if ticket.status != TICKET_QUEUED and now - ticket.updated_at > self.ticket_ttl]
+        for ticket_id in expired:
+            ticket = self._tickets.pop(ticket_id)
+            if self._waitlisted.get((ticket.activity_id, ticket.user_account)) is ticket:
+                del self._waitlisted[(ticket.activity_id, ticket.user_account)]
+
+    # ========== 写入 ==========
+
+    def _overflow(self, ticket):
+        """队列已满：直接写入候补名单"""
+        from components.models import ActivityBooking
+
+        with self._lock:
+            self._stats['overflow'] += 1
+        try:
+            booked = db.session.query(ActivityBooking.id).filter(
+                ActivityBooking.activity_id == ticket.activity_id,
+                ActivityBooking.user_account == ticket.user_account,
+                ActivityBooking.status != 'cancelled'
+            ).first()
+            if booked:
+                self._resolve(ticket, TICKET_REJECTED, seat_reservation.RESERVE_DUPLICATE, message='您已经预约过该活动')
+                return
+            join_waitlist(ticket.activity_id, [(ticket.user_account, ticket.notes)])
+            self._resolve(ticket, TICKET_WAITLISTED, message='预约人数过多，已加入候补名单')
+        except Exception as e:
+            logger.warning("【预约排队】活动#%s 写入候补名单失败: %s", ticket.activity_id, str(e))
+            self._resolve(ticket, TICKET_REJECTED, message='预约失败，请稍后重试')
+            return
+        # 队列写完后还有名额时由后台转正
+        self.schedule_promotion(ticket.activity_id)
+
+    def schedule_promotion(self, activity_id):
+        """名额释放或候补名单新增后调用：安排该活动的候补转正"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._promotion_due.add(activity_id)
+        self._schedule(activity_id)
+
+    def _schedule(self, activity_id):
+        """安排活动的写入任务（已有任务在写入时由该任务继续处理）"""
+        with self._lock:
+            if activity_id in self._draining:
+                return
+            self._draining.add(activity_id)
+        if self._executor is None:
+            self._drain(activity_id)
+        else:
+            self._executor.submit(self._drain, activity_id)
+
+    def _drain(self, activity_id):
+        """写入任务：分批写入队列中的请求，队列为空后执行候补转正"""
+        app = self._app
+        try:
+            with app.app_context():
+                while True:
+                    with self._lock:
+                        queue = self._queues.get(activity_id)
+                        batch = [queue.popleft() for _ in range(min(self.batch_size, len(queue)))] if queue else []
+                        promote = not batch and activity_id in self._promotion_due
+                        if not batch and not promote:
+                            self._queues.pop(activity_id, None)
+                            self._draining.discard(activity_id)
+                            return
+                        if promote:
+                            self._promotion_due.discard(activity_id)
+                    try:
+                        if batch:
+                            self._write_batch(activity_id, batch)
+                        else:
+                            self.promote(activity_id)
+                    except Exception as e:
+                        db.session.rollback()
+                        with self._lock:
+                            self._stats['drain_failures'] += 1
+                        logger.warning("【预约排队】活动#%s 写入失败: %s", activity_id, str(e))
+                        for ticket in batch:
+                            if ticket.status == TICKET_QUEUED:
+                                self._resolve(ticket, TICKET_REJECTED, message='预约失败，请稍后重试')
+        except Exception:
+            with self._lock:
+                self._draining.discard(activity_id)
+            raise
+
+    def _write_batch(self, activity_id, batch):
+        started = time.perf_counter()
+        results = seat_reservation.reserve_batch(
+            activity_id, [(ticket.user_account, ticket.notes) for ticket in batch]
+        )
+        # 预约已提交，先确定成功与失败的凭证，候补写入失败时只影响名额已满的凭证
+        full = []
+        for ticket, result in zip(batch, results):
+            if result.result == seat_reservation.RESERVE_FULL:
+                full.append(ticket)
+            else:
+                self._resolve_reservation(ticket, result)
+        if full:
+            try:
+                join_waitlist(activity_id, [(ticket.user_account, ticket.notes) for ticket in full])
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self._stats['drain_failures'] += 1
+                logger.warning("【预约排队】活动#%s 加入候补失败: %s", activity_id, str(e))
+                for ticket in full:
+                    self._resolve(ticket, TICKET_REJECTED, seat_reservation.RESERVE_FULL, message='活动预约人数已满')
+            else:
+                for ticket in full:
+                    self._resolve(ticket, TICKET_WAITLISTED, seat_reservation.RESERVE_FULL, message='活动名额已满，已加入候补名单')
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['last_batch_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    def promote(self, activity_id):
+        """
+        按加入顺序把候补转为预约，直到候补为空或名额已满（需在应用上下文中调用）
+
+        Returns:
+            int: 转正的人数
+        """
+        from components.models import ActivityWaitlist
+
+        table = ActivityWaitlist.__table__
+        promoted = 0
+        while True:
+            rows = db.session.execute(db.select(table.c.id, table.c.user_account, table.c.notes).where(
+                table.c.activity_id == activity_id, table.c.status == 'waiting'
+            ).order_by(table.c.queued_at, table.c.id).limit(self.batch_size)).all()
+            db.session.rollback()
+            if not rows:
+                break
+
+            results = seat_reservation.reserve_batch(activity_id, [(row.user_account, row.notes) for row in rows])
+            now = datetime.now()
+            resolved = []
+            for row, result in zip(rows, results):
+                if result.success or result.result == seat_reservation.RESERVE_DUPLICATE:
+                    # 已有有效预约的候补同样视为已转正
+                    values = {'status': 'promoted', 'booking_id': result.booking_id, 'promoted_at': now}
+                elif result.result in (seat_reservation.RESERVE_NOT_FOUND, seat_reservation.RESERVE_UNAVAILABLE):
+                    values = {'status': 'expired'}
+                else:
+                    continue
+                db.session.execute(table.update().where(
+                    table.c.id == row.id, table.c.status == 'waiting'
+                ).values(**values))
+                resolved.append((row.user_account, result))
+            db.session.commit()
+
+            for account, result in resolved:
+                with self._lock:
+                    ticket = self._waitlisted.get((activity_id, account))
+                if ticket is not None:
+                    self._resolve_reservation(ticket, result)
+            count = sum(1 for _, result in resolved if result.success)
+            promoted += count
+            if count:
+                logger.info("【候补转正】活动#%s 转正 %s 人", activity_id, count)
+            # 名额已满（有候补未处理）或候补已取完
+            if len(resolved) < len(rows) or len(rows) < self.batch_size:
+                break
+
+        with self._lock:
+            self._stats['promoted'] += promoted
+        return promoted
+
+    def shutdown(self):
+        """进程退出前等待已排队的请求写入完成"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def get_stats(self):
+        """获取排队状态"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'enabled': self.enabled,
+                'queued': sum(len(queue) for queue in self._queues.values()),
+                'queued_activities': len(self._queues),
+                'tickets': len(self._tickets),
+                'max_pending': self.max_pending,
+                'batch_size': self.batch_size,
+                'workers': self.workers if self._executor is not None else 0
+            })
+            return stats
+
+
+# 进程级单例
+booking_admission = BookingAdmissionQueue(
+    enabled=Config.BOOKING_QUEUE_ENABLED,
+    max_pending=Config.BOOKING_QUEUE_MAX_PENDING,
+    batch_size=Config.BOOKING_QUEUE_BATCH_SIZE,
+    workers=Config.BOOKING_QUEUE_WORKERS,
+    poll_timeout=Config.BOOKING_QUEUE_POLL_TIMEOUT,
+    ticket_ttl=Config.BOOKING_QUEUE_TICKET_TTL
+)
+
+atexit.register(booking_admission.shutdown)
@@ -174,6 +174,50 @@ def get_database_info(db_engine):
         }
 
 
+def upsert_increments(connection, table, rows, key_columns, increment_columns, replace_columns=()):
+    """
+    按数据库方言批量 upsert：不存在的行按 rows 插入，已存在的行累加 increment_columns、以新值覆盖 replace_columns
+
+    MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite/PostgreSQL 使用 INSERT ... ON CONFLICT DO UPDATE
+    （key_columns 上需有唯一约束），其他数据库逐行 UPDATE，未更新到行时 INSERT
+
+    Args:
+        connection: 执行语句的连接（在调用方事务内）
+        table: 目标表
+        rows: [{列名: 值}]，每行包含 key_columns、increment_columns 与 replace_columns
+        key_columns: 唯一约束列
+        increment_columns: 已存在时累加的列
+        replace_columns: 已存在时覆盖的列
+    """
+    if not rows:
+        return
+
+    def _updates(new):
+        values = {column: table.c[column] + new[column] for column in increment_columns}
+        values.update({column: new[column] for column in replace_columns})
+        return values
+
+    db_type = get_database_type()
+    if db_type == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        connection.execute(stmt.on_duplicate_key_update(_updates(stmt.inserted)))
+    elif db_type in ('sqlite', 'postgresql'):
+        if db_type == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        connection.execute(stmt.on_conflict_do_update(index_elements=list(key_columns), set_=_updates(stmt.excluded)))
+    else:
+        for row in rows:
+            result = connection.execute(table.update().where(
+                *[table.c[column] == row[column] for column in key_columns]
+            ).values(_updates(row)))
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(**row))
+
+
 class DatabaseCompatibilityManager:
     """数据库兼容性管理器"""
 
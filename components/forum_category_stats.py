@@ -0,0 +1,258 @@
+# ./components/forum_category_stats.py
+
+"""
+论坛分类统计汇总表维护
+分类统计接口原先每次请求都对 forum_posts 全表 GROUP BY category 并求和。此处维护汇总表
+forum_category_stats（主键 分类 + 状态），接口只读取这张小表：
+
+- 帖子写入：ForumPost 的 after_insert/after_update/after_delete 事件中，按帖子写入前后的
+  (分类, 状态, 浏览数, 点赞数) 计算增量，在同一事务中 upsert 到汇总表（创建、状态变更、改分类、删除均覆盖）
+- 点赞：components.like_engine 调整帖子点赞数成功后，在同一事务中调整所属分类的点赞合计
+- 浏览：components.view_counter 批量落库浏览次数时，在同一事务中按分类合并浏览增量
+- 对账：rebuild() 从帖子表重新聚合并整表替换，返回与原汇总表不一致的行数（scripts/rebuild_forum_category_stats.py）；
+  绕过以上路径直接修改帖子表后需执行对账
+"""
+
+import threading
+from datetime import datetime
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 汇总的计数列
+STAT_COLUMNS = ('post_count', 'total_views', 'total_likes')
+
+# 写入前需要取得旧值的帖子字段（计算增量用）
+TRACKED_FIELDS = ('category', 'status', 'view_count', 'like_count')
+
+
+def _stat_key(category, status):
+    return (category or '', status or 'published')
+
+
+def _merge(deltas, key, values, sign=1):
+    """把一组计数增量合并到 deltas[key]"""
+    bucket = deltas.setdefault(key, dict.fromkeys(STAT_COLUMNS, 0))
+    for column, value in values.items():
+        bucket[column] += sign * (value or 0)
+
+
+def _post_contribution(values):
+    """单个帖子对汇总表的贡献：(汇总键, 计数)"""
+    return _stat_key(values['category'], values['status']), {
+        'post_count': 1,
+        'total_views': values['view_count'] or 0,
+        'total_likes': values['like_count'] or 0
+    }
+
+
+def _previous_values(target):
+    """帖子在本次写入之前的字段值（未修改的字段取当前值）"""
+    state = db.inspect(target)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    return values
+
+
+def _upsert_deltas(connection, deltas):
+    """按数据库方言把增量 upsert 到汇总表（不存在的汇总行以增量作为初始值插入）"""
+    from components.db_compatibility import upsert_increments
+    from components.models import ForumCategoryStats
+
+    table = ForumCategoryStats.__table__
+    now = datetime.now()
+    rows = [
+        dict(values, category=category, status=status, updated_at=now)
+        for (category, status), values in deltas.items() if any(values.values())
+    ]
+    if not rows:
+        return 0
+
+    upsert_increments(connection, table, rows, ('category', 'status'), STAT_COLUMNS, ('updated_at',))
+    return len(rows)
+
+
+class ForumCategoryStatsRollup:
+    """分类统计汇总表的增量维护、读取与对账"""
+
+    def __init__(self):
+        self._listeners_registered = False
+        self._lock = threading.Lock()
+        self._stats = {'post_events': 0, 'counter_updates': 0, 'failures': 0, 'rebuilds': 0, 'last_drift': None}
+
+    def init_app(self, app):
+        """注册帖子写入事件"""
+        self.register_listeners()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # ========== 增量维护 ==========
+
+    def register_listeners(self):
+        """为 ForumPost 注册写入事件（只注册一次）"""
+        if self._listeners_registered:
+            return
+        from sqlalchemy import event
+        from components.models import ForumPost
+
+        # 修改字段时加载旧值（对象过期后直接赋值也能得到写入前的值）
+        for field in TRACKED_FIELDS:
+            event.listen(getattr(ForumPost, field), 'set', lambda target, value, oldvalue, initiator: None,
+                         active_history=True)
+        event.listen(ForumPost, 'after_insert', self._after_insert)
+        event.listen(ForumPost, 'after_update', self._after_update)
+        event.listen(ForumPost, 'after_delete', self._after_delete)
+        self._listeners_registered = True
+
+    def _apply_post_event(self, connection, target, deltas):
+        try:
+            # 在保存点内写入：失败时只回滚保存点（PostgreSQL 中失败语句会使整个事务中止）
+            with connection.begin_nested():
+                _upsert_deltas(connection, deltas)
+            self._count('post_events')
+        except Exception as e:
+            # 汇总表写入失败不影响帖子写入，可通过对账修复
+            self._count('failures')
+            logger.warning("【分类统计更新失败】帖子#%s: %s", target.id, str(e))
+
+    def _after_insert(self, mapper, connection, target):
+        deltas = {}
+        key, values = _post_contribution({field: getattr(target, field) for field in TRACKED_FIELDS})
+        _merge(deltas, key, values)
+        self._apply_post_event(connection, target, deltas)
+
+    def _after_update(self, mapper, connection, target):
+        state = db.inspect(target)
+        if not any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS):
+            return
+        deltas = {}
+        old_key, old_values = _post_contribution(_previous_values(target))
+        new_key, new_values = _post_contribution({field: getattr(target, field) for field in TRACKED_FIELDS})
+        _merge(deltas, old_key, old_values, sign=-1)
+        _merge(deltas, new_key, new_values)
+        self._apply_post_event(connection, target, deltas)
+
+    def _after_delete(self, mapper, connection, target):
+        deltas = {}
+        key, values = _post_contribution(_previous_values(target))
+        _merge(deltas, key, values, sign=-1)
+        self._apply_post_event(connection, target, deltas)
+
+    def apply_counter_deltas(self, connection, column, post_deltas):
+        """
+        按帖子的计数增量调整所属分类的合计（供绕过 ORM 的计数更新调用，在调用方事务内执行）
+
+        Args:
+            connection: 调用方事务所在的连接（db.session.connection() 或 engine.begin() 的连接）
+            column: 汇总列（total_views / total_likes）
+            post_deltas: {帖子ID: 增量}
+        """
+        from components.models import ForumPost
+
+        post_deltas = {post_id: delta for post_id, delta in post_deltas.items() if delta}
+        if not post_deltas:
+            return
+        table = ForumPost.__table__
+        rows = connection.execute(
+            db.select(table.c.id, table.c.category, table.c.status).where(table.c.id.in_(list(post_deltas)))
+        ).all()
+
+        deltas = {}
+        for post_id, category, status in rows:
+            _merge(deltas, _stat_key(category, status), {column: post_deltas[post_id]})
+        _upsert_deltas(connection, deltas)
+        self._count('counter_updates')
+
+    # ========== 读取 ==========
+
+    def get_category_rows(self, status=None):
+        """
+        读取各分类的汇总（status 为 None 时合并所有状态），只返回有帖子的非空分类
+
+        Returns:
+            list[dict]: [{'name', 'post_count', 'total_views', 'total_likes'}]，按分类名排序
+        """
+        from components.models import ForumCategoryStats as Stats
+
+        query = db.session.query(
+            Stats.category,
+            db.func.sum(Stats.post_count).label('post_count'),
+            db.func.sum(Stats.total_views).label('total_views'),
+            db.func.sum(Stats.total_likes).label('total_likes')
+        ).filter(Stats.category != '')
+        if status:
+            query = query.filter(Stats.status == status)
+        rows = query.group_by(Stats.category).having(db.func.sum(Stats.post_count) > 0).order_by(Stats.category)
+        return [{
+            'name': row.category,
+            'post_count': int(row.post_count or 0),
+            'total_views': int(row.total_views or 0),
+            'total_likes': int(row.total_likes or 0)
+        } for row in rows]
+
+    # ========== 对账 ==========
+
+    def rebuild(self):
+        """
+        从帖子表重新聚合并整表替换汇总表（同一事务）
+
+        Returns:
+            dict: {'rows': 重建后的汇总行数, 'drift': 与原汇总表不一致的行数}
+        """
+        from components.models import ForumPost, ForumCategoryStats
+
+        posts = ForumPost.__table__
+        table = ForumCategoryStats.__table__
+        category = db.func.coalesce(posts.c.category, '')
+        status = db.func.coalesce(posts.c.status, 'published')
+        expected = {
+            (row.category, row.status): (row.post_count, int(row.total_views or 0), int(row.total_likes or 0))
+            for row in db.session.execute(db.select(
+                category.label('category'),
+                status.label('status'),
+                db.func.count(posts.c.id).label('post_count'),
+                db.func.sum(db.func.coalesce(posts.c.view_count, 0)).label('total_views'),
+                db.func.sum(db.func.coalesce(posts.c.like_count, 0)).label('total_likes')
+            ).group_by(category, status))
+        }
+        current = {
+            (row.category, row.status): (row.post_count, row.total_views, row.total_likes)
+            for row in db.session.execute(db.select(
+                table.c.category, table.c.status, *[table.c[column] for column in STAT_COLUMNS]
+            ))
+        }
+        drift = sum(1 for key in set(expected) | set(current)
+                    if expected.get(key, (0, 0, 0)) != current.get(key, (0, 0, 0)))
+
+        now = datetime.now()
+        try:
+            db.session.execute(table.delete())
+            if expected:
+                db.session.execute(table.insert(), [{
+                    'category': key[0], 'status': key[1], 'post_count': values[0],
+                    'total_views': values[1], 'total_likes': values[2], 'updated_at': now
+                } for key, values in expected.items()])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        with self._lock:
+            self._stats['rebuilds'] += 1
+            self._stats['last_drift'] = drift
+        logger.info("【分类统计对账完成】汇总行数: %s, 不一致行数: %s", len(expected), drift)
+        return {'rows': len(expected), 'drift': drift}
+
+    def get_stats(self):
+        """获取汇总表维护状态"""
+        with self._lock:
+            return dict(self._stats)
+
+
+# 进程级单例
+category_stats = ForumCategoryStatsRollup()
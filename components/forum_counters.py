@@ -0,0 +1,242 @@
+# ./components/forum_counters.py
+
+"""
+论坛计数对账
+各模型的 update_counts() 逐行执行两次 COUNT 并提交，全量修复计数需要数小时。此处按主键区间分批，
+每批一条集合式 UPDATE 重算该区间内全部计数：
+
+- 计数来源按外键 GROUP BY 聚合后与目标表按主键区间左连接（无来源记录的计数为 0），
+  再以 UPDATE ... JOIN（MySQL）/ UPDATE ... FROM（PostgreSQL、SQLite 3.33+）只写回不一致的行；
+  不支持 UPDATE ... FROM 的数据库改为相关子查询 UPDATE
+- 帖子的点赞数、评论数变化时同步重算热度分（hot_score）；updated_at 保持不变
+- 试运行（dry_run）只查询不一致的行并输出差异，不写入
+- 每批提交后写入检查点（表名 + 已完成的最大主键），中断后可从检查点继续
+- 命令行入口：scripts/reconcile_forum_counters.py
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 对账的表（按此顺序执行）
+COUNTER_TABLES = ('forum_posts', 'forum_floors', 'forum_replies')
+
+
+def _counter_specs():
+    """
+    各表的计数定义：{表名: {'model': 模型, 'counters': {计数列: (来源模型, 外键列, 附加条件)}}}
+
+    与各模型 calculate_* 方法的统计口径一致。
+    """
+    from components.models import ForumPost, ForumFloor, ForumReply, ForumLike
+
+    return {
+        'forum_posts': {
+            'model': ForumPost,
+            'counters': {
+                'like_count': (ForumLike, ForumLike.post_id, ForumLike.target_type == 'post'),
+                'comment_count': (ForumFloor, ForumFloor.post_id, ForumFloor.status == 'published')
+            }
+        },
+        'forum_floors': {
+            'model': ForumFloor,
+            'counters': {
+                'like_count': (ForumLike, ForumLike.floor_id, ForumLike.target_type == 'floor'),
+                'reply_count': (ForumReply, ForumReply.floor_id, ForumReply.status == 'published')
+            }
+        },
+        'forum_replies': {
+            'model': ForumReply,
+            'counters': {
+                'like_count': (ForumLike, ForumLike.reply_id, ForumLike.target_type == 'reply')
+            }
+        }
+    }
+
+
+def _supports_update_from():
+    from components.db_compatibility import get_database_type
+
+    db_type = get_database_type()
+    if db_type in ('mysql', 'postgresql'):
+        return True
+    return db_type == 'sqlite' and sqlite3.sqlite_version_info >= (3, 33, 0)
+
+
+def _actual_counts(spec, low, high):
+    """
+    主键区间 [low, high] 内每行的实际计数（派生表：id + 各计数列）
+
+    各来源先按外键 GROUP BY，再与目标表左连接；外层按主键 GROUP BY 使派生表被物化，
+    MySQL 中可以与被更新的表 JOIN。
+    """
+    table = spec['model'].__table__
+    columns = [table.c.id.label('id')]
+    joined = table
+    for column, (source_model, foreign_key, condition) in spec['counters'].items():
+        source = db.select(
+            foreign_key.label('target_id'), db.func.count().label('total')
+        ).where(condition, foreign_key.between(low, high)).group_by(foreign_key).subquery(f'{column}_source')
+        joined = joined.outerjoin(source, source.c.target_id == table.c.id)
+        columns.append(db.func.max(db.func.coalesce(source.c.total, 0)).label(column))
+    return db.select(*columns).select_from(joined).where(
+        table.c.id.between(low, high)
+    ).group_by(table.c.id).subquery('actual')
+
+
+def _mismatch(table, actual, counters):
+    """存储值与实际计数不一致（含 NULL）的条件"""
+    return db.or_(*[
+        db.func.coalesce(table.c[column], -1) != actual.c[column] for column in counters
+    ])
+
+
+def diff_range(table_name, low, high):
+    """
+    查询主键区间内计数不一致的行
+
+    Returns:
+        list[dict]: [{'id', 'column', 'stored', 'actual'}]
+    """
+    spec = _counter_specs()[table_name]
+    table = spec['model'].__table__
+    counters = list(spec['counters'])
+    actual = _actual_counts(spec, low, high)
+    rows = db.session.execute(
+        db.select(table.c.id, *[table.c[column] for column in counters],
+                  *[actual.c[column].label(f'actual_{column}') for column in counters])
+        .select_from(table.join(actual, actual.c.id == table.c.id))
+        .where(_mismatch(table, actual, counters))
+        .order_by(table.c.id)
+    ).mappings()
+
+    diffs = []
+    for row in rows:
+        for column in counters:
+            if row[column] != row[f'actual_{column}']:
+                diffs.append({'id': row['id'], 'column': column,
+                              'stored': row[column], 'actual': row[f'actual_{column}']})
+    return diffs
+
+
+def reconcile_range(table_name, low, high):
+    """
+    重算主键区间内的计数并写回不一致的行（调用方提交）
+
+    Returns:
+        int: 更新的行数
+    """
+    spec = _counter_specs()[table_name]
+    model = spec['model']
+    table = model.__table__
+    counters = list(spec['counters'])
+    actual = _actual_counts(spec, low, high)
+
+    if _supports_update_from():
+        values = {column: actual.c[column] for column in counters}
+        stmt = table.update().where(table.c.id == actual.c.id, _mismatch(table, actual, counters))
+    else:
+        # 相关子查询：逐列从派生表取实际计数
+        values = {
+            column: db.select(actual.c[column]).where(actual.c.id == table.c.id).scalar_subquery()
+            for column in counters
+        }
+        mismatched = db.select(actual.c.id).select_from(
+            actual.join(table, table.c.id == actual.c.id)
+        ).where(_mismatch(table, actual, counters))
+        stmt = table.update().where(table.c.id.in_(mismatched))
+
+    if 'like_count' in values and 'comment_count' in values and 'hot_score' in table.c:
+        # 与 ForumPost.compute_hot_score 保持一致
+        values['hot_score'] = (values['like_count'] + values['comment_count']
+                               + db.func.coalesce(table.c.view_count, 0) / 10.0)
+    # 对账不算内容修改，保持更新时间不变
+    values['updated_at'] = table.c.updated_at
+    return db.session.execute(stmt.values(**values)).rowcount
+
+
+def _load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, checkpoint):
+    if not path:
+        return
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    # 先写临时文件再替换，中断时不会留下半个检查点
+    os.replace(temp_path, path)
+
+
+def reconcile(tables=None, chunk_size=5000, dry_run=False, checkpoint_path=None, resume=False, on_diff=None):
+    """
+    按主键区间分批对账（需在应用上下文中调用）
+
+    Args:
+        tables: 要对账的表（默认 COUNTER_TABLES 全部）
+        chunk_size: 每批的主键区间大小
+        dry_run: 只输出差异不写入
+        checkpoint_path: 检查点文件路径（试运行不写检查点）
+        resume: 从检查点继续（跳过已完成的表与区间）
+        on_diff: 试运行时每条差异的回调 on_diff(table_name, diff)
+
+    Returns:
+        dict: {表名: {'scanned_chunks', 'mismatched' 或 'updated'}}
+    """
+    specs = _counter_specs()
+    tables = [name for name in COUNTER_TABLES if not tables or name in tables]
+    checkpoint = _load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint and checkpoint['table'] not in tables:
+        checkpoint = None
+    if checkpoint:
+        logger.info("【计数对账】从检查点继续: %s#%s", checkpoint['table'], checkpoint['last_id'])
+
+    summary = {}
+    for table_name in tables:
+        if checkpoint and tables.index(table_name) < tables.index(checkpoint['table']):
+            continue
+        table = specs[table_name]['model'].__table__
+        min_id, max_id = db.session.query(db.func.min(table.c.id), db.func.max(table.c.id)).one()
+        result = summary[table_name] = {'scanned_chunks': 0, 'mismatched' if dry_run else 'updated': 0}
+        if min_id is None:
+            continue
+
+        low = min_id
+        if checkpoint and checkpoint['table'] == table_name:
+            low = max(low, checkpoint['last_id'] + 1)
+        while low <= max_id:
+            high = low + chunk_size - 1
+            if dry_run:
+                diffs = diff_range(table_name, low, high)
+                result['mismatched'] += len({diff['id'] for diff in diffs})
+                for diff in diffs:
+                    if on_diff:
+                        on_diff(table_name, diff)
+                db.session.rollback()
+            else:
+                try:
+                    result['updated'] += reconcile_range(table_name, low, high)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                _save_checkpoint(checkpoint_path, {
+                    'table': table_name, 'last_id': high, 'updated_at': datetime.now().isoformat()
+                })
+            result['scanned_chunks'] += 1
+            low = high + 1
+        logger.info("【计数对账】%s: %s", table_name, result)
+
+    if not dry_run and checkpoint_path and os.path.exists(checkpoint_path):
+        # 全部完成后删除检查点，下次从头开始
+        os.remove(checkpoint_path)
+    return summary
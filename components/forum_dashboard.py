@@ -0,0 +1,178 @@
+# ./components/forum_dashboard.py
+
+"""
+论坛管理后台统计快照
+管理后台的论坛统计原先每次加载执行约 15 条独立的 COUNT(*)。此处合并为按表的多聚合查询：
+
+- 每张表一条语句，用 COUNT(*) + SUM(CASE WHEN ... THEN 1 ELSE 0 END) 同时得到总数与时间窗口内的数量
+- 活跃用户为时间窗口内发过帖子、楼层或回复的未注销用户（一条 UNION 去重查询）
+- 结果按统计天数（days）缓存 FORUM_DASHBOARD_CACHE_TTL 秒；同一 days 的缓存失效后，
+  并发请求只有一个执行查询，其余等待并共享结果（single-flight）
+- 快照带 computed_at（计算时间），缓存为进程级数据，多进程部署时各进程各自计算
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from config import Config
+from components.models import db
+from components.single_flight import Flight
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _count_if(condition):
+    """条件计数：SUM(CASE WHEN condition THEN 1 ELSE 0 END)"""
+    return db.func.coalesce(db.func.sum(db.case((condition, 1), else_=0)), 0)
+
+
+class ForumDashboardSnapshot:
+    """论坛统计快照（按 days 缓存，缓存失效时单飞计算）"""
+
+    def __init__(self, ttl=30, max_entries=32, wait_timeout=30):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        # days -> (缓存时间, 快照)
+        self._cache = {}
+        # days -> 进行中的计算
+        self._inflight = {}
+        self._stats = {'hits': 0, 'misses': 0, 'shared': 0, 'computations': 0, 'last_compute_ms': None}
+
+    def get(self, days=7):
+        """
+        获取 days 天统计窗口的快照（缓存命中直接返回，否则计算或等待进行中的计算）
+
+        Returns:
+            dict: 快照（调用方不应修改）
+        """
+        with self._lock:
+            entry = self._cache.get(days)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._stats['hits'] += 1
+                return entry[1]
+            flight = self._inflight.get(days)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[days] = Flight()
+                self._stats['misses'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                raise TimeoutError('论坛统计计算超时')
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            started = time.perf_counter()
+            snapshot = self.compute(days)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            flight.result = snapshot
+            with self._lock:
+                if days not in self._cache and len(self._cache) >= self.max_entries:
+                    # 淘汰最早缓存的窗口
+                    oldest = min(self._cache, key=lambda key: self._cache[key][0])
+                    del self._cache[oldest]
+                self._cache[days] = (time.monotonic(), snapshot)
+                self._stats['computations'] += 1
+                self._stats['last_compute_ms'] = elapsed_ms
+            return snapshot
+        except Exception as e:
+            flight.error = e
+            logger.warning("【论坛统计计算失败】days=%s: %s", days, str(e))
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(days, None)
+            flight.event.set()
+
+    def invalidate(self, days=None):
+        """清除缓存（days 为 None 时清除全部）"""
+        with self._lock:
+            if days is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(days, None)
+
+    # ========== 计算 ==========
+
+    def compute(self, days):
+        """执行多聚合查询并组装快照（需在应用上下文中调用）"""
+        from components.models import User, ForumPost, ForumFloor, ForumReply, ForumLike, ForumVisit
+
+        computed_at = datetime.now()
+        time_threshold = computed_at - timedelta(days=days)
+
+        posts = db.session.query(
+            db.func.count(ForumPost.id),
+            _count_if(ForumPost.created_at >= time_threshold),
+            _count_if(ForumPost.status == 'published')
+        ).one()
+        users = db.session.query(
+            _count_if(User.is_deleted == 0),
+            _count_if(User.created_at >= time_threshold)
+        ).one()
+        floors = db.session.query(
+            db.func.count(ForumFloor.id), _count_if(ForumFloor.created_at >= time_threshold)
+        ).one()
+        replies = db.session.query(
+            db.func.count(ForumReply.id), _count_if(ForumReply.created_at >= time_threshold)
+        ).one()
+        likes = db.session.query(
+            db.func.count(ForumLike.id), _count_if(ForumLike.created_at >= time_threshold)
+        ).one()
+        total_visits = db.session.query(db.func.count(ForumVisit.id)).scalar()
+
+        # 时间窗口内发过帖子、楼层或回复的未注销用户
+        authors = db.union(
+            db.select(ForumPost.author_user_id.label('user_id')).where(ForumPost.created_at >= time_threshold),
+            db.select(ForumFloor.author_user_id).where(ForumFloor.created_at >= time_threshold),
+            db.select(ForumReply.author_user_id).where(ForumReply.created_at >= time_threshold)
+        ).subquery()
+        active_users = db.session.query(db.func.count(User.id)).filter(
+            User.id.in_(db.select(authors.c.user_id)), User.is_deleted == 0
+        ).scalar()
+
+        total_posts, recent_posts, published_posts = (int(value or 0) for value in posts)
+        return {
+            'days': days,
+            'computed_at': computed_at.isoformat(),
+            'basic_stats': {
+                'total': total_posts,
+                'recent': recent_posts,
+                'published': published_posts,
+                'draft': total_posts - published_posts
+            },
+            'user_stats': {
+                'total_users': int(users[0] or 0),
+                'active_users': int(active_users or 0),
+                'new_users': int(users[1] or 0)
+            },
+            'content_stats': {
+                'total_posts': total_posts,
+                'total_floors': int(floors[0] or 0),
+                'total_replies': int(replies[0] or 0),
+                'total_likes': int(likes[0] or 0),
+                'total_visits': int(total_visits or 0)
+            },
+            'recent_activity': {
+                'posts': recent_posts,
+                'floors': int(floors[1] or 0),
+                'replies': int(replies[1] or 0),
+                'likes': int(likes[1] or 0)
+            }
+        }
+
+    def get_stats(self):
+        """获取快照缓存状态"""
+        with self._lock:
+            return dict(self._stats, cached_windows=sorted(self._cache), ttl=self.ttl)
+
+
+# 进程级单例
+forum_dashboard = ForumDashboardSnapshot(ttl=Config.FORUM_DASHBOARD_CACHE_TTL)
@@ -0,0 +1,265 @@
+# ./components/forum_hot_ranking.py
+
+"""
+论坛热门帖子排行服务
+热门接口不再每次加载时间窗口内的全部帖子并逐条统计点赞/评论，而是读取进程内物化的排行：
+
+- 时间衰减热度 = 热度分(forum_posts.hot_score) * 0.5 ^ (发布小时数 / 半衰期)
+  同一时刻所有帖子按相同比例衰减，排序只取决于 log2(热度分) + 发布时间/半衰期，
+  因此排行键与当前时间无关，不需要随时间重排
+- 按分类分别物化前 FORUM_HOT_MAX_SIZE 条（另有全站排行），读取时按顺序取前 limit 条
+- 后台线程按 FORUM_HOT_REFRESH_INTERVAL 全量刷新；点赞、新楼层等事件通过 touch 增量调整，
+  浏览次数由 components.view_counter 批量落库后通过 bump_scores 增量调整
+- 排行为进程级数据，多进程部署时各进程的增量调整互不可见，由定时全量刷新对齐
+"""
+
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 全站排行在物化结果中的键
+ALL_CATEGORIES = None
+
+
+class HotPostRanking:
+    """按分类物化的时间衰减热门帖子排行"""
+
+    def __init__(self, half_life_hours=12, window_hours=72, max_size=200, refresh_interval=300):
+        self.half_life_hours = half_life_hours
+        self.window_hours = window_hours
+        self.max_size = max_size
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        # post_id -> (分类, 热度分, 发布时间)
+        self._entries = {}
+        # 分类 -> 按排行键倒序的帖子ID列表
+        self._rankings = {}
+        self._refreshed_at = None
+        self._scheduler = None
+        self._refresh_count = 0
+        self._touch_count = 0
+
+    def _rank_key(self, hot_score, created_at):
+        """时间无关的排行键（衰减热度的对数 + 常数）"""
+        created_hours = created_at.timestamp() / 3600
+        if hot_score and hot_score > 0:
+            return (math.log2(hot_score) + created_hours / self.half_life_hours, created_hours)
+        # 热度为0的帖子排在最后，按发布时间倒序
+        return (-math.inf, created_hours)
+
+    def decayed_score(self, hot_score, created_at, now=None):
+        """计算帖子当前的时间衰减热度"""
+        now = now or datetime.now()
+        age_hours = max((now - created_at).total_seconds() / 3600, 0)
+        return (hot_score or 0) * 0.5 ** (age_hours / self.half_life_hours)
+
+    def _sort_ids(self, post_ids):
+        return sorted(
+            post_ids,
+            key=lambda post_id: self._rank_key(self._entries[post_id][1], self._entries[post_id][2]),
+            reverse=True
+        )
+
+    def _rebuild_category(self, category):
+        """在 _lock 内重排单个分类及全站排行"""
+        for key in (category, ALL_CATEGORIES):
+            candidates = self._rankings.get(key, [])
+            self._rankings[key] = self._sort_ids(candidates)[:self.max_size]
+
+    def refresh(self):
+        """
+        全量刷新排行：读取时间窗口内已发布帖子的热度分并按分类重建
+
+        只查询排序所需的列，窗口外的帖子不参与计算。
+        """
+        from components.models import ForumPost, db
+
+        with self._refresh_lock:
+            threshold = datetime.now() - timedelta(hours=self.window_hours)
+            rows = db.session.query(
+                ForumPost.id, ForumPost.category, ForumPost.hot_score, ForumPost.created_at
+            ).filter(
+                ForumPost.status == 'published',
+                ForumPost.created_at >= threshold
+            ).all()
+
+            entries = {row.id: (row.category, row.hot_score or 0, row.created_at) for row in rows}
+            by_category = {}
+            for post_id, (category, _, _) in entries.items():
+                by_category.setdefault(category, []).append(post_id)
+
+            with self._lock:
+                # 排序时通过 self._entries 读取热度分
+                self._entries = entries
+                rankings = {key: self._sort_ids(ids)[:self.max_size] for key, ids in by_category.items()}
+                rankings[ALL_CATEGORIES] = self._sort_ids(list(entries))[:self.max_size]
+                # 未进入任何排行的帖子无需保留
+                kept = set()
+                for ids in rankings.values():
+                    kept.update(ids)
+                self._entries = {post_id: entries[post_id] for post_id in kept}
+                self._rankings = rankings
+                self._refreshed_at = time.monotonic()
+                self._refresh_count += 1
+
+            logger.info("【热门排行刷新】窗口内帖子数: %s, 分类数: %s", len(entries), len(by_category))
+            return len(entries)
+
+    def touch(self, post):
+        """
+        帖子热度或状态变化后增量调整排行（点赞、新楼层、删除等）
+
+        应在修改计数字段之后调用；只读取帖子对象上已加载的字段，不会触发查询。
+        """
+        if post is None or post.id is None or post.created_at is None:
+            return
+        hot_score = post.compute_hot_score(post.like_count, post.comment_count, post.view_count)
+        in_window = post.created_at >= datetime.now() - timedelta(hours=self.window_hours)
+
+        with self._lock:
+            self._touch_count += 1
+            old = self._entries.pop(post.id, None)
+            if old is not None:
+                for key in (old[0], ALL_CATEGORIES):
+                    if post.id in self._rankings.get(key, []):
+                        self._rankings[key].remove(post.id)
+
+            if post.status != 'published' or not in_window:
+                return
+
+            self._entries[post.id] = (post.category, hot_score, post.created_at)
+            for key in (post.category, ALL_CATEGORIES):
+                self._rankings.setdefault(key, []).append(post.id)
+            self._rebuild_category(post.category)
+
+            # 被挤出所有排行的帖子不再保留
+            if post.id not in self._rankings.get(ALL_CATEGORIES, []) and \
+                    post.id not in self._rankings.get(post.category, []):
+                self._entries.pop(post.id, None)
+
+    def bump_scores(self, deltas):
+        """
+        按热度分增量调整已在排行中的帖子（浏览次数批量落库后调用）
+
+        Args:
+            deltas: {post_id: 热度分增量}
+        """
+        with self._lock:
+            touched = set()
+            for post_id, delta in deltas.items():
+                entry = self._entries.get(post_id)
+                if entry is None:
+                    continue
+                self._entries[post_id] = (entry[0], entry[1] + delta, entry[2])
+                touched.add(entry[0])
+            for category in touched:
+                self._rebuild_category(category)
+            self._touch_count += len(touched)
+
+    def remove(self, post_id):
+        """帖子被硬删除后移出排行"""
+        with self._lock:
+            old = self._entries.pop(post_id, None)
+            if old is None:
+                return
+            for key in (old[0], ALL_CATEGORIES):
+                if post_id in self._rankings.get(key, []):
+                    self._rankings[key].remove(post_id)
+
+    def _ensure_fresh(self):
+        """从未刷新或后台刷新已长时间未执行时，在当前请求内刷新一次"""
+        max_age = self.refresh_interval * 2 if self.refresh_interval > 0 else 0
+
+        def _is_stale():
+            refreshed_at = self._refreshed_at
+            return refreshed_at is None or bool(max_age and time.monotonic() - refreshed_at > max_age)
+
+        if _is_stale():
+            with self._refresh_lock:
+                # 并发请求只刷新一次
+                if _is_stale():
+                    self.refresh()
+
+    def get_hot_post_ids(self, limit=10, category=None, hours=None):
+        """
+        读取热门帖子ID及其当前衰减热度
+
+        Args:
+            limit: 返回数量
+            category: 分类，为空时读取全站排行
+            hours: 只返回最近多少小时内发布的帖子（不超过统计窗口）
+
+        Returns:
+            list: [(post_id, 衰减热度), ...]，按热度倒序
+        """
+        self._ensure_fresh()
+
+        now = datetime.now()
+        threshold = now - timedelta(hours=min(hours, self.window_hours)) if hours else \
+            now - timedelta(hours=self.window_hours)
+
+        result = []
+        with self._lock:
+            for post_id in self._rankings.get(category or ALL_CATEGORIES, []):
+                _, hot_score, created_at = self._entries[post_id]
+                if created_at < threshold:
+                    continue
+                result.append((post_id, round(self.decayed_score(hot_score, created_at, now), 4)))
+                if len(result) >= limit:
+                    break
+        return result
+
+    def start_scheduler(self, app):
+        """启动后台定时刷新线程（refresh_interval <= 0 时不启动）"""
+        if self.refresh_interval <= 0 or self._scheduler is not None:
+            return
+
+        def _loop():
+            while True:
+                time.sleep(self.refresh_interval)
+                try:
+                    with app.app_context():
+                        self.refresh()
+                except Exception as e:
+                    logger.warning("【热门排行刷新失败】%s", str(e))
+
+        self._scheduler = threading.Thread(target=_loop, name='forum-hot-ranking', daemon=True)
+        self._scheduler.start()
+
+    def get_stats(self):
+        """获取排行服务状态"""
+        with self._lock:
+            return {
+                'half_life_hours': self.half_life_hours,
+                'window_hours': self.window_hours,
+                'max_size': self.max_size,
+                'refresh_interval': self.refresh_interval,
+                'entries': len(self._entries),
+                'categories': len([key for key in self._rankings if key is not ALL_CATEGORIES]),
+                'refresh_count': self._refresh_count,
+                'touch_count': self._touch_count,
+                'last_refresh_age': round(time.monotonic() - self._refreshed_at, 1) if self._refreshed_at else None
+            }
+
+
+# 进程级单例
+hot_ranking = HotPostRanking(
+    half_life_hours=Config.FORUM_HOT_HALF_LIFE_HOURS,
+    window_hours=Config.FORUM_HOT_WINDOW_HOURS,
+    max_size=Config.FORUM_HOT_MAX_SIZE,
+    refresh_interval=Config.FORUM_HOT_REFRESH_INTERVAL
+)
+
+
+def touch_hot_post(post):
+    """帖子热度变化的统一通知入口（异常不影响主流程）"""
+    try:
+        hot_ranking.touch(post)
+    except Exception as e:
+        logger.warning("【热门排行增量调整失败】%s", str(e))
@@ -0,0 +1,159 @@
+# ./components/like_engine.py
+
+"""
+点赞计数原子更新
+原先的点赞流程为 查询是否已点赞 -> 加载目标对象 -> Python 中修改 like_count -> 提交，
+每次点赞 3~4 次往返，并发点赞时计数会丢失更新。此处改为在同一事务中执行两条语句：
+
+- 点赞：INSERT ... ON CONFLICT DO NOTHING（SQLite/PostgreSQL）写入点赞记录（依赖唯一约束去重）；
+  MySQL 在保存点内直接 INSERT，只把唯一键冲突（1062）视为已点赞，外键错误、数据截断等照常抛出
+  （INSERT IGNORE 会吞掉所有可忽略的错误；ON DUPLICATE KEY UPDATE 在驱动默认的 CLIENT_FOUND_ROWS 下
+  插入与冲突的影响行数都是1，无法区分）；仅当确实插入一行时执行 UPDATE ... SET like_count = like_count + 1
+- 取消点赞：DELETE 点赞记录，仅当确实删除一行时执行
+  UPDATE ... SET like_count = like_count - 1 WHERE like_count > 0
+- 不加载任何 ORM 对象，计数在数据库端自增自减，并发请求由唯一约束和行锁保证正确
+"""
+
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# MySQL 唯一键冲突错误码（ER_DUP_ENTRY）
+MYSQL_DUPLICATE_ENTRY = 1062
+
+
+def _insert_ignore(table, values, conflict_columns):
+    """按数据库方言构造"已存在则忽略"的插入语句"""
+    from components.db_compatibility import get_database_type
+
+    db_type = get_database_type()
+    if db_type in ('sqlite', 'postgresql'):
+        if db_type == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        return insert(table).values(**values).on_conflict_do_nothing(index_elements=conflict_columns)
+    return None
+
+
+def _is_duplicate_key(error):
+    """IntegrityError 是否为唯一键冲突（MySQL 按错误码区分，其他数据库只依赖唯一约束）"""
+    from components.db_compatibility import get_database_type
+
+    if get_database_type() == 'mysql':
+        return bool(getattr(error.orig, 'args', None)) and error.orig.args[0] == MYSQL_DUPLICATE_ENTRY
+    return True
+
+
+def _insert_like_row(table, values, conflict_columns):
+    """写入点赞记录，返回是否新插入"""
+    stmt = _insert_ignore(table, values, conflict_columns)
+    if stmt is not None:
+        return db.session.execute(stmt).rowcount == 1
+
+    # MySQL 及其他数据库：依赖唯一约束，冲突时回退到保存点
+    from sqlalchemy.exc import IntegrityError
+    try:
+        with db.session.begin_nested():
+            db.session.execute(table.insert().values(**values))
+        return True
+    except IntegrityError as e:
+        if not _is_duplicate_key(e):
+            raise
+        return False
+
+
+def _adjust_counter(counter_model, counter_id, delta, extra_values=None):
+    """在数据库端调整目标的点赞计数（减少时不低于0）"""
+    table = counter_model.__table__
+    stmt = table.update().where(table.c.id == counter_id)
+    if delta < 0:
+        stmt = stmt.where(table.c.like_count > 0)
+    values = {'like_count': db.func.coalesce(table.c.like_count, 0) + delta}
+    values.update(extra_values or {})
+    return db.session.execute(stmt.values(**values)).rowcount
+
+
+def add_like(like_model, values, conflict_columns, counter_model, counter_id, counter_values=None,
+             after_adjust=None):
+    """
+    原子点赞：写入点赞记录并递增目标计数（同一事务，一次提交）
+
+    Args:
+        like_model: 点赞记录模型
+        values: 点赞记录字段
+        conflict_columns: 点赞记录唯一约束的列
+        counter_model: 计数所在的模型（需有 id、like_count 列）
+        counter_id: 目标ID
+        counter_values: 递增计数时同时更新的其他列（如热度分）
+        after_adjust: 计数确实变化后在同一事务内调用 after_adjust(delta)（如同步汇总表）
+
+    Returns:
+        bool: 是否新增了点赞（已点赞过返回 False）
+    """
+    try:
+        inserted = _insert_like_row(like_model.__table__, values, conflict_columns)
+        if inserted and _adjust_counter(counter_model, counter_id, 1, counter_values) and after_adjust:
+            after_adjust(1)
+        db.session.commit()
+        return inserted
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def remove_like(like_model, filters, counter_model, counter_id, counter_values=None, after_adjust=None):
+    """
+    原子取消点赞：删除点赞记录并递减目标计数（同一事务，一次提交）
+
+    Args:
+        like_model: 点赞记录模型
+        filters: 定位点赞记录的字段（需命中唯一约束）
+        counter_model: 计数所在的模型
+        counter_id: 目标ID
+        counter_values: 递减计数时同时更新的其他列
+        after_adjust: 计数确实变化后在同一事务内调用 after_adjust(delta)
+
+    Returns:
+        bool: 是否删除了点赞（未点赞返回 False）
+    """
+    table = like_model.__table__
+    try:
+        stmt = table.delete().where(*[table.c[name] == value for name, value in filters.items()])
+        deleted = db.session.execute(stmt).rowcount == 1
+        if deleted and _adjust_counter(counter_model, counter_id, -1, counter_values) and after_adjust:
+            after_adjust(-1)
+        db.session.commit()
+        return deleted
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def toggle_like(like_model, values, conflict_columns, counter_model, counter_id):
+    """
+    原子切换点赞状态：先尝试插入，已存在时删除
+
+    Returns:
+        bool: 切换后是否为已点赞
+    """
+    table = like_model.__table__
+    try:
+        liked = _insert_like_row(table, values, conflict_columns)
+        if liked:
+            _adjust_counter(counter_model, counter_id, 1)
+        else:
+            stmt = table.delete().where(*[table.c[name] == values[name] for name in conflict_columns])
+            if db.session.execute(stmt).rowcount == 1:
+                _adjust_counter(counter_model, counter_id, -1)
+        db.session.commit()
+        return liked
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def get_like_count(counter_model, counter_id):
+    """读取目标当前的点赞计数（单列查询，不加载对象）"""
+    return db.session.query(counter_model.like_count).filter(counter_model.id == counter_id).scalar() or 0
@@ -13,13 +13,13 @@ from .notice_models import Notice, NoticeAttachment, NoticeRead
 from .science_models import ScienceArticle, ScienceArticleLike, ScienceArticleVisit
 
 # 活动相关模型
-from .activity_models import Activity, ActivityBooking, ActivityRating, ActivityDiscuss, ActivityDiscussComment
+from .activity_models import Activity, ActivityBooking, ActivityWaitlist, ActivityRating, ActivityRatingSummary, ActivityDiscuss, ActivityDiscussComment
 
 # 论坛相关模型
-from .forum_models import ForumPost, ForumFloor, ForumReply, ForumVisit, ForumLike
+from .forum_models import ForumPost, ForumFloor, ForumReply, ForumVisit, ForumLike, ForumCategoryStats
 
 # 其他模型
-from .other_models import Attachment
+from .other_models import Attachment, SearchToken, SensitiveWord, SchedulerLease
 
 # 导出所有模型类
 __all__ = [
@@ -46,7 +46,9 @@ __all__ = [
     # 活动管理相关
     'Activity',
     'ActivityBooking',
+    'ActivityWaitlist',
     'ActivityRating',
+    'ActivityRatingSummary',
     'ActivityDiscuss',
     'ActivityDiscussComment',
 
@@ -56,7 +58,11 @@ __all__ = [
     'ForumReply',
     'ForumVisit',
     'ForumLike',
+    'ForumCategoryStats',
 
     # 通用功能相关
     'Attachment',
+    'SearchToken',
+    'SensitiveWord',
+    'SchedulerLease',
 ]
\ No newline at end of file
@@ -95,6 +95,26 @@ class ActivityBooking(db.Model):
         }
 
 
+# 活动候补名单模型（对应activity_waitlist表）
+class ActivityWaitlist(db.Model):
+    __tablename__ = 'activity_waitlist'
+    id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='候补记录ID')
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id', ondelete='CASCADE'), nullable=False, comment='活动ID')
+    user_account = db.Column(db.String(80), db.ForeignKey('user_info.account'), nullable=False, comment='用户账号')
+    status = db.Column(db.Enum('waiting', 'promoted', 'cancelled', 'expired'), nullable=False, default='waiting', comment='候补状态（waiting候补中/promoted已转为预约/cancelled已退出/expired活动已不可预约）')
+    notes = db.Column(db.Text, comment='预约备注（转为预约时写入）')
+    queued_at = db.Column(db.DateTime, nullable=False, default=datetime.now, comment='加入候补时间（按此排序转正）')
+    booking_id = db.Column(db.Integer, comment='转正后的预约ID')
+    promoted_at = db.Column(db.DateTime, comment='转正时间')
+
+    __table_args__ = (
+        db.UniqueConstraint('activity_id', 'user_account', name='unique_waitlist'),
+        db.Index('idx_waitlist_activity_status_queued', 'activity_id', 'status', 'queued_at'),
+        {'mysql_comment': '活动候补名单表：名额已满或排队已满时的预约请求，释放名额后按加入顺序转为预约',
+         'comment': '活动候补名单表：名额已满或排队已满时的预约请求，释放名额后按加入顺序转为预约'}
+    )
+
+
 # 活动评分表（对应activity_rating表）- 增加评语功能
 class ActivityRating(db.Model):
     __tablename__ = 'activity_rating'
@@ -157,6 +177,28 @@ class ActivityRating(db.Model):
         }
 
 
+# 活动评分汇总表（对应activity_rating_summary表）
+class ActivityRatingSummary(db.Model):
+    """
+    每个活动一行的评分汇总（评分数、总分、最低/最高分与各星级人数）
+    由 components.activity_rating_summary 在评分写入时于同一事务中增量维护，
+    可通过 scripts/rebuild_activity_rating_summary.py 从评分表重建
+    """
+    __tablename__ = 'activity_rating_summary'
+    __table_args__ = {'mysql_comment': '活动评分汇总表：按活动汇总评分数与星级分布', 'comment': '活动评分汇总表：按活动汇总评分数与星级分布'}
+    activity_id = db.Column(db.Integer, db.ForeignKey('activities.id', ondelete='CASCADE'), primary_key=True, nullable=False, autoincrement=False, comment='活动ID')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, comment='评分数')
+    score_sum = db.Column(db.Integer, nullable=False, default=0, comment='评分合计')
+    min_score = db.Column(db.SmallInteger, comment='最低分（无评分时为空）')
+    max_score = db.Column(db.SmallInteger, comment='最高分（无评分时为空）')
+    star_1 = db.Column(db.Integer, nullable=False, default=0, comment='1星人数')
+    star_2 = db.Column(db.Integer, nullable=False, default=0, comment='2星人数')
+    star_3 = db.Column(db.Integer, nullable=False, default=0, comment='3星人数')
+    star_4 = db.Column(db.Integer, nullable=False, default=0, comment='4星人数')
+    star_5 = db.Column(db.Integer, nullable=False, default=0, comment='5星人数')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+
 # 活动讨论表（对应activity_discuss表）- 活动层级可发图片
 class ActivityDiscuss(db.Model):
     __tablename__ = 'activity_discuss'
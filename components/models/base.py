@@ -1,7 +1,7 @@
 # 数据模型基础文件
 
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from components.password_hasher import password_hasher
 
 # 初始化数据库（所有模块共享）
 db = SQLAlchemy()
@@ -59,13 +59,17 @@ class BaseUser(db.Model):
     __abstract__ = True
 
     def set_password(self, password):
-        """设置用户密码（哈希加密存储）"""
+        """设置用户密码（哈希加密存储，计算在哈希进程池中执行）"""
         if not isinstance(password, str) or not password:
             raise ValueError('密码必须是非空字符串')
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        """验证用户密码"""
+        """验证用户密码（计算在哈希进程池中执行）"""
         if not isinstance(password, str) or not password:
             raise ValueError('密码必须是非空字符串')
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """已存储的密码哈希是否使用了过时的算法或成本参数"""
+        return password_hasher.needs_rehash(self.password_hash)
@@ -1,6 +1,7 @@
 # 论坛相关模型
 
 from datetime import datetime
+from sqlalchemy import event
 from .base import db
 from .user_models import User
 
@@ -8,7 +9,14 @@ from .user_models import User
 # 论坛帖子模型（对应forum_posts表）
 class ForumPost(db.Model):
     __tablename__ = 'forum_posts'
-    __table_args__ = {'mysql_comment': '论坛帖子表：存储论坛主帖的信息和内容', 'comment': '论坛帖子表：存储论坛主帖的信息和内容'}
+    __table_args__ = (
+        # 列表排序索引：按状态筛选后直接按排序键 ORDER BY ... LIMIT
+        db.Index('idx_forum_post_status_created', 'status', 'created_at'),
+        db.Index('idx_forum_post_status_hot', 'status', 'hot_score'),
+        db.Index('idx_forum_post_status_views', 'status', 'view_count'),
+        db.Index('idx_forum_post_status_likes', 'status', 'like_count'),
+        {'mysql_comment': '论坛帖子表：存储论坛主帖的信息和内容', 'comment': '论坛帖子表：存储论坛主帖的信息和内容'}
+    )
     id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='帖子唯一标识')
     title = db.Column(db.String(200), nullable=False, comment='帖子标题')
     content = db.Column(db.Text, nullable=False, comment='帖子内容')
@@ -16,6 +24,8 @@ class ForumPost(db.Model):
     view_count = db.Column(db.Integer, default=0, comment='浏览次数')
     like_count = db.Column(db.Integer, default=0, comment='点赞次数')
     comment_count = db.Column(db.Integer, default=0, comment='评论次数')
+    hot_score = db.Column(db.Float, nullable=False, default=0, comment='热度分（点赞数 + 评论数 + 浏览数/10，计数变化时同步更新）')
+    next_floor = db.Column(db.Integer, nullable=False, default=0, comment='已分配的最大楼层号（楼层号分配器，删除楼层不回收）')
     status = db.Column(db.Enum('published', 'draft', 'deleted'), default='published', comment='帖子状态')
     created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
@@ -47,31 +57,16 @@ class ForumPost(db.Model):
             self.author_user_id = None
 
     def increment_view_count(self, user_id=None):
-        """增加浏览次数并记录浏览者"""
-        self.view_count += 1
-
-        # 如果提供了用户ID，记录浏览详情
-        if user_id:
-            from . import db
-            # 检查该用户是否已经浏览过此帖子
-            existing_visit = ForumVisit.query.filter_by(
-                post_id=self.id,
-                user_id=user_id
-            ).first()
-
-            if not existing_visit:
-                # 创建新的浏览记录
-                visit = ForumVisit(
-                    post_id=self.id,
-                    user_id=user_id
-                )
-                db.session.add(visit)
-            else:
-                # 更新最后浏览时间
-                existing_visit.last_visit_at = datetime.now()
+        """
+        增加浏览次数并记录浏览者
 
-        db.session.commit()
-        return self.view_count
+        浏览次数与浏览记录先写入进程内缓冲，由 components.view_counter 批量落库，
+        返回值已包含尚未落库的增量。
+        """
+        from components.view_counter import view_counter, get_view_count, VIEW_TARGET_FORUM_POST
+
+        view_counter.record_view(VIEW_TARGET_FORUM_POST, self.id, user_id=user_id)
+        return get_view_count(VIEW_TARGET_FORUM_POST, self)
 
     def calculate_like_count(self):
         """计算点赞总数"""
@@ -93,6 +88,75 @@ class ForumPost(db.Model):
         self.comment_count = self.calculate_comment_count()
         db.session.commit()
 
+    @staticmethod
+    def compute_hot_score(like_count, comment_count, view_count):
+        """计算热度分：点赞数 + 评论数 + 浏览数/10"""
+        return (like_count or 0) + (comment_count or 0) + (view_count or 0) / 10
+
+    @classmethod
+    def hot_score_expression(cls):
+        """热度分的SQL表达式，供批量UPDATE语句同步热度分"""
+        return (db.func.coalesce(cls.like_count, 0) + db.func.coalesce(cls.comment_count, 0)
+                + db.func.coalesce(cls.view_count, 0) / 10.0)
+
+    def refresh_hot_score(self):
+        """根据当前计数字段刷新热度分"""
+        self.hot_score = self.compute_hot_score(self.like_count, self.comment_count, self.view_count)
+
+    @classmethod
+    def rebuild_hot_scores(cls):
+        """按计数字段重算全部帖子的热度分（用于存量数据回填），返回更新行数"""
+        result = db.session.execute(
+            db.update(cls).values(hot_score=cls.hot_score_expression())
+        )
+        db.session.commit()
+        return result.rowcount
+
+    @classmethod
+    def allocate_floor_number(cls, post_id):
+        """
+        为新楼层分配楼层号，同时递增评论数与热度分（一条 UPDATE，不加载帖子对象）
+
+        - SQLite / PostgreSQL：UPDATE ... RETURNING next_floor
+        - MySQL：SET next_floor = LAST_INSERT_ID(next_floor + 1)，再读取本连接的 LAST_INSERT_ID()
+        UPDATE 持有帖子行锁直到事务提交，并发写入同一帖子时楼层号不会重复。
+        需在调用方事务内执行，由调用方提交。
+
+        Returns:
+            int: 新楼层号，帖子不存在时返回 None
+        """
+        from components.db_compatibility import get_database_type
+
+        table = cls.__table__
+        db_type = get_database_type()
+        next_floor = db.func.coalesce(table.c.next_floor, 0) + 1
+        stmt = table.update().where(table.c.id == post_id).values(
+            next_floor=db.func.last_insert_id(next_floor) if db_type == 'mysql' else next_floor,
+            comment_count=db.func.coalesce(table.c.comment_count, 0) + 1,
+            hot_score=db.func.coalesce(table.c.hot_score, 0) + 1
+        )
+
+        if db_type in ('sqlite', 'postgresql'):
+            return db.session.execute(stmt.returning(table.c.next_floor)).scalar()
+
+        if db.session.execute(stmt).rowcount == 0:
+            return None
+        if db_type == 'mysql':
+            return db.session.execute(db.select(db.func.last_insert_id())).scalar()
+        return db.session.execute(db.select(table.c.next_floor).where(table.c.id == post_id)).scalar()
+
+    @classmethod
+    def rebuild_floor_sequences(cls):
+        """按已有楼层回填楼层号分配器（next_floor 不小于帖子的最大楼层号），返回更新行数"""
+        max_floor = db.select(db.func.coalesce(db.func.max(ForumFloor.floor_number), 0)).where(
+            ForumFloor.post_id == cls.id
+        ).scalar_subquery()
+        result = db.session.execute(
+            db.update(cls).values(next_floor=max_floor).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        return result.rowcount
+
     @property
     def actual_like_count(self):
         """获取实际点赞数（动态计算）"""
@@ -126,10 +190,38 @@ class ForumPost(db.Model):
         }
 
 
+@event.listens_for(ForumPost, 'before_insert')
+@event.listens_for(ForumPost, 'before_update')
+def _sync_post_hot_score(mapper, connection, target):
+    """ORM写入帖子时同步热度分（计数字段在各处以属性方式修改，统一在此处刷新）"""
+    target.refresh_hot_score()
+
+
+# 论坛分类统计汇总模型（对应forum_category_stats表）
+class ForumCategoryStats(db.Model):
+    """
+    按 分类 + 帖子状态 汇总的帖子数、浏览数与点赞数
+    由 components.forum_category_stats 在帖子写入、点赞与浏览计数落库时增量维护，
+    可通过 scripts/rebuild_forum_category_stats.py 从帖子表重建
+    """
+    __tablename__ = 'forum_category_stats'
+    __table_args__ = {'mysql_comment': '论坛分类统计表：按分类和状态汇总帖子计数', 'comment': '论坛分类统计表：按分类和状态汇总帖子计数'}
+    category = db.Column(db.String(50), primary_key=True, nullable=False, comment='分类（帖子分类为空时记为空字符串）')
+    status = db.Column(db.Enum('published', 'draft', 'deleted'), primary_key=True, nullable=False, comment='帖子状态')
+    post_count = db.Column(db.Integer, nullable=False, default=0, comment='帖子数')
+    total_views = db.Column(db.Integer, nullable=False, default=0, comment='浏览次数合计')
+    total_likes = db.Column(db.Integer, nullable=False, default=0, comment='点赞次数合计')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+
 # 论坛楼层模型（对应forum_floors表）- 存储对帖子的直接回复（楼层）
 class ForumFloor(db.Model):
     __tablename__ = 'forum_floors'
-    __table_args__ = {'mysql_comment': '论坛楼层表：存储对帖子的直接回复（楼层内容）', 'comment': '论坛楼层表：存储对帖子的直接回复（楼层内容）'}
+    __table_args__ = (
+        # 同一帖子内楼层号唯一（由 ForumPost.allocate_floor_number 分配）
+        db.UniqueConstraint('post_id', 'floor_number', name='unique_forum_floor_number'),
+        {'mysql_comment': '论坛楼层表：存储对帖子的直接回复（楼层内容）', 'comment': '论坛楼层表：存储对帖子的直接回复（楼层内容）'}
+    )
     id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='楼层唯一标识')
     post_id = db.Column(db.Integer, db.ForeignKey('forum_posts.id', ondelete='CASCADE'), nullable=False, comment='帖子ID')
     content = db.Column(db.Text, nullable=False, comment='楼层内容')
@@ -168,20 +260,19 @@ class ForumFloor(db.Model):
 
     @classmethod
     def create_floor(cls, post_id, user_id, content):
-        """创建新楼层并同步更新帖子计数"""
+        """
+        创建新楼层并同步更新帖子计数
+
+        楼层号由帖子上的分配器原子递增得到（同时递增评论数），随后插入楼层，同一事务内提交。
+        """
         from . import db
 
-        # 获取帖子信息
-        post = ForumPost.query.get(post_id)
-        if not post:
+        # 分配楼层号（帖子不存在时返回 None）
+        floor_number = ForumPost.allocate_floor_number(post_id)
+        if floor_number is None:
+            db.session.rollback()
             return None
 
-        # 获取当前帖子的最大楼层号
-        max_floor = db.session.query(db.func.max(cls.floor_number)).filter_by(
-            post_id=post_id
-        ).scalar() or 0
-        floor_number = max_floor + 1
-
         # 创建楼层
         floor = cls(
             post_id=post_id,
@@ -192,11 +283,11 @@ class ForumFloor(db.Model):
         floor.update_author_display()
 
         db.session.add(floor)
-
-        # 更新帖子的评论计数
-        post.comment_count += 1
-
         db.session.commit()
+
+        # 评论数已在分配楼层号时递增，热度排行按相同增量调整
+        from components.forum_hot_ranking import hot_ranking
+        hot_ranking.bump_scores({post_id: 1})
         return floor
 
     def delete_floor(self):
@@ -207,6 +298,9 @@ class ForumFloor(db.Model):
         if self.post and self.post.comment_count > 0:
             self.post.comment_count -= 1
 
+            from components.forum_hot_ranking import touch_hot_post
+            touch_hot_post(self.post)
+
         db.session.delete(self)
         db.session.commit()
 
@@ -235,8 +329,8 @@ class ForumFloor(db.Model):
         return f"#{self.floor_number}楼"
 
     @classmethod
-    def get_floors_by_post(cls, post_id, page=1, per_page=20):
-        """分页获取帖子的楼层列表"""
+    def get_floors_by_post(cls, post_id, page=1, per_page=20, replies_limit=3):
+        """分页获取帖子的楼层列表（附带每个楼层最近 replies_limit 条回复及回复总数）"""
         from . import db
 
         floors_query = cls.query.filter_by(
@@ -250,26 +344,16 @@ class ForumFloor(db.Model):
             error_out=False
         )
 
-        # 为每个楼层加载最近的回复
-        floors_with_replies = []
-        for floor in floors_pagination.items:
-            # 获取该楼层的前几个回复
-            recent_replies = ForumReply.query.filter_by(
-                floor_id=floor.id,
-                status='published'
-            ).order_by(ForumReply.created_at.desc()).limit(3).all()
-
-            # 获取该楼层的总回复数
-            total_replies = ForumReply.query.filter_by(
-                floor_id=floor.id,
-                status='published'
-            ).count()
-
-            floors_with_replies.append({
-                'floor': floor,
-                'recent_replies': recent_replies,
-                'total_replies': total_replies
-            })
+        # 批量加载当前页所有楼层的最近回复与回复总数（两条查询，与每页楼层数无关）
+        floor_ids = [floor.id for floor in floors_pagination.items]
+        recent_replies = ForumReply.get_recent_replies_by_floors(floor_ids, limit=replies_limit)
+        total_replies = ForumReply.count_by_floors(floor_ids)
+
+        floors_with_replies = [{
+            'floor': floor,
+            'recent_replies': recent_replies[floor.id],
+            'total_replies': total_replies[floor.id]
+        } for floor in floors_pagination.items]
 
         return {
             'floors': floors_with_replies,
@@ -296,7 +380,11 @@ class ForumFloor(db.Model):
   # 论坛回复模型（对应forum_replies表）- 存储对楼层的回复
 class ForumReply(db.Model):
     __tablename__ = 'forum_replies'
-    __table_args__ = {'mysql_comment': '论坛回复表：存储对楼层的回复内容', 'comment': '论坛回复表：存储对楼层的回复内容'}
+    __table_args__ = (
+        # 按楼层取最近回复 / 统计回复数
+        db.Index('idx_forum_reply_floor_status_created', 'floor_id', 'status', 'created_at'),
+        {'mysql_comment': '论坛回复表：存储对楼层的回复内容', 'comment': '论坛回复表：存储对楼层的回复内容'}
+    )
     id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='回复唯一标识')
     floor_id = db.Column(db.Integer, db.ForeignKey('forum_floors.id', ondelete='CASCADE'), nullable=False, comment='楼层ID')
     content = db.Column(db.Text, nullable=False, comment='回复内容')
@@ -402,6 +490,82 @@ class ForumReply(db.Model):
 
         return replies_pagination
 
+    @staticmethod
+    def _supports_window_functions():
+        """当前数据库是否支持窗口函数（SQLite 3.25+、MySQL 8.0+、MariaDB 10.2+、PostgreSQL）"""
+        dialect = db.engine.dialect
+        version = dialect.server_version_info or ()
+        if dialect.name == 'sqlite':
+            return version >= (3, 25, 0)
+        if dialect.name == 'mysql':
+            return version >= ((10, 2) if getattr(dialect, 'is_mariadb', False) else (8, 0))
+        return True
+
+    @classmethod
+    def get_recent_replies_by_floors(cls, floor_ids, limit=3):
+        """
+        一条查询获取多个楼层各自最近的 limit 条已发布回复
+
+        支持窗口函数时使用 ROW_NUMBER() OVER (PARTITION BY floor_id ORDER BY created_at DESC)；
+        否则使用相关子查询统计"比当前回复更新的回复数 < limit"，结果相同。
+
+        Returns:
+            dict: {floor_id: [回复, ...]}，每个楼层按创建时间倒序，没有回复的楼层为空列表
+        """
+        from . import db
+
+        floor_ids = list({floor_id for floor_id in floor_ids if floor_id is not None})
+        result = {floor_id: [] for floor_id in floor_ids}
+        if not floor_ids or limit <= 0:
+            return result
+
+        if cls._supports_window_functions():
+            row_number = db.func.row_number().over(
+                partition_by=cls.floor_id,
+                order_by=(cls.created_at.desc(), cls.id.desc())
+            ).label('row_number')
+            ranked = db.session.query(cls.id.label('id'), row_number).filter(
+                cls.floor_id.in_(floor_ids),
+                cls.status == 'published'
+            ).subquery()
+            query = cls.query.join(ranked, ranked.c.id == cls.id).filter(ranked.c.row_number <= limit)
+        else:
+            newer = db.aliased(cls)
+            newer_count = db.session.query(db.func.count(newer.id)).filter(
+                newer.floor_id == cls.floor_id,
+                newer.status == 'published',
+                db.or_(
+                    newer.created_at > cls.created_at,
+                    db.and_(newer.created_at == cls.created_at, newer.id > cls.id)
+                )
+            ).correlate(cls).scalar_subquery()
+            query = cls.query.filter(
+                cls.floor_id.in_(floor_ids),
+                cls.status == 'published',
+                newer_count < limit
+            )
+
+        for reply in query.order_by(cls.floor_id, cls.created_at.desc(), cls.id.desc()).all():
+            result[reply.floor_id].append(reply)
+        return result
+
+    @classmethod
+    def count_by_floors(cls, floor_ids):
+        """一条分组查询统计多个楼层的已发布回复数，返回 {floor_id: 回复数}"""
+        from . import db
+
+        floor_ids = list({floor_id for floor_id in floor_ids if floor_id is not None})
+        result = {floor_id: 0 for floor_id in floor_ids}
+        if not floor_ids:
+            return result
+
+        rows = db.session.query(cls.floor_id, db.func.count(cls.id)).filter(
+            cls.floor_id.in_(floor_ids),
+            cls.status == 'published'
+        ).group_by(cls.floor_id).all()
+        result.update({floor_id: count for floor_id, count in rows})
+        return result
+
     # 动态字段信息
     @classmethod
     def get_fields_info(cls):
@@ -499,80 +663,97 @@ class ForumLike(db.Model):
             self.user_display = "用户已注销"
             self.user_id = None
 
+    @classmethod
+    def _like_counter(cls, target_type, delta, post_id=None, floor_id=None, reply_id=None):
+        """点赞目标对应的计数模型、目标ID，以及随点赞数同步调整的其他列"""
+        if target_type == 'post' and post_id:
+            # 热度分 = 点赞 + 评论 + 浏览/10，点赞数变化时同步调整
+            return ForumPost, post_id, {'hot_score': db.func.coalesce(ForumPost.__table__.c.hot_score, 0) + delta}
+        if target_type == 'floor' and floor_id:
+            return ForumFloor, floor_id, None
+        if target_type == 'reply' and reply_id:
+            return ForumReply, reply_id, None
+        return None, None, None
+
+    @staticmethod
+    def _category_likes_adjuster(counter_model, counter_id):
+        """帖子点赞数变化时，在同一事务内同步调整所属分类的点赞合计"""
+        if counter_model is not ForumPost:
+            return None
+
+        def _adjust(delta):
+            from components.forum_category_stats import category_stats
+            category_stats.apply_counter_deltas(db.session.connection(), 'total_likes', {counter_id: delta})
+
+        return _adjust
+
     @classmethod
     def create_like(cls, user_id, target_type, target_id, post_id=None, floor_id=None, reply_id=None):
-        """创建点赞记录并同步更新计数"""
-        # 检查是否已经点赞
-        existing_like = cls.query.filter_by(
-            user_id=user_id,
-            target_type=target_type,
-            target_id=target_id
-        ).first()
-
-        if existing_like:
-            return None  # 已经点赞过
-
-        # 创建点赞记录
-        like = cls(
-            user_id=user_id,
-            target_type=target_type,
-            target_id=target_id,
-            post_id=post_id if target_type == 'post' else None,
-            floor_id=floor_id if target_type == 'floor' else None,
-            reply_id=reply_id if target_type == 'reply' else None
-        )
+        """
+        创建点赞记录并同步更新计数
 
-        from . import db
-        db.session.add(like)
+        通过 components.like_engine 在一个事务内插入点赞记录（依赖 unique_forum_like 去重：SQLite/PostgreSQL 使用
+        ON CONFLICT DO NOTHING，MySQL 在保存点内插入并只把唯一键冲突 1062 视为已点赞），
+        确实插入一行时再执行 UPDATE like_count = like_count + 1，不加载目标对象。
 
-        # 同步更新对应目标的点赞计数
-        if target_type == 'post' and post_id:
-            post = ForumPost.query.get(post_id)
-            if post:
-                post.like_count += 1
-        elif target_type == 'floor' and floor_id:
-            floor = ForumFloor.query.get(floor_id)
-            if floor:
-                floor.like_count += 1
-        elif target_type == 'reply' and reply_id:
-            reply = ForumReply.query.get(reply_id)
-            if reply:
-                reply.like_count += 1
+        Returns:
+            bool: 是否新增点赞（已经点赞过返回 False）
+        """
+        from components import like_engine
 
-        db.session.commit()
-        return like
+        counter_model, counter_id, counter_values = cls._like_counter(
+            target_type, 1, post_id, floor_id, reply_id
+        )
+        if not counter_model:
+            return False
+
+        values = {
+            'user_id': user_id,
+            'target_type': target_type,
+            'target_id': target_id,
+            'post_id': post_id if target_type == 'post' else None,
+            'floor_id': floor_id if target_type == 'floor' else None,
+            'reply_id': reply_id if target_type == 'reply' else None,
+            'created_at': datetime.now()
+        }
+        created = like_engine.add_like(
+            cls, values, ['user_id', 'target_type', 'target_id'], counter_model, counter_id, counter_values,
+            after_adjust=cls._category_likes_adjuster(counter_model, counter_id)
+        )
+
+        if created and counter_model is ForumPost:
+            from components.forum_hot_ranking import hot_ranking
+            hot_ranking.bump_scores({counter_id: 1})
+        return created
 
     @classmethod
     def remove_like(cls, user_id, target_type, target_id, post_id=None, floor_id=None, reply_id=None):
-        """取消点赞并同步更新计数"""
-        like = cls.query.filter_by(
-            user_id=user_id,
-            target_type=target_type,
-            target_id=target_id
-        ).first()
+        """
+        取消点赞并同步更新计数
 
-        if not like:
-            return False  # 没有点赞记录
+        在一个事务内执行 DELETE 和 UPDATE like_count = like_count - 1（不低于0）。
 
-        from . import db
-        db.session.delete(like)
+        Returns:
+            bool: 是否取消成功（没有点赞记录返回 False）
+        """
+        from components import like_engine
 
-        # 同步更新对应目标的点赞计数
-        if target_type == 'post' and post_id:
-            post = ForumPost.query.get(post_id)
-            if post and post.like_count > 0:
-                post.like_count -= 1
-        elif target_type == 'floor' and floor_id:
-            floor = ForumFloor.query.get(floor_id)
-            if floor and floor.like_count > 0:
-                floor.like_count -= 1
-        elif target_type == 'reply' and reply_id:
-            reply = ForumReply.query.get(reply_id)
-            if reply and reply.like_count > 0:
-                reply.like_count -= 1
+        counter_model, counter_id, counter_values = cls._like_counter(
+            target_type, -1, post_id, floor_id, reply_id
+        )
+        if not counter_model:
+            return False
 
-        db.session.commit()
-        return True
+        removed = like_engine.remove_like(
+            cls, {'user_id': user_id, 'target_type': target_type, 'target_id': target_id},
+            counter_model, counter_id, counter_values,
+            after_adjust=cls._category_likes_adjuster(counter_model, counter_id)
+        )
+
+        if removed and counter_model is ForumPost:
+            from components.forum_hot_ranking import hot_ranking
+            hot_ranking.bump_scores({counter_id: -1})
+        return removed
 
     # 唯一约束
     __table_args__ = (
@@ -33,4 +33,59 @@ class Attachment(db.Model):
             'file_type': {'label': '文件类型', 'type': 'string'},
             'usage_type': {'label': '用途类型', 'type': 'enum', 'options': ['avatar', 'cover', 'attachment']},
             'created_at': {'label': '创建时间', 'type': 'datetime', 'readonly': True}
-        }
\ No newline at end of file
+        }
+
+# 全文检索倒排索引模型（对应search_tokens表）
+class SearchToken(db.Model):
+    """
+    倒排索引：每个文档的每个词元一行（中文、英文数字连续片段均按字符二元组切分）
+    由 components.search_index 在模型写入时增量维护，可通过 scripts/rebuild_search_index.py 重建
+    """
+    __tablename__ = 'search_tokens'
+    __table_args__ = (
+        # 删除/重建单个文档的索引
+        db.Index('idx_search_token_doc', 'doc_type', 'doc_id'),
+        {'mysql_comment': '全文检索倒排索引表：存储文档词元及权重', 'comment': '全文检索倒排索引表：存储文档词元及权重'}
+    )
+    # 主键顺序 (doc_type, token, doc_id)：检索时按 文档类型 + 词元 直接定位倒排列表
+    doc_type = db.Column(db.String(32), primary_key=True, nullable=False, comment='文档类型（forum_post/science_article/notice/activity/activity_discuss）')
+    token = db.Column(db.String(32), primary_key=True, nullable=False, comment='词元（中文或小写英文数字的字符二元组）')
+    doc_id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=False, comment='文档ID（对应业务表主键）')
+    weight = db.Column(db.Integer, nullable=False, default=1, comment='权重（词频 * 字段权重，标题权重高于正文）')
+
+
+# 敏感词模型（对应sensitive_words表）
+class SensitiveWord(db.Model):
+    """敏感词库（由 components.sensitive_words 定期检查变化并热加载）"""
+    __tablename__ = 'sensitive_words'
+    __table_args__ = {'mysql_comment': '敏感词表：存储内容过滤使用的敏感词', 'comment': '敏感词表：存储内容过滤使用的敏感词'}
+    id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='敏感词ID')
+    word = db.Column(db.String(100), nullable=False, unique=True, comment='敏感词')
+    is_active = db.Column(db.Boolean, nullable=False, default=True, comment='是否启用')
+    created_at = db.Column(db.DateTime, default=datetime.now, comment='创建时间')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
+
+    # 动态字段信息
+    @classmethod
+    def get_fields_info(cls):
+        return {
+            'id': {'label': '敏感词ID', 'type': 'bigint', 'readonly': True},
+            'word': {'label': '敏感词', 'type': 'string'},
+            'is_active': {'label': '是否启用', 'type': 'boolean'},
+            'created_at': {'label': '创建时间', 'type': 'datetime', 'readonly': True},
+            'updated_at': {'label': '更新时间', 'type': 'datetime', 'readonly': True}
+        }
+
+
+# 定时任务租约模型（对应scheduler_leases表）
+class SchedulerLease(db.Model):
+    """
+    定时任务主节点租约：多进程/多实例部署时同一任务只由持有未过期租约的进程执行
+    由 components.activity_lifecycle 以条件 UPDATE 获取与续期
+    """
+    __tablename__ = 'scheduler_leases'
+    __table_args__ = {'mysql_comment': '定时任务租约表：记录各定时任务当前的执行进程', 'comment': '定时任务租约表：记录各定时任务当前的执行进程'}
+    name = db.Column(db.String(64), primary_key=True, nullable=False, comment='任务名称')
+    owner = db.Column(db.String(128), nullable=False, comment='持有者（主机名:进程号）')
+    expires_at = db.Column(db.DateTime, nullable=False, comment='租约到期时间（到期后其他进程可接管）')
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='最近获取/续期时间')
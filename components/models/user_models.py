@@ -7,8 +7,12 @@ from .base import BaseUser, db, get_table_comment_args
 # 管理员模型（仅管理员模块使用，但定义在公共组件中供共享）
 class Admin(BaseUser):
     __tablename__ = 'admin_info'
-    __table_args__ = {'mysql_comment': '管理员信息表：存储系统管理员的登录信息和权限设置',
-                     'comment': '管理员信息表：存储系统管理员的登录信息和权限设置'}
+    __table_args__ = (
+        # 登录时按邮箱查找
+        db.Index('idx_admin_email', 'email'),
+        {'mysql_comment': '管理员信息表：存储系统管理员的登录信息和权限设置',
+         'comment': '管理员信息表：存储系统管理员的登录信息和权限设置'},
+    )
     id = db.Column(db.Integer, primary_key=True, nullable=False, autoincrement=True, comment='管理员记录ID（主键）')
     account = db.Column(db.String(80), unique=True, nullable=False, comment='管理员登录账号（唯一）')
     password_hash = db.Column(db.String(255), nullable=False, comment='管理员密码哈希值（加密存储）')
@@ -127,6 +131,11 @@ class Admin(BaseUser):
             db.session.delete(self)
             db.session.commit()
 
+            # 管理员记录已删除、用户角色已变更，清除两者的主体缓存
+            from components.principal_cache import invalidate_principal
+            invalidate_principal(self)
+            invalidate_principal(self.user)
+
             print(f"【管理员降级】管理员ID: {self.id} 已降级为普通用户，用户ID: {self.user_id}")
             return {
                 'success': True,
@@ -221,6 +230,7 @@ class User(BaseUser):
         # MySQL不支持下推WHERE条件的唯一索引，改为应用层验证
         db.Index('idx_account', 'account'),
         db.Index('idx_phone', 'phone'),
+        db.Index('idx_email', 'email'),
         db.Index('idx_deleted', 'is_deleted'),
         # 表备注配置
         {'mysql_comment': '用户信息表：存储所有类型用户的基本信息和账号数据',
@@ -250,6 +260,10 @@ class User(BaseUser):
         # 匿名化相关数据
         self._anonymize_activity_data(original_account)
 
+        # 已注销用户不能继续命中主体缓存
+        from components.principal_cache import invalidate_principal
+        invalidate_principal(self)
+
         return deleted_user, "注销成功"
 
     def _anonymize_activity_data(self, original_account):
@@ -0,0 +1,137 @@
+# ./components/password_hasher.py
+
+"""
+密码哈希计算服务
+werkzeug 的 scrypt/PBKDF2 为 CPU 密集型计算，放在请求线程内执行时，登录高峰会占满所有工作线程。
+此处将哈希计算交给独立的有界进程池执行：
+
+- 进程池大小与排队上限由 Config 配置，超过上限立即抛出 PasswordHasherBusyError（接口返回 503）
+- 哈希算法与成本参数由 Config.PASSWORD_HASH_METHOD 配置，
+  已存储哈希的参数与当前配置不一致时 needs_rehash 返回 True，登录成功后透明重新哈希
+- PASSWORD_HASH_WORKERS 设为 0 时退化为在当前线程内计算（开发/测试环境）
+"""
+
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusyError(Exception):
+    """哈希服务繁忙（排队已满或等待超时）"""
+    pass
+
+
+class PasswordHasher:
+    """基于有界进程池的密码哈希服务"""
+
+    def __init__(self, method, salt_length=16, workers=2, max_pending=32, timeout=10):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._normalized_method = None
+        self._rejected = 0
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _reset_pool(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _run(self, func, *args, **kwargs):
+        """在进程池中执行哈希函数，排队已满时快速失败"""
+        if self.workers <= 0:
+            return func(*args, **kwargs)
+
+        if not self._slots.acquire(blocking=False):
+            self._rejected += 1
+            logger.warning("【密码哈希】排队已满（上限 %s），拒绝请求", self.max_pending)
+            raise PasswordHasherBusyError('服务繁忙，请稍后重试')
+
+        try:
+            future = self._get_pool().submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            # 工作进程异常退出后重建进程池
+            self._slots.release()
+            self._reset_pool()
+            raise PasswordHasherBusyError('服务繁忙，请稍后重试')
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusyError('服务繁忙，请稍后重试')
+        except BrokenProcessPool:
+            self._reset_pool()
+            raise PasswordHasherBusyError('服务繁忙，请稍后重试')
+
+    def hash(self, password):
+        """按当前配置生成密码哈希"""
+        return self._run(generate_password_hash, password,
+                         method=self.method, salt_length=self.salt_length)
+
+    def verify(self, password_hash, password):
+        """校验密码"""
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def _get_normalized_method(self):
+        """
+        获取配置算法的完整参数串（如 'pbkdf2' 规范化为 'pbkdf2:sha256:1000000'），
+        以便与已存储哈希的前缀直接比较
+        """
+        if self._normalized_method is None:
+            sample = generate_password_hash('x', method=self.method, salt_length=1)
+            self._normalized_method = sample.split('$', 1)[0]
+        return self._normalized_method
+
+    def needs_rehash(self, password_hash):
+        """已存储哈希的算法或成本参数是否与当前配置不一致"""
+        if not password_hash or '$' not in password_hash:
+            return True
+        return password_hash.split('$', 1)[0] != self._get_normalized_method()
+
+    def get_stats(self):
+        """获取哈希服务状态"""
+        return {
+            'method': self.method,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'rejected': self._rejected
+        }
+
+    def shutdown(self):
+        self._reset_pool()
+
+
+# 进程级单例
+password_hasher = PasswordHasher(
+    method=Config.PASSWORD_HASH_METHOD,
+    salt_length=Config.PASSWORD_SALT_LENGTH,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_pending=Config.PASSWORD_HASH_MAX_PENDING,
+    timeout=Config.PASSWORD_HASH_TIMEOUT
+)
+
+atexit.register(password_hasher.shutdown)
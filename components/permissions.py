@@ -1,10 +1,11 @@
 # ./components/permissions.py
 
 from functools import wraps
-from flask import jsonify, request
-import jwt
-from datetime import datetime
-from config import Config
+from flask import jsonify
+from components.auth_context import (
+    get_auth_context, AUTH_ERROR_MISSING, AUTH_ERROR_EXPIRED, AUTH_ERROR_INVALID
+)
+from components.principal_cache import load_principal
 
 # 权限等级常量
 PERMISSION_VISIT = 'visit'           # 访客（未登录）
@@ -26,59 +27,61 @@ class PermissionError(Exception):
 
 
 def extract_token_info(request):
-    """从请求中提取并验证token信息"""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header:
-        return None
-
-    try:
-        # 提取Bearer token
-        if auth_header.startswith('Bearer '):
-            token = auth_header[7:]
-        else:
-            token = auth_header
-
-        # 解码token
-        payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
-
-        # 检查token是否过期
-        if datetime.utcnow().timestamp() > payload.get('exp', 0):
-            return None
-
-        return payload
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
-    except Exception:
+    """从请求中提取并验证token信息（读取请求级认证解析结果）"""
+    ctx = get_auth_context()
+    if ctx.error in (AUTH_ERROR_MISSING, AUTH_ERROR_EXPIRED, AUTH_ERROR_INVALID):
         return None
+    return ctx.payload
 
 
 def get_user_from_token(token_info):
-    """根据token信息获取用户对象"""
+    """根据token信息获取用户对象（读取请求级认证解析结果）"""
     if not token_info:
         return None, None
 
-    try:
-        from components.models import User, Admin
+    ctx = get_auth_context()
+    if ctx.payload is token_info:
+        return ctx.principal, ctx.user_type
 
-        user_id = token_info.get('user_id')
-        role = token_info.get('role')
+    # 非当前请求的token信息，单独加载
+    principal, admin = load_principal(token_info.get('role'), token_info.get('user_id'))
+    if principal is None:
+        return None, None
+    return principal, 'admin' if principal is admin else 'user'
 
-        # 优先尝试管理员
-        if role in [PERMISSION_ADMIN, PERMISSION_SUPER_ADMIN]:
-            admin = Admin.query.get(user_id)
-            if admin:
-                return admin, 'admin'
 
-        # 尝试普通用户
-        user = User.query.get(user_id)
-        if user:
-            return user, 'user'
+def _check_auth_context():
+    """
+    校验当前请求的登录状态
 
-        return None, None
-    except Exception:
-        return None, None
+    Returns:
+        tuple: (AuthContext, 错误响应或None)
+    """
+    ctx = get_auth_context()
+    if ctx.error in (AUTH_ERROR_MISSING, AUTH_ERROR_EXPIRED, AUTH_ERROR_INVALID):
+        return ctx, (jsonify({
+            'success': False,
+            'message': '需要登录访问此接口',
+            'data': None
+        }), 401)
+
+    if not ctx.is_authenticated:
+        return ctx, (jsonify({
+            'success': False,
+            'message': '用户不存在或已被删除',
+            'data': None
+        }), 401)
+
+    # 特殊处理：如果用户是已删除的普通用户，拒绝访问
+    user = ctx.principal
+    if ctx.user_type == 'user' and getattr(user, 'is_deleted', 0):
+        return ctx, (jsonify({
+            'success': False,
+            'message': '用户已被注销',
+            'data': None
+        }), 401)
+
+    return ctx, None
 
 
 def require_permission(required_permissions):
@@ -104,34 +107,13 @@ def require_permission(required_permissions):
             if PERMISSION_VISIT in required_permissions:
                 return f(*args, **kwargs)
 
-            # 提取token信息
-            token_info = extract_token_info(request)
-            if not token_info:
-                return jsonify({
-                    'success': False,
-                    'message': '需要登录访问此接口',
-                    'data': None
-                }), 401
-
-            # 获取用户对象
-            user, user_type = get_user_from_token(token_info)
-            if not user:
-                return jsonify({
-                    'success': False,
-                    'message': '用户不存在或已被删除',
-                    'data': None
-                }), 401
+            ctx, error_response = _check_auth_context()
+            if error_response:
+                return error_response
+            user, user_type, token_info = ctx.principal, ctx.user_type, ctx.payload
 
             # 检查用户权限
-            user_role = getattr(user, 'role', PERMISSION_USER)
-
-            # 特殊处理：如果用户是已删除的普通用户，拒绝访问
-            if user_type == 'user' and hasattr(user, 'is_deleted') and user.is_deleted:
-                return jsonify({
-                    'success': False,
-                    'message': '用户已被注销',
-                    'data': None
-                }), 401
+            user_role = ctx.role
 
             # 验证权限
             if user_role not in required_permissions:
@@ -175,6 +157,23 @@ def super_admin_required(f):
     return require_permission([PERMISSION_SUPER_ADMIN])(f)
 
 
+def token_admin_required(f):
+    """
+    管理员记录校验（需置于 token_required 之后，视图第一个参数为 current_user）
+    读取请求级认证解析中已加载的管理员记录，不再额外查询
+    """
+    @wraps(f)
+    def decorated_function(current_user, *args, **kwargs):
+        if not get_auth_context().is_admin:
+            return jsonify({
+                'success': False,
+                'message': '需要管理员权限',
+                'data': None
+            }), 403
+        return f(current_user, *args, **kwargs)
+    return decorated_function
+
+
 def or_permission(*permission_lists):
     """
     或权限装饰器 - 满足任一权限组即可访问
@@ -187,34 +186,13 @@ def or_permission(*permission_lists):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # 提取token信息
-            token_info = extract_token_info(request)
-            if not token_info:
-                return jsonify({
-                    'success': False,
-                    'message': '需要登录访问此接口',
-                    'data': None
-                }), 401
-
-            # 获取用户对象
-            user, user_type = get_user_from_token(token_info)
-            if not user:
-                return jsonify({
-                    'success': False,
-                    'message': '用户不存在或已被删除',
-                    'data': None
-                }), 401
+            ctx, error_response = _check_auth_context()
+            if error_response:
+                return error_response
+            user, user_type, token_info = ctx.principal, ctx.user_type, ctx.payload
 
             # 检查用户权限
-            user_role = getattr(user, 'role', PERMISSION_USER)
-
-            # 特殊处理：如果用户是已删除的普通用户，拒绝访问
-            if user_type == 'user' and hasattr(user, 'is_deleted') and user.is_deleted:
-                return jsonify({
-                    'success': False,
-                    'message': '用户已被注销',
-                    'data': None
-                }), 401
+            user_role = ctx.role
 
             # 检查是否满足任一权限组
             for permission_list in permission_lists:
@@ -0,0 +1,213 @@
+# ./components/principal_cache.py
+
+"""
+登录主体（principal）进程级缓存
+token_required 每次请求都需要根据 JWT 中的 (role, user_id) 重建当前用户，
+此处按 (role, user_id) 缓存用户记录的列快照，命中时无需再查询数据库。
+
+- 缓存带 TTL 与容量上限（LRU 淘汰），线程安全
+- 缓存的是列值快照而非 ORM 对象，命中时以 merge(load=False) 挂到当前会话，
+  既不触发 SELECT，也不会在不同请求之间共享同一个 ORM 实例
+- 普通用户主体同时缓存其关联的管理员记录（admin_info.user_id），供权限判断使用
+- 修改身份数据的写路径需调用 invalidate_principal 使缓存失效
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from config import Config
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 缓存值中记录的记录类型
+PRINCIPAL_KIND_ADMIN = 'admin'
+PRINCIPAL_KIND_USER = 'user'
+
+
+class PrincipalCache:
+    """按 (role, user_id) 缓存登录主体列快照的 TTL + LRU 缓存"""
+
+    def __init__(self, ttl=60, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _get_model(kind):
+        from components.models import Admin, User
+        return Admin if kind == PRINCIPAL_KIND_ADMIN else User
+
+    @staticmethod
+    def _snapshot(obj):
+        """提取ORM对象的列值快照"""
+        mapper = inspect(obj).mapper
+        return {attr.key: getattr(obj, attr.key) for attr in mapper.column_attrs}
+
+    def _restore(self, kind, snapshot):
+        """根据快照重建实体并挂到当前会话（不触发SELECT）"""
+        if snapshot is None:
+            return None
+        model = self._get_model(kind)
+        obj = model()
+        for key, value in snapshot.items():
+            setattr(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
+
+    def get(self, role, user_id):
+        """
+        读取缓存
+
+        Returns:
+            命中时返回 (主体对象, 管理员记录或None)，均已挂到当前会话；未命中返回None
+        """
+        key = (role, user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            _, kind, snapshot, admin_snapshot = entry
+        principal = self._restore(kind, snapshot)
+        if kind == PRINCIPAL_KIND_ADMIN:
+            return principal, principal
+        return principal, self._restore(PRINCIPAL_KIND_ADMIN, admin_snapshot)
+
+    def put(self, role, user_id, obj, admin=None):
+        """
+        写入缓存
+
+        Args:
+            obj: 主体对象（Admin 或 User 实例）
+            admin: 主体为 User 时其关联的管理员记录（可为None）
+        """
+        from components.models import Admin
+        if isinstance(obj, Admin):
+            kind, admin_snapshot = PRINCIPAL_KIND_ADMIN, None
+        else:
+            kind = PRINCIPAL_KIND_USER
+            admin_snapshot = self._snapshot(admin) if admin is not None else None
+        entry = (time.monotonic() + self.ttl, kind, self._snapshot(obj), admin_snapshot)
+        with self._lock:
+            self._entries[(role, user_id)] = entry
+            self._entries.move_to_end((role, user_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, kind, record_id):
+        """
+        使指定记录的缓存失效
+
+        Args:
+            kind: 'admin' 或 'user'，对应 admin_info / user_info 表
+            record_id: 记录主键
+        """
+        with self._lock:
+            # 旧令牌（role缺失）可能解析到任一张表，一并清除
+            for key in ((kind, record_id), (None, record_id)):
+                if self._entries.pop(key, None) is not None:
+                    self._invalidations += 1
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """获取缓存命中统计"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / total, 4) if total else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                # 每次命中即省去一次主键查询
+                'saved_queries': self._hits
+            }
+
+
+# 进程级单例
+principal_cache = PrincipalCache(
+    ttl=Config.PRINCIPAL_CACHE_TTL,
+    max_size=Config.PRINCIPAL_CACHE_MAX_SIZE
+)
+
+
+def load_principal(role, user_id):
+    """
+    按令牌中的 (role, user_id) 加载当前主体及其管理员记录，优先读缓存
+
+    未命中时每种角色只执行一条查询：管理员主体本身即管理员记录；
+    普通用户主体通过 LEFT JOIN admin_info 一并取回关联的管理员记录。
+
+    Returns:
+        tuple: (主体对象, 管理员记录)，主体不存在时返回 (None, None)
+    """
+    from components.models import Admin
+
+    # 旧令牌的role不可信，统一按None缓存
+    cache_role = role if role in (PRINCIPAL_KIND_ADMIN, PRINCIPAL_KIND_USER) else None
+    cached = principal_cache.get(cache_role, user_id)
+    if cached is not None:
+        return cached
+
+    principal, admin = None, None
+    if role == 'admin':
+        principal = admin = Admin.query.get(user_id)
+    elif role == 'user':
+        principal, admin = _load_user_with_admin(user_id)
+    else:
+        # 兼容旧逻辑，按顺序查找
+        principal = admin = Admin.query.get(user_id)
+        if not principal:
+            principal, admin = _load_user_with_admin(user_id)
+
+    if principal is not None:
+        principal_cache.put(cache_role, user_id, principal, admin)
+    return principal, admin
+
+
+def _load_user_with_admin(user_id):
+    """单条 LEFT JOIN 查询取回用户及其关联的管理员记录"""
+    from components.models import Admin, User
+
+    row = db.session.query(User, Admin).outerjoin(
+        Admin, Admin.user_id == User.id
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None, None
+    return row[0], row[1]
+
+
+def invalidate_principal(obj):
+    """使指定用户对象（Admin 或 User）的缓存失效"""
+    from components.models import Admin
+    if obj is None:
+        return
+    if isinstance(obj, Admin):
+        principal_cache.invalidate(PRINCIPAL_KIND_ADMIN, obj.id)
+        # 关联用户的缓存条目中也带有该管理员记录
+        if obj.user_id is not None:
+            principal_cache.invalidate(PRINCIPAL_KIND_USER, obj.user_id)
+    else:
+        principal_cache.invalidate(PRINCIPAL_KIND_USER, obj.id)
@@ -9,6 +9,7 @@ from flask import jsonify, request
 from typing import Dict, Any, Optional, Union, List
 from functools import wraps
 from .models import Admin, User
+from .password_hasher import PasswordHasherBusyError
 from datetime import datetime
 import logging
 
@@ -185,6 +186,8 @@ def handle_api_exception(func):
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
+        except PasswordHasherBusyError as e:
+            return ResponseService.error(str(e), status_code=503)
         except ValueError as e:
             return ResponseService.error(str(e), status_code=400)
         except PermissionError as e:
@@ -0,0 +1,320 @@
+# ./components/search_index.py
+
+"""
+全文检索索引服务
+关键词搜索原先为 title/content LIKE '%关键词%'，每次搜索全表扫描。此处维护一张倒排索引表（search_tokens）：
+
+- 分词：中文（CJK）连续字符与英文数字连续字符（转小写）都切分为字符二元组
+  （"科普文章" -> 科普/普文/文章，"python" -> py/yt/th/ho/on）；查询使用同样的分词，要求文档包含全部查询词元。
+  关键词出现在文档中时，其每个二元组必然出现在文档的同一连续片段中，因此单词中间或结尾的片段也能命中
+  （"ython" 命中 "python"，"ab" 命中 "cab"）
+- 复核：索引只用于缩小候选集（二元组都出现但不相邻的文档也会成为候选），候选行再执行 LIKE 条件，
+  搜索结果与原 LIKE 查询一致（整个关键词作为一个短语匹配，含空格时空格也需相同；
+  LIKE 的大小写规则以数据库排序规则为准，索引统一小写，只会多出候选）
+- 排序：得分 = 命中词元的权重之和（权重 = 词频 * 字段权重，标题权重高于正文）
+- 增量更新：注册的模型通过 ORM 的 after_insert/after_update/after_delete 事件，
+  在同一事务的保存点内重写该文档的词元（仅在被索引字段变化时），写入失败只回滚保存点；
+  绕过 ORM 的批量 UPDATE 需执行重建
+- 重建：scripts/rebuild_search_index.py
+- 可插拔：Config.SEARCH_BACKEND = 'index' 使用倒排索引，'like' 回退为原来的 LIKE 查询；
+  查询切分不出任何词元时（如单个汉字、单个字母、只有标点）自动回退为 LIKE
+- 分词规则变化后需执行重建
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from config import Config
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 中文及其他 CJK 字符连续片段、英文数字连续片段（切分为字符二元组）
+_RUN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]{2,}|[0-9a-z]{2,}')
+
+# 文档类型
+SEARCH_DOC_FORUM_POST = 'forum_post'
+SEARCH_DOC_SCIENCE_ARTICLE = 'science_article'
+SEARCH_DOC_NOTICE = 'notice'
+SEARCH_DOC_ACTIVITY = 'activity'
+SEARCH_DOC_ACTIVITY_DISCUSS = 'activity_discuss'
+
+
+def _bigrams(text):
+    """文本中各连续片段的字符二元组（中文与英文数字分别成段，小写）"""
+    for run in _RUN.findall(text.lower()):
+        for i in range(len(run) - 1):
+            yield run[i:i + 2]
+
+
+def tokenize(text):
+    """
+    切分文本为词元
+
+    Returns:
+        Counter: {词元: 出现次数}
+    """
+    if not text:
+        return Counter()
+    return Counter(_bigrams(text))
+
+
+def tokenize_query(keyword):
+    """
+    切分查询关键词
+
+    Returns:
+        list: 去重后的词元（保持出现顺序）
+    """
+    return list(dict.fromkeys(_bigrams(keyword or '')))
+
+
+def _get_doc_types():
+    """各文档类型对应的模型与被索引字段 {字段名: 字段权重}"""
+    from components.models import ForumPost, ScienceArticle, Notice, Activity, ActivityDiscuss
+    return {
+        SEARCH_DOC_FORUM_POST: {'model': ForumPost, 'fields': {'title': 3, 'content': 1}},
+        SEARCH_DOC_SCIENCE_ARTICLE: {'model': ScienceArticle, 'fields': {'title': 3, 'content': 1}},
+        SEARCH_DOC_NOTICE: {'model': Notice, 'fields': {'release_title': 1}},
+        SEARCH_DOC_ACTIVITY: {'model': Activity, 'fields': {'title': 3, 'description': 1}},
+        SEARCH_DOC_ACTIVITY_DISCUSS: {'model': ActivityDiscuss, 'fields': {'content': 1}}
+    }
+
+
+class LikeSearchBackend:
+    """回退方案：被索引字段 LIKE '%关键词%'（全表扫描）"""
+
+    name = 'like'
+
+    def apply(self, query, doc_type, doc, keyword, terms, rank=False):
+        """整个关键词在任一被索引字段中出现"""
+        model = doc['model']
+        return query.filter(db.or_(*[getattr(model, field).like(f'%{keyword}%') for field in doc['fields']]))
+
+
+class TokenIndexSearchBackend:
+    """倒排索引检索：按词元定位文档并按权重排序"""
+
+    name = 'index'
+
+    def match_query(self, doc_type, terms):
+        """
+        构造命中文档及得分的查询：SELECT doc_id, score
+
+        各词元按主键 (doc_type, token, doc_id) 逐个连接求交集，得分为各词元权重之和
+        """
+        from components.models import SearchToken
+
+        aliases = [db.aliased(SearchToken) for _ in terms]
+        base = aliases[0]
+        score = sum((alias.weight for alias in aliases[1:]), base.weight)
+        query = db.session.query(base.doc_id.label('doc_id'), score.label('score')).filter(
+            base.doc_type == doc_type, base.token == terms[0]
+        )
+        for alias, token in zip(aliases[1:], terms[1:]):
+            query = query.join(alias, db.and_(
+                alias.doc_type == doc_type, alias.token == token, alias.doc_id == base.doc_id
+            ))
+        return query
+
+    def apply(self, query, doc_type, doc, keyword, terms, rank=False):
+        """以倒排索引缩小候选集，再对候选行执行原 LIKE 条件复核，结果与 LIKE 查询一致"""
+        matched = self.match_query(doc_type, terms).subquery()
+        query = query.join(matched, matched.c.doc_id == doc['model'].id)
+        query = LikeSearchBackend().apply(query, doc_type, doc, keyword, terms)
+        if rank:
+            query = query.order_by(matched.c.score.desc())
+        return query
+
+
+class SearchIndex:
+    """全文检索入口：查询时选择检索后端，写入时维护倒排索引"""
+
+    def __init__(self, backend='index', rebuild_chunk_size=1000):
+        self.backend_name = backend
+        self.rebuild_chunk_size = rebuild_chunk_size
+        self._like_backend = LikeSearchBackend()
+        self._index_backend = TokenIndexSearchBackend()
+        self._listeners_registered = False
+        self._lock = threading.Lock()
+        self._stats = {'index_queries': 0, 'like_queries': 0, 'indexed_documents': 0, 'removed_documents': 0}
+
+    def init_app(self, app):
+        """读取配置并注册模型写入事件"""
+        self.backend_name = app.config.get('SEARCH_BACKEND', self.backend_name)
+        self.rebuild_chunk_size = app.config.get('SEARCH_REBUILD_CHUNK_SIZE', self.rebuild_chunk_size)
+        self.register_listeners()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # ========== 查询 ==========
+
+    def apply(self, query, doc_type, keyword, rank=False):
+        """
+        为查询附加关键词搜索条件
+
+        Args:
+            query: 业务查询（已包含状态等筛选条件）
+            doc_type: 文档类型
+            keyword: 关键词
+            rank: 是否先按相关度排序（调用方随后的 order_by 作为次级排序）
+
+        Returns:
+            附加了搜索条件的查询
+        """
+        doc = _get_doc_types()[doc_type]
+        terms = tokenize_query(keyword)
+        if self.backend_name != 'index' or not terms:
+            self._count('like_queries')
+            return self._like_backend.apply(query, doc_type, doc, keyword, terms, rank)
+
+        self._count('index_queries')
+        return self._index_backend.apply(query, doc_type, doc, keyword, terms, rank)
+
+    def search_ids(self, doc_type, keyword, page=1, per_page=20):
+        """
+        直接检索倒排索引，返回按相关度排序的一页文档ID（不附加业务筛选条件，也不执行 LIKE 复核，
+        结果为包含全部词元的候选文档）
+
+        Returns:
+            (ids, total): 当前页文档ID列表与命中总数
+        """
+        terms = tokenize_query(keyword)
+        if not terms:
+            return [], 0
+
+        self._count('index_queries')
+        matched = self._index_backend.match_query(doc_type, terms).subquery()
+        total = db.session.query(db.func.count()).select_from(matched).scalar()
+        rows = db.session.query(matched.c.doc_id).order_by(
+            matched.c.score.desc(), matched.c.doc_id.desc()
+        ).offset((page - 1) * per_page).limit(per_page).all()
+        return [row.doc_id for row in rows], total
+
+    # ========== 索引维护 ==========
+
+    @staticmethod
+    def document_tokens(fields, values):
+        """计算文档的词元权重 {词元: 权重}"""
+        weights = Counter()
+        for field, field_weight in fields.items():
+            for token, count in tokenize(values.get(field)).items():
+                weights[token] += count * field_weight
+        return weights
+
+    def _write_document(self, connection, doc_type, doc_id, weights):
+        """重写单个文档的词元（先删后插）"""
+        from components.models import SearchToken
+
+        table = SearchToken.__table__
+        connection.execute(table.delete().where(table.c.doc_type == doc_type, table.c.doc_id == doc_id))
+        if weights:
+            connection.execute(table.insert(), [
+                {'doc_type': doc_type, 'token': token, 'doc_id': doc_id, 'weight': weight}
+                for token, weight in weights.items()
+            ])
+
+    def register_listeners(self):
+        """为各文档类型的模型注册写入事件（只注册一次）"""
+        if self._listeners_registered:
+            return
+        from sqlalchemy import event
+
+        for doc_type, doc in _get_doc_types().items():
+            event.listen(doc['model'], 'after_insert', self._make_index_listener(doc_type, doc, check_changes=False))
+            event.listen(doc['model'], 'after_update', self._make_index_listener(doc_type, doc, check_changes=True))
+            event.listen(doc['model'], 'after_delete', self._make_delete_listener(doc_type))
+        self._listeners_registered = True
+
+    def _make_index_listener(self, doc_type, doc, check_changes):
+        fields = doc['fields']
+
+        def _listener(mapper, connection, target):
+            if check_changes:
+                state = db.inspect(target)
+                if not any(state.attrs[field].history.has_changes() for field in fields):
+                    return
+            try:
+                values = {field: getattr(target, field) for field in fields}
+                # 在保存点内写入：失败时只回滚保存点（PostgreSQL 中失败语句会使整个事务中止）
+                with connection.begin_nested():
+                    self._write_document(connection, doc_type, target.id, self.document_tokens(fields, values))
+                self._count('indexed_documents')
+            except Exception as e:
+                # 索引写入失败不影响业务写入，可通过重建修复
+                logger.warning("【检索索引更新失败】%s#%s: %s", doc_type, target.id, str(e))
+
+        return _listener
+
+    def _make_delete_listener(self, doc_type):
+        def _listener(mapper, connection, target):
+            try:
+                with connection.begin_nested():
+                    self._write_document(connection, doc_type, target.id, None)
+                self._count('removed_documents')
+            except Exception as e:
+                logger.warning("【检索索引删除失败】%s#%s: %s", doc_type, target.id, str(e))
+
+        return _listener
+
+    def rebuild(self, doc_type=None):
+        """
+        按主键分批重建倒排索引（指定 doc_type 时只重建该类型）
+
+        Returns:
+            dict: {文档类型: 重建的文档数}
+        """
+        from components.models import SearchToken
+
+        doc_types = _get_doc_types()
+        if doc_type:
+            doc_types = {doc_type: doc_types[doc_type]}
+
+        result = {}
+        for current_type, doc in doc_types.items():
+            started = time.perf_counter()
+            model, fields = doc['model'], doc['fields']
+            db.session.query(SearchToken).filter(SearchToken.doc_type == current_type).delete(synchronize_session=False)
+            db.session.commit()
+
+            last_id, total = 0, 0
+            while True:
+                rows = db.session.query(model.id, *[getattr(model, field) for field in fields]).filter(
+                    model.id > last_id
+                ).order_by(model.id).limit(self.rebuild_chunk_size).all()
+                if not rows:
+                    break
+
+                token_rows = []
+                for row in rows:
+                    values = dict(zip(fields, row[1:]))
+                    token_rows.extend(
+                        {'doc_type': current_type, 'token': token, 'doc_id': row[0], 'weight': weight}
+                        for token, weight in self.document_tokens(fields, values).items()
+                    )
+                if token_rows:
+                    db.session.execute(SearchToken.__table__.insert(), token_rows)
+                db.session.commit()
+
+                last_id = rows[-1][0]
+                total += len(rows)
+
+            result[current_type] = total
+            logger.info("【检索索引重建】%s: 文档数 %s, 耗时 %.1fs", current_type, total, time.perf_counter() - started)
+        return result
+
+    def get_stats(self):
+        """获取检索服务状态"""
+        with self._lock:
+            return dict(self._stats, backend=self.backend_name)
+
+
+# 进程级单例
+search_index = SearchIndex(
+    backend=Config.SEARCH_BACKEND,
+    rebuild_chunk_size=Config.SEARCH_REBUILD_CHUNK_SIZE
+)
@@ -0,0 +1,483 @@
+# ./components/seat_reservation.py
+
+"""
+活动名额预约引擎
+原预约流程为 加载活动 -> COUNT 已预约人数判断是否满员 -> 查询已有预约 -> 插入/重新激活预约，
+检查与写入之间没有任何约束，热门活动开放预约时并发请求会超额预约，且每次预约需要 4~5 次往返。
+此处以活动表的 current_participants 作为名额计数，在同一事务中执行：
+
+- 占用名额：UPDATE activities SET current_participants = current_participants + 1
+  WHERE id = ? AND status = 'published' AND end_time >= 当前时间
+  AND (max_participants <= 0 OR current_participants < max_participants)
+  条件不满足时不更新任何行，再读取活动判断具体原因（不存在/不可预约/已满）
+- 写入预约：先尝试把已取消的预约改回 booked（重新激活），没有则插入新预约；
+  唯一约束冲突说明已有预约，整个事务回滚，名额随之释放
+- 释放名额：预约由 booked 改为其他状态或被删除时
+  UPDATE activities SET current_participants = current_participants - 1 WHERE id = ? AND current_participants > 0
+- 批量预约（reserve_batch）：一次查询已有预约，按剩余名额一条条件 UPDATE 占用 n 个名额并批量写入，
+  供 components.booking_admission 预约排队分批写入
+- 占用/释放名额时记录活动ID，事务提交后失效 components.activity_availability 的可用性缓存
+- 批量修改状态（change_status_batch）：按旧状态分组，一条 UPDATE ... WHERE id IN (...) 修改一组预约，
+  由 booked 改出的行数一次释放，按批提交
+- 名额计数只统计 booked 状态的预约（与原"已预约人数"口径一致）；
+  存量数据或绕过本模块修改预约后执行 scripts/rebuild_activity_participants.py 重算
+"""
+
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from components.models import db
+
+# 占用名额的预约状态
+SEAT_STATUS = 'booked'
+
+# 预约结果
+RESERVE_BOOKED = 'booked'
+RESERVE_REACTIVATED = 'reactivated'
+RESERVE_DUPLICATE = 'duplicate'
+RESERVE_FULL = 'full'
+RESERVE_UNAVAILABLE = 'unavailable'
+RESERVE_NOT_FOUND = 'not_found'
+
+# 批量修改状态的单条结果
+BATCH_UPDATED = 'updated'
+BATCH_UNCHANGED = 'unchanged'
+BATCH_NOT_FOUND = 'not_found'
+BATCH_CONFLICT = 'conflict'
+BATCH_INVALID = 'invalid'
+
+
+class ReservationResult:
+    """预约结果：result 为 RESERVE_* 之一，成功时带预约ID"""
+
+    def __init__(self, result, booking_id=None, message=''):
+        self.result = result
+        self.booking_id = booking_id
+        self.message = message
+
+    @property
+    def success(self):
+        return self.result in (RESERVE_BOOKED, RESERVE_REACTIVATED)
+
+
+def _tables():
+    from components.models import Activity, ActivityBooking
+    return Activity.__table__, ActivityBooking.__table__
+
+
+def _touch(activity_id):
+    """记录活动名额已变化，事务提交后失效可用性缓存（回滚则丢弃）"""
+    from components import activity_availability
+
+    activity_availability.touch(activity_id)
+
+
+def claim_seat(activity_id, now=None, check_bookable=True):
+    """
+    占用一个名额（调用方事务内执行，由调用方提交）
+
+    Args:
+        activity_id: 活动ID
+        now: 判断活动是否结束的当前时间
+        check_bookable: 是否要求活动可预约（已发布且未结束）；管理员修改预约状态时只检查人数
+
+    Returns:
+        bool: 是否占用成功（活动不存在、不可预约或已满时为 False）
+    """
+    activities, _ = _tables()
+    participants = db.func.coalesce(activities.c.current_participants, 0)
+    conditions = [
+        activities.c.id == activity_id,
+        db.or_(activities.c.max_participants <= 0, participants < activities.c.max_participants)
+    ]
+    if check_bookable:
+        conditions += [activities.c.status == 'published', activities.c.end_time >= (now or datetime.now())]
+    stmt = activities.update().where(*conditions).values(
+        current_participants=participants + 1, updated_at=activities.c.updated_at
+    )
+    _touch(activity_id)
+    return db.session.execute(stmt).rowcount == 1
+
+
+def release_seats(activity_id, count=1):
+    """释放名额（调用方事务内执行，计数不低于0）"""
+    if count <= 0:
+        return 0
+    activities, _ = _tables()
+    participants = db.func.coalesce(activities.c.current_participants, 0)
+    stmt = activities.update().where(
+        activities.c.id == activity_id, participants > 0
+    ).values(
+        current_participants=db.case((participants > count, participants - count), else_=0),
+        updated_at=activities.c.updated_at
+    )
+    _touch(activity_id)
+    return db.session.execute(stmt).rowcount
+
+
+def _diagnose(activity_id, now, check_bookable=True):
+    """占用名额失败时读取活动，返回具体原因（提示文案与 ActivityValidator.is_activity_bookable 一致）"""
+    from components.models import Activity
+
+    activity = db.session.get(Activity, activity_id)
+    if not activity:
+        return ReservationResult(RESERVE_NOT_FOUND, message='活动不存在')
+    if not check_bookable:
+        return ReservationResult(RESERVE_FULL, message='活动预约人数已满')
+    if activity.status != 'published':
+        return ReservationResult(RESERVE_UNAVAILABLE, message=f'当前活动状态({activity.status})不允许预约')
+    if activity.end_time and activity.end_time < now:
+        return ReservationResult(RESERVE_UNAVAILABLE, message='活动已结束，无法预约')
+    return ReservationResult(RESERVE_FULL, message='活动预约人数已满')
+
+
+def reserve(activity_id, user_account, notes=''):
+    """
+    预约活动：占用名额并写入预约（同一事务，一次提交）
+
+    Args:
+        activity_id: 活动ID
+        user_account: 用户账号
+        notes: 新预约的备注（重新激活已取消的预约时清空备注）
+
+    Returns:
+        ReservationResult
+    """
+    _, bookings = _tables()
+    now = datetime.now()
+    try:
+        if not claim_seat(activity_id, now):
+            db.session.rollback()
+            return _diagnose(activity_id, now)
+
+        # 已取消的预约重新激活
+        reactivated = db.session.execute(bookings.update().where(
+            bookings.c.activity_id == activity_id,
+            bookings.c.user_account == user_account,
+            bookings.c.status == 'cancelled'
+        ).values(status=SEAT_STATUS, notes=None, updated_at=now)).rowcount == 1
+
+        if reactivated:
+            booking_id = db.session.execute(db.select(bookings.c.id).where(
+                bookings.c.activity_id == activity_id, bookings.c.user_account == user_account
+            )).scalar()
+        else:
+            booking_id = db.session.execute(bookings.insert().values(
+                activity_id=activity_id, user_account=user_account, status=SEAT_STATUS, notes=notes,
+                booking_time=now, created_at=now, updated_at=now
+            )).inserted_primary_key[0]
+
+        db.session.commit()
+        return ReservationResult(RESERVE_REACTIVATED if reactivated else RESERVE_BOOKED, booking_id)
+
+    except IntegrityError:
+        # unique_booking 冲突：已有预约（booked/attended），回滚同时释放名额
+        db.session.rollback()
+        return ReservationResult(RESERVE_DUPLICATE, message='您已经预约过该活动')
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def reserve_batch(activity_id, requests):
+    """
+    批量预约同一活动（同一事务，一次提交；供预约排队分批写入）
+
+    先一次查询已有预约区分重复预约与重新激活，再按剩余名额用一条条件 UPDATE 占用 n 个名额，
+    前 n 个请求写入预约，其余为名额已满。其他进程并发修改导致条件不满足或唯一约束冲突时，
+    回滚并逐个调用 reserve()。
+
+    Args:
+        activity_id: 活动ID
+        requests: [(用户账号, 备注)]，按先后顺序
+
+    Returns:
+        list[ReservationResult]: 与 requests 一一对应
+    """
+    from components.models import Activity
+
+    activities, bookings = _tables()
+    now = datetime.now()
+    results = [None] * len(requests)
+
+    # 同一批内同一用户只处理第一次请求
+    first_index = {}
+    for index, (account, _) in enumerate(requests):
+        if account in first_index:
+            results[index] = ReservationResult(RESERVE_DUPLICATE, message='您已经预约过该活动')
+        else:
+            first_index[account] = index
+    if not first_index:
+        return results
+
+    try:
+        existing = dict(db.session.execute(db.select(bookings.c.user_account, bookings.c.status).where(
+            bookings.c.activity_id == activity_id, bookings.c.user_account.in_(list(first_index))
+        )).all())
+        candidates = []
+        for account, index in first_index.items():
+            if existing.get(account, 'cancelled') != 'cancelled':
+                results[index] = ReservationResult(RESERVE_DUPLICATE, message='您已经预约过该活动')
+            else:
+                candidates.append(index)
+        if not candidates:
+            db.session.rollback()
+            return results
+
+        activity = db.session.get(Activity, activity_id, populate_existing=True)
+        if activity is None or activity.status != 'published' or (activity.end_time and activity.end_time < now):
+            db.session.rollback()
+            failure = _diagnose(activity_id, now)
+            for index in candidates:
+                results[index] = ReservationResult(failure.result, message=failure.message)
+            return results
+
+        if activity.max_participants and activity.max_participants > 0:
+            available = max(activity.max_participants - (activity.current_participants or 0), 0)
+        else:
+            available = len(candidates)
+        admitted, rejected = candidates[:available], candidates[available:]
+        for index in rejected:
+            results[index] = ReservationResult(RESERVE_FULL, message='活动预约人数已满')
+        if not admitted:
+            db.session.rollback()
+            return results
+
+        # 一条条件 UPDATE 占用 n 个名额（读取后名额被其他进程占用时不更新）
+        count = len(admitted)
+        _touch(activity_id)
+        participants = db.func.coalesce(activities.c.current_participants, 0)
+        claimed = db.session.execute(activities.update().where(
+            activities.c.id == activity_id,
+            activities.c.status == 'published',
+            activities.c.end_time >= now,
+            db.or_(activities.c.max_participants <= 0, participants + count <= activities.c.max_participants)
+        ).values(current_participants=participants + count, updated_at=activities.c.updated_at)).rowcount == 1
+
+        reactivate = [requests[index][0] for index in admitted if requests[index][0] in existing]
+        inserts = [index for index in admitted if requests[index][0] not in existing]
+        if claimed and reactivate:
+            reactivated = db.session.execute(bookings.update().where(
+                bookings.c.activity_id == activity_id,
+                bookings.c.user_account.in_(reactivate),
+                bookings.c.status == 'cancelled'
+            ).values(status=SEAT_STATUS, notes=None, updated_at=now)).rowcount
+            claimed = reactivated == len(reactivate)
+        if not claimed:
+            db.session.rollback()
+            return _reserve_each(activity_id, requests, admitted, results)
+
+        if inserts:
+            db.session.execute(bookings.insert(), [{
+                'activity_id': activity_id, 'user_account': requests[index][0], 'status': SEAT_STATUS,
+                'notes': requests[index][1], 'booking_time': now, 'created_at': now, 'updated_at': now
+            } for index in inserts])
+        booking_ids = dict(db.session.execute(db.select(bookings.c.user_account, bookings.c.id).where(
+            bookings.c.activity_id == activity_id,
+            bookings.c.user_account.in_([requests[index][0] for index in admitted])
+        )).all())
+        db.session.commit()
+
+    except IntegrityError:
+        db.session.rollback()
+        return _reserve_each(activity_id, requests, admitted, results)
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for index in admitted:
+        account = requests[index][0]
+        result = RESERVE_REACTIVATED if account in existing else RESERVE_BOOKED
+        results[index] = ReservationResult(result, booking_ids.get(account))
+    return results
+
+
+def _reserve_each(activity_id, requests, indexes, results):
+    """批量写入冲突时逐个预约"""
+    for index in indexes:
+        account, notes = requests[index]
+        results[index] = reserve(activity_id, account, notes)
+    return results
+
+
+def change_status(booking_id, new_status, values=None):
+    """
+    修改预约状态并同步名额（同一事务，一次提交）
+
+    由 booked 改为其他状态时释放名额；由其他状态改为 booked 时占用名额，活动已满时不修改。
+
+    Args:
+        booking_id: 预约ID
+        new_status: 新状态
+        values: 同时更新的其他列（如备注）
+
+    Returns:
+        tuple[bool, str]: (是否修改成功, 失败原因)
+    """
+    _, bookings = _tables()
+    now = datetime.now()
+    try:
+        row = db.session.execute(
+            db.select(bookings.c.activity_id, bookings.c.status).where(bookings.c.id == booking_id)
+        ).first()
+        if row is None:
+            return False, '预约记录不存在'
+        activity_id, old_status = row
+
+        if new_status == SEAT_STATUS and old_status != SEAT_STATUS \
+                and not claim_seat(activity_id, now, check_bookable=False):
+            db.session.rollback()
+            return False, _diagnose(activity_id, now, check_bookable=False).message
+
+        # 以读取到的旧状态为条件，并发修改时只有一个请求生效
+        updated = db.session.execute(bookings.update().where(
+            bookings.c.id == booking_id, bookings.c.status == old_status
+        ).values(status=new_status, updated_at=now, **(values or {}))).rowcount == 1
+        if not updated:
+            db.session.rollback()
+            return False, '预约状态已被修改，请刷新后重试'
+
+        if old_status == SEAT_STATUS and new_status != SEAT_STATUS:
+            release_seats(activity_id)
+        db.session.commit()
+        return True, ''
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def change_status_batch(activity_id, booking_ids, new_status, chunk_size=500):
+    """
+    批量修改同一活动的预约状态（集合操作，按 chunk_size 分批，每批一个事务）
+
+    每批先一条查询读取预约当前状态，再按旧状态分组执行
+    UPDATE activity_bookings SET status = ? WHERE activity_id = ? AND id IN (...) AND status = 旧状态，
+    由 booked 改出的行数同一事务内从名额计数中释放。只支持改为不占用名额的状态（签到/缺席/取消）。
+
+    Args:
+        activity_id: 活动ID
+        booking_ids: 预约ID列表（重复ID只处理一次）
+        new_status: 新状态
+        chunk_size: 每批处理的预约数
+
+    Returns:
+        tuple[list[dict], int]: (按请求顺序的每个预约ID结果 {'booking_id', 'result', 'old_status'}, 释放的名额数)
+    """
+    if new_status == SEAT_STATUS:
+        raise ValueError('批量操作不支持改为已预约状态')
+
+    outcomes, pending = [], []
+    seen = set()
+    for raw_id in booking_ids:
+        try:
+            if isinstance(raw_id, bool):
+                raise TypeError
+            booking_id = int(raw_id)
+        except (TypeError, ValueError):
+            outcomes.append({'booking_id': raw_id, 'result': BATCH_INVALID, 'old_status': None})
+            continue
+        if booking_id in seen:
+            continue
+        seen.add(booking_id)
+        outcome = {'booking_id': booking_id, 'result': BATCH_NOT_FOUND, 'old_status': None}
+        outcomes.append(outcome)
+        pending.append(outcome)
+
+    _, bookings = _tables()
+    released = 0
+    for start in range(0, len(pending), chunk_size):
+        chunk = {outcome['booking_id']: outcome for outcome in pending[start:start + chunk_size]}
+        now = datetime.now()
+        try:
+            rows = db.session.execute(db.select(bookings.c.id, bookings.c.status).where(
+                bookings.c.activity_id == activity_id, bookings.c.id.in_(list(chunk))
+            )).all()
+            groups = {}
+            for booking_id, old_status in rows:
+                chunk[booking_id]['old_status'] = old_status
+                if old_status == new_status:
+                    chunk[booking_id]['result'] = BATCH_UNCHANGED
+                else:
+                    groups.setdefault(old_status, []).append(booking_id)
+
+            for old_status, ids in groups.items():
+                count = db.session.execute(bookings.update().where(
+                    bookings.c.activity_id == activity_id, bookings.c.id.in_(ids), bookings.c.status == old_status
+                ).values(status=new_status, updated_at=now)).rowcount
+                if count == len(ids):
+                    updated = ids
+                else:
+                    # 读取后被并发修改的预约未更新，重新读取区分（已是新状态的视为成功）
+                    updated = db.session.execute(db.select(bookings.c.id).where(
+                        bookings.c.id.in_(ids), bookings.c.status == new_status
+                    )).scalars().all()
+                for booking_id in ids:
+                    chunk[booking_id]['result'] = BATCH_CONFLICT
+                for booking_id in updated:
+                    chunk[booking_id]['result'] = BATCH_UPDATED
+                if old_status == SEAT_STATUS and count:
+                    release_seats(activity_id, count)
+                    released += count
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return outcomes, released
+
+
+def cancel(booking_id):
+    """
+    取消预约并释放名额（仅 booked 状态的预约，同一事务，一次提交）
+
+    Returns:
+        bool: 是否取消成功（预约已不是 booked 状态时为 False）
+    """
+    _, bookings = _tables()
+    try:
+        row = db.session.execute(db.select(bookings.c.activity_id).where(bookings.c.id == booking_id)).first()
+        if row is None:
+            return False
+        cancelled = db.session.execute(bookings.update().where(
+            bookings.c.id == booking_id, bookings.c.status == SEAT_STATUS
+        ).values(status='cancelled', updated_at=datetime.now())).rowcount == 1
+        if cancelled:
+            release_seats(row.activity_id)
+        db.session.commit()
+        return cancelled
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def delete_booking(booking_id):
+    """删除预约记录，booked 状态的预约同时释放名额（同一事务，一次提交）"""
+    _, bookings = _tables()
+    try:
+        row = db.session.execute(
+            db.select(bookings.c.activity_id, bookings.c.status).where(bookings.c.id == booking_id)
+        ).first()
+        if row is None:
+            return False
+        deleted = db.session.execute(bookings.delete().where(bookings.c.id == booking_id)).rowcount == 1
+        if deleted and row.status == SEAT_STATUS:
+            release_seats(row.activity_id)
+        db.session.commit()
+        return deleted
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def rebuild_participant_counts():
+    """按预约记录重算全部活动的名额计数（用于存量数据回填与修正），返回更新行数"""
+    activities, bookings = _tables()
+    booked = db.select(db.func.count()).where(
+        bookings.c.activity_id == activities.c.id, bookings.c.status == SEAT_STATUS
+    ).scalar_subquery()
+    result = db.session.execute(
+        activities.update().values(current_participants=booked, updated_at=activities.c.updated_at)
+    )
+    db.session.commit()
+
+    from components.activity_availability import availability_cache
+    availability_cache.clear()
+    return result.rowcount
@@ -0,0 +1,322 @@
+# ./components/sensitive_words.py
+
+"""
+敏感词匹配引擎
+原实现把全部敏感词拼成一个 "词1|词2|..." 正则，匹配耗时随词库规模增长。此处使用 Aho–Corasick 自动机：
+
+- 构建：所有敏感词插入字典树，再按 BFS 计算失败指针；匹配时每个字符只做常数次状态转移，
+  耗时与文本长度线性相关，与词库规模无关；处于根状态时借助首字符集合跳过不可能命中的文本
+- 匹配语义：不区分大小写；多个敏感词重叠时取最左、最长的匹配，匹配之间互不重叠
+- 词库来源：配置文件（SENSITIVE_WORDS_FILE，每行一个词，# 开头为注释；未配置时为内置默认词）
+  + 数据库 sensitive_words 表中启用的词
+- 热更新：词库与自动机打包为不可变快照，重建后一次赋值替换，读取方始终看到完整的一份；
+  每隔 SENSITIVE_WORDS_RELOAD_INTERVAL 秒检查一次来源是否变化（文件修改时间、表记录数与最后修改时间），
+  变化时重建，多进程部署下各进程无需重启即可生效
+"""
+
+import contextlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 未配置任何词库来源时使用的默认敏感词
+DEFAULT_SENSITIVE_WORDS = [
+    '违禁词1', '违禁词2', '违禁词3',
+    '垃圾信息', '广告', '违法', '暴力', '色情'
+]
+
+
+def _fold(text):
+    """大小写折叠（保持长度不变，保证匹配位置与原文一致）"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class AhoCorasickMatcher:
+    """Aho–Corasick 多模式匹配自动机（构建后只读，可被多个线程同时使用）"""
+
+    def __init__(self, words):
+        # 状态转移表：_goto[状态] = {字符: 下一状态}，状态0为根
+        self._goto = [{}]
+        self._fail = [0]
+        # 该状态本身对应的敏感词长度，0 表示不是敏感词结尾
+        self._word_length = [0]
+        # 输出链接：失败链上最近的敏感词结尾状态（用于枚举同一位置结尾的所有敏感词）
+        self._output = [0]
+        self.words = []
+
+        seen = set()
+        for word in words:
+            folded = _fold(word.strip()) if word else ''
+            if not folded or folded in seen:
+                continue
+            seen.add(folded)
+            self.words.append(word.strip())
+            self._insert(folded)
+        self._build_fail_links()
+
+        # 处于根状态时用字符集合正则跳到下一个可能的敏感词首字符，跳过大段无关文本
+        first_chars = ''.join(re.escape(ch) for ch in self._goto[0])
+        self._first_char_pattern = re.compile(f'[{first_chars}]') if first_chars else None
+
+    def _insert(self, word):
+        state = 0
+        for ch in word:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._word_length.append(0)
+                self._output.append(0)
+                self._goto[state][ch] = next_state
+            state = next_state
+        self._word_length[state] = len(word)
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                target = target if target != next_state else 0
+                self._fail[next_state] = target
+                self._output[next_state] = target if self._word_length[target] else self._output[target]
+
+    @property
+    def state_count(self):
+        return len(self._goto)
+
+    def _scan(self, text, first_only=False):
+        """
+        扫描文本，返回每个匹配的 (起始位置, 结束位置)（最左最长、互不重叠）
+
+        先沿输出链接记录每个起始位置上最远的结束位置，再从左到右贪心选取。
+        """
+        if self._first_char_pattern is None:
+            return []
+        goto, fail, word_length, output = self._goto, self._fail, self._word_length, self._output
+        skip = self._first_char_pattern.search
+        folded = _fold(text)
+        length = len(folded)
+        # 每个起始位置上最远的结束位置（不含）
+        furthest_end = {}
+        state = 0
+        index = 0
+        while index < length:
+            if not state:
+                found = skip(folded, index)
+                if found is None:
+                    break
+                index = found.start()
+            ch = folded[index]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            matched = state if word_length[state] else output[state]
+            while matched:
+                start = index - word_length[matched] + 1
+                if first_only:
+                    return [(start, index + 1)]
+                if furthest_end.get(start, 0) < index + 1:
+                    furthest_end[start] = index + 1
+                matched = output[matched]
+            index += 1
+
+        matches = []
+        last_end = 0
+        for start in sorted(furthest_end):
+            if start >= last_end:
+                last_end = furthest_end[start]
+                matches.append((start, last_end))
+        return matches
+
+    def contains(self, text):
+        return bool(text) and bool(self._scan(text, first_only=True))
+
+    def find_all(self, text):
+        """返回匹配到的原文片段列表（按出现顺序）"""
+        if not text:
+            return []
+        return [text[start:end] for start, end in self._scan(text)]
+
+    def replace(self, text, replacement='***'):
+        if not text:
+            return text
+        matches = self._scan(text)
+        if not matches:
+            return text
+        parts = []
+        last_end = 0
+        for start, end in matches:
+            parts.append(text[last_end:start])
+            parts.append(replacement)
+            last_end = end
+        parts.append(text[last_end:])
+        return ''.join(parts)
+
+
+class SensitiveWordSnapshot:
+    """某一时刻的词库与自动机（不可变，整体替换）"""
+
+    def __init__(self, words, source_signature=None):
+        self.matcher = AhoCorasickMatcher(words)
+        self.words = tuple(self.matcher.words)
+        self.source_signature = source_signature
+        self.loaded_at = datetime.now()
+
+
+class SensitiveWordDictionary:
+    """
+    敏感词词库：从文件与数据库加载，定期检查来源变化并原子替换快照
+
+    未配置文件时以构造时传入的初始词（默认 DEFAULT_SENSITIVE_WORDS）作为基础词表。
+    """
+
+    def __init__(self, initial_words=None, words_file=None, use_database=True, reload_interval=60):
+        self.initial_words = list(initial_words or DEFAULT_SENSITIVE_WORDS)
+        self.words_file = words_file
+        self.use_database = use_database
+        self.reload_interval = reload_interval
+        self._snapshot = SensitiveWordSnapshot(self.initial_words)
+        self._reload_lock = threading.Lock()
+        self._checked_at = None
+        self._reload_count = 0
+
+    @property
+    def snapshot(self):
+        """当前快照；到达检查间隔时先检查来源是否变化"""
+        self._reload_if_due()
+        return self._snapshot
+
+    # ========== 来源读取 ==========
+
+    def _file_signature(self):
+        if not self.words_file:
+            return None
+        try:
+            stat = os.stat(self.words_file)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _read_file(self):
+        if not self.words_file or not os.path.exists(self.words_file):
+            return []
+        with open(self.words_file, encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+    def _database_connection(self):
+        """
+        读取敏感词表使用独立连接（需在应用上下文中调用）
+
+        检查在调用方请求中触发，不能占用调用方的 db.session：查询失败时会使调用方会话处于需要回滚的状态，
+        回滚又会丢弃调用方尚未提交的修改
+        """
+        if not self.use_database:
+            return contextlib.nullcontext()
+        from components.models import db
+        return db.engine.connect()
+
+    def _database_signature(self, connection):
+        """敏感词表的记录数与最后修改时间（一条聚合查询）"""
+        if not self.use_database:
+            return None
+        from components.models import db, SensitiveWord
+        table = SensitiveWord.__table__
+        count, updated_at = connection.execute(
+            db.select(db.func.count(table.c.id), db.func.max(table.c.updated_at))
+        ).one()
+        return (count, updated_at.isoformat() if updated_at else None)
+
+    def _read_database(self, connection):
+        from components.models import db, SensitiveWord
+        table = SensitiveWord.__table__
+        return list(connection.execute(db.select(table.c.word).where(table.c.is_active.is_(True))).scalars())
+
+    def _signature(self, connection):
+        return (self._file_signature(), self._database_signature(connection))
+
+    # ========== 加载与替换 ==========
+
+    def _load_words(self, signature, connection):
+        """基础词表（配置了文件时为文件中的词，否则为初始词）+ 数据库中启用的词"""
+        file_signature, database_signature = signature
+        words = self._read_file() if file_signature is not None else list(self.initial_words)
+        if database_signature is not None:
+            words.extend(self._read_database(connection))
+        return words
+
+    def reload(self, force=False):
+        """
+        检查来源并在变化时重建自动机（force=True 时总是重建）
+
+        Returns:
+            bool: 是否替换了快照
+        """
+        with self._reload_lock:
+            self._checked_at = time.monotonic()
+            with self._database_connection() as connection:
+                signature = self._signature(connection)
+                if not force and signature == self._snapshot.source_signature:
+                    return False
+
+                started = time.perf_counter()
+                words = self._load_words(signature, connection)
+            snapshot = SensitiveWordSnapshot(words, source_signature=signature)
+            # 单次赋值替换，读取方要么看到旧快照，要么看到新快照
+            self._snapshot = snapshot
+            self._reload_count += 1
+            logger.info("【敏感词库加载】词数: %s, 状态数: %s, 耗时: %.1fms", len(snapshot.words),
+                        snapshot.matcher.state_count, (time.perf_counter() - started) * 1000)
+            return True
+
+    def replace_words(self, words):
+        """直接以给定词表替换快照（不读取文件与数据库）"""
+        self._snapshot = SensitiveWordSnapshot(words, source_signature=self._snapshot.source_signature)
+        self._reload_count += 1
+
+    def _reload_if_due(self):
+        if self.reload_interval is None or self.reload_interval < 0:
+            return
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.reload_interval:
+            return
+        if self._reload_lock.locked():
+            # 其他线程正在重建，继续使用旧快照
+            return
+        if self.use_database:
+            from flask import has_app_context
+            if not has_app_context():
+                # 无法读取数据库时不检查，避免误判为来源变化
+                return
+        try:
+            self.reload()
+        except Exception as e:
+            self._checked_at = time.monotonic()
+            logger.warning("【敏感词库重新加载失败】%s", str(e))
+
+    def get_stats(self):
+        snapshot = self._snapshot
+        return {
+            'word_count': len(snapshot.words),
+            'state_count': snapshot.matcher.state_count,
+            'words_file': self.words_file,
+            'use_database': self.use_database,
+            'reload_interval': self.reload_interval,
+            'reload_count': self._reload_count,
+            'loaded_at': snapshot.loaded_at.isoformat()
+        }
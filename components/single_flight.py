@@ -0,0 +1,17 @@
+# ./components/single_flight.py
+
+"""
+单飞（single-flight）计算
+缓存失效后同一个键只由一个请求计算，其余请求等待共享结果（活动可用性缓存、论坛统计快照使用）
+"""
+
+import threading
+
+
+class Flight:
+    """一次进行中的计算，等待方通过 event 获取结果"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
@@ -1,11 +1,8 @@
 # ./components/token_required.py
 
-import jwt
-from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify
-from config import Config
-from components.models import Admin ,User  # 引用公共模型
+from components.auth_context import get_auth_context, AUTH_ERROR_EXPIRED, AUTH_ERROR_INVALID
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,49 +36,32 @@ def token_required(f):
                 'data': None
             }), 401
 
-        try:
-            payload = jwt.decode(
-                token,
-                Config.JWT_SECRET_KEY,
-                algorithms=['HS256']
-            )
-            logger.debug("【令牌解码成功】payload: %s", repr(payload))
-            # 根据角色查询对应的用户表
-            current_user = None
-            if payload.get('role') == 'admin':
-                current_user = Admin.query.get(payload['user_id'])
-            elif payload.get('role') == 'user':
-                current_user = User.query.get(payload['user_id'])
-            else:
-                # 兼容旧逻辑，按顺序查找
-                current_user = Admin.query.get(payload['user_id'])
-                if not current_user:
-                    current_user = User.query.get(payload['user_id'])
-
-            if not current_user:
-                raise Exception('用户不存在')
-            logger.info("【验证通过】当前登录用户: %s (角色: %s)", current_user.account, payload.get('role', 'unknown'))
-        except jwt.ExpiredSignatureError:
+        # 解码与主体加载由请求级认证解析统一完成（同一请求只做一次）
+        ctx = get_auth_context()
+        if ctx.error == AUTH_ERROR_EXPIRED:
             logger.warning("【令牌验证失败】令牌已过期")
             return jsonify({
                 'success': False,
                 'message': '令牌已过期，请重新登录',
                 'data': None
             }), 401
-        except jwt.InvalidTokenError as e:
-            logger.warning("【令牌验证失败】令牌格式错误: %s", str(e))
+        if ctx.error == AUTH_ERROR_INVALID:
             return jsonify({
                 'success': False,
                 'message': '令牌格式无效，请重新登录',
                 'data': None
             }), 401
-        except Exception as e:
-            logger.exception("【令牌验证失败】错误")
+        if not ctx.is_authenticated:
+            logger.warning("【令牌验证失败】用户不存在")
             return jsonify({
                 'success': False,
-                'message': f'令牌无效：{str(e)}',
+                'message': '令牌无效：用户不存在',
                 'data': None
             }), 401
 
+        current_user = ctx.principal
+        logger.debug("【令牌解码成功】payload: %s", repr(ctx.payload))
+        logger.info("【验证通过】当前登录用户: %s (角色: %s)", current_user.account, ctx.payload.get('role', 'unknown'))
+
         return f(current_user, *args, **kwargs)
     return decorated
\ No newline at end of file
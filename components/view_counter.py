@@ -0,0 +1,466 @@
+# ./components/view_counter.py
+
+"""
+浏览计数写缓冲（write-behind）
+每次浏览都同步 UPDATE + COMMIT 时，热门帖子/文章的行锁会成为热点。
+此处在进程内累计浏览次数与浏览记录，按时间间隔或事件数批量落库：
+
+- 浏览次数：每种目标一条 UPDATE ... SET view_count = view_count + CASE id WHEN ... END
+  （论坛帖子同时在同一事务中把浏览增量合并到 forum_category_stats 分类统计汇总表）
+- 浏览记录：一条批量 upsert（MySQL ON DUPLICATE KEY UPDATE / SQLite、PostgreSQL ON CONFLICT DO UPDATE）
+- 读取浏览次数时叠加本进程尚未落库的增量（pending_views），接口返回的数值保持实时
+- 后台线程每 VIEW_COUNTER_FLUSH_INTERVAL_MS 毫秒落库一次，累计 VIEW_COUNTER_FLUSH_MAX_EVENTS 个事件时提前落库；
+  未启动后台线程时（测试环境）在记录事件时按相同条件同步落库
+- 进程退出时落库剩余数据；未落库条目超过 VIEW_COUNTER_MAX_PENDING 时丢弃新事件并计入 dropped
+- 落库按目标类型与批次隔离：已删除目标的数据直接丢弃，写入失败的部分放回缓冲重试，
+  连续失败 VIEW_COUNTER_MAX_RETRIES 次后丢弃并计入 discarded，单条异常数据不会阻塞其他数据落库
+- 缓冲为进程级数据，多进程部署时每个进程只能叠加自己的未落库增量
+"""
+
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from flask import has_app_context
+from config import Config
+from components.models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 计数目标类型
+VIEW_TARGET_FORUM_POST = 'forum_post'
+VIEW_TARGET_SCIENCE_ARTICLE = 'science_article'
+
+# 批量 upsert 每条语句的最大行数
+UPSERT_CHUNK_SIZE = 500
+
+# 进程内缓存首次浏览时间的最大条目数
+FIRST_VISIT_CACHE_SIZE = 10000
+
+
+def _get_targets():
+    """各计数目标对应的表结构"""
+    from components.models import ForumPost, ForumVisit, ScienceArticle, ScienceArticleVisit
+    return {
+        VIEW_TARGET_FORUM_POST: {
+            'model': ForumPost,
+            'visit_model': ForumVisit,
+            'visit_target': 'post_id',
+            'has_visit_count': True,
+            'has_hot_score': True,
+            'has_category_stats': True
+        },
+        VIEW_TARGET_SCIENCE_ARTICLE: {
+            'model': ScienceArticle,
+            'visit_model': ScienceArticleVisit,
+            'visit_target': 'article_id',
+            'has_visit_count': False,
+            'has_hot_score': False,
+            'has_category_stats': False
+        }
+    }
+
+
+class ViewCounterBuffer:
+    """浏览次数与浏览记录的进程内写缓冲"""
+
+    def __init__(self, flush_interval_ms=1000, flush_max_events=500, max_pending=100000, max_retries=3):
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_events = flush_max_events
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (目标类型, 目标ID) -> 浏览次数增量
+        self._views = {}
+        # (目标类型, 目标ID, 用户ID) -> [首次浏览时间, 最后浏览时间, 浏览次数]
+        self._visits = {}
+        # 正在落库的浏览次数增量（落库完成前读取仍需叠加）
+        self._inflight_views = {}
+        # (目标类型, 目标ID, 用户ID) -> 首次浏览时间（LRU）
+        self._first_visits = OrderedDict()
+        # 缓冲条目键 -> 连续落库失败次数
+        self._failures = {}
+        self._events = 0
+        self._last_flush = time.monotonic()
+        self._app = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stats = {
+            'recorded_views': 0,
+            'recorded_visits': 0,
+            'flushed_views': 0,
+            'flushed_visits': 0,
+            'flush_count': 0,
+            'flush_failures': 0,
+            'dropped': 0,
+            'discarded': 0,
+            'last_flush_ms': None
+        }
+
+    def init_app(self, app):
+        """绑定应用并启动后台落库线程（测试环境不启动，改为记录事件时同步落库）"""
+        self._app = app
+        if app.testing or self.flush_interval <= 0 or self._thread is not None:
+            return
+
+        def _loop():
+            while True:
+                self._wakeup.wait(self.flush_interval)
+                self._wakeup.clear()
+                try:
+                    with app.app_context():
+                        self.flush()
+                except Exception as e:
+                    logger.warning("【浏览计数落库失败】%s", str(e))
+
+        self._thread = threading.Thread(target=_loop, name='view-counter-flush', daemon=True)
+        self._thread.start()
+
+    def _is_full(self):
+        return len(self._views) + len(self._visits) >= self.max_pending
+
+    def record_view(self, target_type, target_id, user_id=None):
+        """
+        记录一次浏览
+
+        Args:
+            target_type: 目标类型（VIEW_TARGET_FORUM_POST / VIEW_TARGET_SCIENCE_ARTICLE）
+            target_id: 帖子或文章ID
+            user_id: 浏览用户ID（user_info.id），提供时同时记录浏览记录
+        """
+        self._flush_inline_if_due()
+        with self._lock:
+            key = (target_type, target_id)
+            if key not in self._views and self._is_full():
+                self._stats['dropped'] += 1
+                return
+            self._views[key] = self._views.get(key, 0) + 1
+            self._events += 1
+            self._stats['recorded_views'] += 1
+            if user_id:
+                self._add_visit(target_type, target_id, user_id)
+        self._notify_if_due()
+
+    def record_visit(self, target_type, target_id, user_id):
+        """
+        记录一条浏览记录（不增加浏览次数）
+
+        首次浏览时间按键缓存在进程内：每个 (目标, 用户) 只在第一次记录时读取一次已落库的浏览记录，之后的浏览不再查询
+
+        Returns:
+            tuple | None: (首次浏览时间, 最后浏览时间)，缓冲已满丢弃时为 None
+        """
+        self._flush_inline_if_due()
+        key = (target_type, target_id, user_id)
+        with self._lock:
+            seen = key in self._first_visits
+            known = self._first_visits.get(key)
+        if not seen:
+            known = self._load_first_visit(target_type, target_id, user_id)
+
+        times = None
+        with self._lock:
+            if self._add_visit(target_type, target_id, user_id):
+                self._events += 1
+                first_at, last_at, _ = self._visits[key]
+                if known is not None and known < first_at:
+                    first_at = known
+                self._first_visits[key] = first_at
+                self._first_visits.move_to_end(key)
+                while len(self._first_visits) > FIRST_VISIT_CACHE_SIZE:
+                    self._first_visits.popitem(last=False)
+                times = (first_at, last_at)
+        self._notify_if_due()
+        return times
+
+    @staticmethod
+    def _load_first_visit(target_type, target_id, user_id):
+        """读取已落库的首次浏览时间（没有记录时为 None）"""
+        if not has_app_context():
+            return None
+        target = _get_targets()[target_type]
+        table = target['visit_model'].__table__
+        return db.session.execute(db.select(table.c.first_visit_at).where(
+            table.c.user_id == user_id, table.c[target['visit_target']] == target_id
+        )).scalar()
+
+    def _add_visit(self, target_type, target_id, user_id):
+        """在 _lock 内合并浏览记录，缓冲已满时丢弃"""
+        now = datetime.now()
+        key = (target_type, target_id, user_id)
+        visit = self._visits.get(key)
+        if visit is None:
+            if self._is_full():
+                self._stats['dropped'] += 1
+                return False
+            self._visits[key] = [now, now, 1]
+        else:
+            visit[1] = now
+            visit[2] += 1
+        self._stats['recorded_visits'] += 1
+        return True
+
+    def _flush_inline_if_due(self):
+        """
+        未启动后台线程时，在记录新事件之前同步落库已到期的数据
+
+        先落库再记录，保证当前请求随后读取时新事件仍在未落库增量中，返回值不会少计。
+        """
+        if self._thread is not None or not has_app_context():
+            return
+        due_by_events = self._events >= self.flush_max_events
+        due_by_time = time.monotonic() - self._last_flush >= self.flush_interval
+        if due_by_events or due_by_time:
+            self.flush()
+
+    def _notify_if_due(self):
+        """累计事件数达到上限时唤醒后台线程提前落库"""
+        if self._thread is not None and self._events >= self.flush_max_events:
+            self._wakeup.set()
+
+    def pending_views(self, target_type, target_id):
+        """获取本进程尚未落库的浏览次数增量"""
+        key = (target_type, target_id)
+        with self._lock:
+            return self._views.get(key, 0) + self._inflight_views.get(key, 0)
+
+    def flush(self):
+        """
+        将缓冲的浏览次数与浏览记录批量落库（需在应用上下文中调用）
+
+        - 写入前过滤已删除的帖子/文章（浏览记录的外键会使写入失败），这部分数据直接丢弃
+        - 每种目标的浏览次数、每批浏览记录各自一个事务，失败时只把失败的部分放回缓冲等待重试，
+          不影响其他目标与其他批次；连续失败 max_retries 次的条目丢弃并计入 discarded
+
+        Returns:
+            int: 本次落库的浏览次数
+        """
+        with self._flush_lock:
+            with self._lock:
+                views, visits = self._views, self._visits
+                self._views, self._visits = {}, {}
+                self._inflight_views = dict(views)
+                self._events = 0
+                self._last_flush = time.monotonic()
+
+            if not views and not visits:
+                return 0
+
+            started = time.monotonic()
+            flushed_views = flushed_visits = 0
+            post_deltas = {}
+            try:
+                for target_type, target in _get_targets().items():
+                    target_views = {key: count for key, count in views.items() if key[0] == target_type}
+                    target_visits = {key: visit for key, visit in visits.items() if key[0] == target_type}
+                    if not target_views and not target_visits:
+                        continue
+
+                    try:
+                        existing = self._existing_ids(
+                            target, {key[1] for key in target_views} | {key[1] for key in target_visits}
+                        )
+                    except Exception as e:
+                        self._fail(target_views, target_visits, e)
+                        continue
+                    missing_views = [key for key in target_views if key[1] not in existing]
+                    missing_visits = [key for key in target_visits if key[1] not in existing]
+                    if missing_views or missing_visits:
+                        self._discard(missing_views, missing_visits)
+                        target_views = {key: count for key, count in target_views.items() if key[1] in existing}
+                        target_visits = {key: visit for key, visit in target_visits.items() if key[1] in existing}
+
+                    if target_views:
+                        deltas = {key[1]: count for key, count in target_views.items()}
+                        if self._write(lambda conn: self._write_views(conn, target, deltas), target_views, {}):
+                            flushed_views += sum(deltas.values())
+                            if target_type == VIEW_TARGET_FORUM_POST:
+                                post_deltas.update({post_id: count / 10 for post_id, count in deltas.items()})
+
+                    items = list(target_visits.items())
+                    for start in range(0, len(items), UPSERT_CHUNK_SIZE):
+                        chunk = dict(items[start:start + UPSERT_CHUNK_SIZE])
+                        rows = [self._build_visit_row(target, key[1], key[2], visit) for key, visit in chunk.items()]
+                        if self._write(lambda conn: self._upsert_visits(conn, target, rows), {}, chunk,
+                                       restore=len(chunk) == 1):
+                            flushed_visits += len(chunk)
+                        elif len(chunk) > 1:
+                            # 整批失败时逐行写入，只有出错的记录放回缓冲
+                            for key, visit in chunk.items():
+                                row = self._build_visit_row(target, key[1], key[2], visit)
+                                if self._write(lambda conn: self._upsert_visits(conn, target, [row]), {}, {key: visit}):
+                                    flushed_visits += 1
+            finally:
+                with self._lock:
+                    self._inflight_views = {}
+
+            # 已在热门排行中的帖子同步调整热度
+            if post_deltas:
+                from components.forum_hot_ranking import hot_ranking
+                hot_ranking.bump_scores(post_deltas)
+
+            self._stats['flushed_views'] += flushed_views
+            self._stats['flushed_visits'] += flushed_visits
+            self._stats['flush_count'] += 1
+            self._stats['last_flush_ms'] = round((time.monotonic() - started) * 1000, 2)
+            return flushed_views
+
+    @staticmethod
+    def _existing_ids(target, target_ids):
+        """查询仍存在的帖子/文章ID"""
+        table = target['model'].__table__
+        target_ids = list(target_ids)
+        existing = set()
+        with db.engine.connect() as conn:
+            for start in range(0, len(target_ids), UPSERT_CHUNK_SIZE):
+                existing.update(conn.execute(db.select(table.c.id).where(
+                    table.c.id.in_(target_ids[start:start + UPSERT_CHUNK_SIZE])
+                )).scalars())
+        return existing
+
+    @staticmethod
+    def _write_views(conn, target, deltas):
+        conn.execute(ViewCounterBuffer._build_view_update(target, deltas))
+        if target['has_category_stats']:
+            # 同一事务内按分类合并浏览增量到分类统计汇总表
+            from components.forum_category_stats import category_stats
+            category_stats.apply_counter_deltas(conn, 'total_views', deltas)
+
+    def _write(self, write, views, visits, restore=True):
+        """
+        在独立事务中写入一部分数据
+
+        Returns:
+            bool: 是否写入成功（失败且 restore 为 True 时数据已放回缓冲）
+        """
+        try:
+            with db.engine.begin() as conn:
+                write(conn)
+        except Exception as e:
+            if restore:
+                self._fail(views, visits, e)
+            return False
+        with self._lock:
+            for key in views:
+                self._inflight_views.pop(key, None)
+                self._failures.pop(key, None)
+            for key in visits:
+                self._failures.pop(key, None)
+        return True
+
+    def _fail(self, views, visits, error):
+        self._restore(views, visits)
+        self._stats['flush_failures'] += 1
+        logger.warning("【浏览计数落库失败】已放回缓冲等待重试: %s", str(error))
+
+    def _discard(self, views, visits):
+        """丢弃已删除目标的数据"""
+        with self._lock:
+            for key in list(views) + list(visits):
+                self._failures.pop(key, None)
+            self._stats['discarded'] += len(views) + len(visits)
+
+    def _restore(self, views, visits):
+        """落库失败时把数据合并回缓冲（连续失败 max_retries 次的条目丢弃）"""
+        with self._lock:
+            for key, count in views.items():
+                self._inflight_views.pop(key, None)
+                if self._retry_exhausted(key):
+                    continue
+                self._views[key] = self._views.get(key, 0) + count
+            for key, (first_at, last_at, count) in visits.items():
+                if self._retry_exhausted(key):
+                    continue
+                visit = self._visits.get(key)
+                if visit is None:
+                    self._visits[key] = [first_at, last_at, count]
+                else:
+                    visit[0] = min(visit[0], first_at)
+                    visit[2] += count
+
+    def _retry_exhausted(self, key):
+        """在 _lock 内累计条目的失败次数，达到上限时返回 True 并计入 discarded"""
+        failures = self._failures.get(key, 0) + 1
+        if failures >= self.max_retries:
+            self._failures.pop(key, None)
+            self._stats['discarded'] += 1
+            return True
+        self._failures[key] = failures
+        return False
+
+    @staticmethod
+    def _build_view_update(target, deltas):
+        """UPDATE ... SET view_count = view_count + CASE id WHEN ... END WHERE id IN (...)"""
+        table = target['model'].__table__
+        delta = db.case(deltas, value=table.c.id, else_=0)
+        values = {'view_count': db.func.coalesce(table.c.view_count, 0) + delta}
+        if target['has_hot_score']:
+            # 与 ForumPost.compute_hot_score 保持一致：每次浏览 +0.1
+            values['hot_score'] = db.func.coalesce(table.c.hot_score, 0) + delta / 10.0
+        return table.update().where(table.c.id.in_(list(deltas))).values(**values)
+
+    @staticmethod
+    def _build_visit_row(target, target_id, user_id, visit):
+        first_at, last_at, count = visit
+        row = {
+            'user_id': user_id,
+            target['visit_target']: target_id,
+            'first_visit_at': first_at,
+            'last_visit_at': last_at
+        }
+        if target['has_visit_count']:
+            row['visit_count'] = count
+        return row
+
+    @staticmethod
+    def _upsert_visits(conn, target, rows):
+        """按数据库方言批量 upsert 浏览记录"""
+        from components.db_compatibility import upsert_increments
+
+        upsert_increments(
+            conn, target['visit_model'].__table__, rows, ('user_id', target['visit_target']),
+            ('visit_count',) if target['has_visit_count'] else (), ('last_visit_at',)
+        )
+
+    def shutdown(self):
+        """进程退出前落库剩余数据"""
+        if self._app is None:
+            return
+        try:
+            with self._app.app_context():
+                self.flush()
+        except Exception as e:
+            logger.warning("【浏览计数退出落库失败】%s", str(e))
+
+    def get_stats(self):
+        """获取写缓冲状态"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'pending_views': sum(self._views.values()),
+                'pending_visits': len(self._visits),
+                'flush_interval_ms': int(self.flush_interval * 1000),
+                'flush_max_events': self.flush_max_events,
+                'max_pending': self.max_pending,
+                'max_retries': self.max_retries
+            })
+            return stats
+
+
+# 进程级单例
+view_counter = ViewCounterBuffer(
+    flush_interval_ms=Config.VIEW_COUNTER_FLUSH_INTERVAL_MS,
+    flush_max_events=Config.VIEW_COUNTER_FLUSH_MAX_EVENTS,
+    max_pending=Config.VIEW_COUNTER_MAX_PENDING,
+    max_retries=Config.VIEW_COUNTER_MAX_RETRIES
+)
+
+atexit.register(view_counter.shutdown)
+
+
+def get_view_count(target_type, obj):
+    """读取浏览次数（已落库值 + 本进程未落库增量）"""
+    return (obj.view_count or 0) + view_counter.pending_views(target_type, obj.id)
@@ -9,6 +9,65 @@ class Config:
     JWT_SECRET_KEY = 'your-secret-key-123'  # 生产环境需更换
     JWT_EXPIRATION_DELTA = 3600  # 令牌有效期（秒）
 
+    # 登录主体缓存配置（token_required 使用）
+    PRINCIPAL_CACHE_TTL = 60  # 缓存有效期（秒）
+    PRINCIPAL_CACHE_MAX_SIZE = 10000  # 最多缓存的用户数
+
+    # 密码哈希配置（哈希成本与登录吞吐量之间的权衡）
+    PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'  # werkzeug 哈希算法及成本参数，修改后旧哈希在登录时自动升级
+    PASSWORD_SALT_LENGTH = 16
+    PASSWORD_HASH_WORKERS = 2  # 哈希进程池大小，0 表示在请求线程内直接计算
+    PASSWORD_HASH_MAX_PENDING = 32  # 最大排队数（含执行中），超出时接口直接返回503
+    PASSWORD_HASH_TIMEOUT = 10  # 等待单次哈希结果的超时时间（秒）
+
+    # 论坛热门帖子排行配置（时间衰减热度 = 热度分 * 0.5 ^ (帖子发布小时数 / 半衰期)）
+    FORUM_HOT_HALF_LIFE_HOURS = 12  # 热度半衰期（小时）
+    FORUM_HOT_WINDOW_HOURS = 72  # 只统计最近多少小时内发布的帖子
+    FORUM_HOT_MAX_SIZE = 200  # 每个分类保留的排行条数
+    FORUM_HOT_REFRESH_INTERVAL = 300  # 后台全量刷新排行的间隔（秒），0 表示不启动后台刷新
+
+    # 浏览计数写缓冲配置（论坛帖子、科普文章的浏览次数与浏览记录）
+    VIEW_COUNTER_FLUSH_INTERVAL_MS = 1000  # 定时批量落库间隔（毫秒）
+    VIEW_COUNTER_FLUSH_MAX_EVENTS = 500  # 累计事件数达到该值时立即落库
+    VIEW_COUNTER_MAX_PENDING = 100000  # 内存中最多缓存的未落库条目数，超出的事件丢弃并计数
+    VIEW_COUNTER_MAX_RETRIES = 3  # 同一条目连续落库失败的最大次数，超出后丢弃并计数
+
+    # 全文检索配置（论坛帖子、科普文章、公告、活动、活动讨论的关键词搜索）
+    SEARCH_BACKEND = 'index'  # 'index' 使用倒排索引（search_tokens 表），'like' 回退为 LIKE 全表扫描
+    SEARCH_REBUILD_CHUNK_SIZE = 1000  # 重建索引时每批读取的文档数
+
+    # 敏感词过滤配置（论坛发帖、楼层、回复）
+    SENSITIVE_WORDS_FILE = None  # 敏感词文件路径（每行一个词，# 开头为注释），None 表示不使用文件
+    SENSITIVE_WORDS_USE_DATABASE = True  # 是否从 sensitive_words 表加载敏感词
+    SENSITIVE_WORDS_RELOAD_INTERVAL = 60  # 检查词库来源变化的间隔（秒），负数表示不自动重新加载
+
+    # 论坛管理后台统计快照配置
+    FORUM_DASHBOARD_CACHE_TTL = 30  # 统计快照缓存时间（秒），同一统计天数在缓存期内共享一次计算结果
+
+    # 活动预约排队配置
+    BOOKING_QUEUE_ENABLED = True  # 预约请求先进入进程内按活动排队，由后台线程分批写入；False 时在请求线程内直接预约
+    BOOKING_QUEUE_MAX_PENDING = 500  # 每个活动最多排队的预约请求数，超出的请求直接加入候补名单
+    BOOKING_QUEUE_BATCH_SIZE = 50  # 每批写入的预约请求数
+    BOOKING_QUEUE_WORKERS = 4  # 后台写入线程数（同一活动同一时间只有一个线程写入），0 表示在请求线程内同步写入
+    BOOKING_QUEUE_SYNC_WAIT = 3  # 预约接口等待排队结果的时间（秒），超时返回排队凭证供客户端查询
+    BOOKING_QUEUE_POLL_TIMEOUT = 30  # 查询排队凭证时长轮询的最长等待时间（秒）
+    BOOKING_QUEUE_TICKET_TTL = 600  # 排队凭证在内存中保留的时间（秒）
+    BOOKING_BATCH_CHUNK_SIZE = 500  # 批量修改预约状态时每批（每个事务）处理的预约数
+
+    # 活动列表人数统计配置
+    ACTIVITY_PARTICIPANTS_FROM_COUNTER = False  # 已预约人数读取 activities.current_participants（执行 scripts/rebuild_activity_participants.py 回填后再开启）；False 时按预约表分组统计
+
+    # 活动可用性缓存配置
+    ACTIVITY_AVAILABILITY_CACHE_TTL = 5  # 可用性快照缓存时间（秒），预约、取消与修改活动后立即失效
+    ACTIVITY_AVAILABILITY_CACHE_MAX_SIZE = 10000  # 最多缓存的活动数
+
+    # 活动生命周期调度配置
+    ACTIVITY_LIFECYCLE_ENABLED = True  # 是否在进程内定时迁移活动/公告状态（也可用 scripts/activity_lifecycle_tick.py 由 cron 执行）
+    ACTIVITY_LIFECYCLE_INTERVAL = 60  # 执行间隔（秒）
+    ACTIVITY_LIFECYCLE_LEASE_TTL = 180  # 主节点租约有效期（秒），持有进程失联超过该时间后由其他进程接管
+    ACTIVITY_LIFECYCLE_CHUNK_SIZE = 500  # 每批（每个事务）迁移的活动数
+    ACTIVITY_LIFECYCLE_CANCEL_STALE_DRAFTS = True  # 是否自动取消已过开始时间仍未发布的草稿活动
+
     # 图片存储相关配置（供LocalImageStorage读取）图片存储目录（项目根目录下）
     IMAGE_STORAGE_DIR = 'static/images'
     ALLOWED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
@@ -0,0 +1,33 @@
+# 活动生命周期单次执行：已结束的活动改为 completed、过期草稿取消、到期公告标记为 EXPIRED，输出各类迁移行数
+# 适合关闭进程内定时（ACTIVITY_LIFECYCLE_ENABLED = False）后由 cron 定期执行；
+# 多台机器同时配置 cron 时加 --use-lease，只有获得租约的一台执行
+#
+# 用法: python scripts/activity_lifecycle_tick.py [--use-lease]
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.activity_lifecycle import lifecycle_scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='活动生命周期单次执行')
+    parser.add_argument('--use-lease', action='store_true', help='先获取租约，未获得时跳过本次执行')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = lifecycle_scheduler.run_if_leader() if args.use_lease else lifecycle_scheduler.tick()
+        if result is None:
+            print("【活动生命周期】租约由其他进程持有，跳过本次执行")
+            return
+        print(f"【活动生命周期完成】活动结束: {result['completed']}, 草稿取消: {result['drafts_cancelled']}, "
+              f"候补过期: {result['waitlist_expired']}, 公告到期: {result['notices_expired']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# 同一热门活动并发预约的基准测试
+# 对比旧流程（加载活动 -> COUNT 已预约人数 -> 查询已有预约 -> 插入）、名额预约引擎（条件 UPDATE 占用名额 + 插入，同一事务）
+# 与预约排队（请求进入进程内队列，后台按批交给名额预约引擎写入，名额已满的进入候补名单），
+# 输出耗时、吞吐量、单次预约延迟（p50/p99）、成功/名额已满/失败次数，以及实际预约数是否超过人数上限、名额计数是否与预约数一致
+#
+# 会在目标数据库中创建测试用户和活动，请使用独立的测试库
+#
+# 用法: python scripts/bench_activity_booking.py [--database-uri URI] [--threads 8] [--users 200] [--capacity 50]
+#       默认使用临时 SQLite 文件
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+def build_app(database_uri):
+    from app import create_app
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        # SQLite 写锁等待时间，避免并发写入直接报 database is locked
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}} if database_uri.startswith('sqlite') else {}
+        INIT_TEST_DATA = False
+        # 排队模式等待写入结果的时间（秒）
+        BOOKING_QUEUE_SYNC_WAIT = 60
+
+    return create_app(BenchConfig)
+
+
+def create_fixture(db, User, Activity, users, capacity):
+    """创建测试用户与活动，返回 (用户账号列表, activity_id)"""
+    suffix = str(int(time.time() * 1000))[-7:]
+    template = User(account='bench', username='bench', role='USER')
+    template.set_password('bench123456')
+    accounts = [f'bk{suffix}{index:04d}' for index in range(users)]
+    db.session.execute(User.__table__.insert(), [{
+        'account': account, 'username': account, 'phone': f'1{suffix[-6:]}{index:04d}',
+        'email': f'{account}@example.com', 'role': 'USER', 'password_hash': template.password_hash
+    } for index, account in enumerate(accounts)])
+
+    now = datetime.now()
+    activity = Activity(title='预约并发基准测试', description='bench', location='bench',
+                        start_time=now + timedelta(days=1), end_time=now + timedelta(days=2),
+                        max_participants=capacity, current_participants=0, status='published')
+    db.session.add(activity)
+    db.session.commit()
+    return accounts, activity.id
+
+
+def legacy_book(db, activity_id, account):
+    """旧流程：加载活动 -> 校验可预约（COUNT） -> 查询已有预约 -> 插入"""
+    from components.models import Activity, ActivityBooking
+    from API_activities.common.utils import ActivityValidator
+
+    activity = Activity.query.get(activity_id)
+    can_book, _ = ActivityValidator.is_activity_bookable(activity)
+    if not can_book:
+        return False
+    has_conflict, _ = ActivityValidator.check_user_booking_conflict(account, activity_id)
+    if has_conflict:
+        return False
+    db.session.add(ActivityBooking(activity_id=activity_id, user_account=account, status='booked', notes=''))
+    db.session.commit()
+    return True
+
+
+def engine_book(db, activity_id, account):
+    """新流程：条件 UPDATE 占用名额 + 插入预约"""
+    from components import seat_reservation
+
+    return seat_reservation.reserve(activity_id, account).success
+
+
+def queue_book(db, activity_id, account):
+    """排队流程：提交到预约排队并等待写入结果（名额已满的进入候补名单，计为名额已满）"""
+    from config import Config
+    from components.booking_admission import booking_admission, TICKET_BOOKED
+
+    ticket = booking_admission.submit(activity_id, account)
+    booking_admission.wait(ticket, timeout=Config.BOOKING_QUEUE_SYNC_WAIT)
+    return ticket.status == TICKET_BOOKED
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)] if ordered else 0
+
+
+def run(app, mode, threads, users, capacity):
+    from components.models import db, User, Activity, ActivityBooking
+
+    with app.app_context():
+        accounts, activity_id = create_fixture(db, User, Activity, users, capacity)
+
+    book = {'legacy': legacy_book, 'engine': engine_book, 'queue': queue_book}[mode]
+    booked, rejected, failures, latencies = [], [], [], []
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        with app.app_context():
+            barrier.wait()
+            for account in accounts[index::threads]:
+                started = time.perf_counter()
+                try:
+                    (booked if book(db, activity_id, account) else rejected).append(account)
+                except Exception as e:
+                    db.session.rollback()
+                    failures.append(type(e).__name__)
+                latencies.append((time.perf_counter() - started) * 1000)
+            db.session.remove()
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        actual = ActivityBooking.query.filter_by(activity_id=activity_id, status='booked').count()
+        participants = db.session.query(Activity.current_participants).filter_by(id=activity_id).scalar()
+
+    print(f"【{mode}】线程: {threads}, 预约用户: {users}, 人数上限: {capacity}, 耗时: {elapsed:.3f}s, "
+          f"吞吐: {users / elapsed:.1f} 次/秒, 延迟 p50: {percentile(latencies, 0.5):.1f}ms, "
+          f"p99: {percentile(latencies, 0.99):.1f}ms")
+    print(f"    成功: {len(booked)}, 名额已满: {len(rejected)}, 失败: {len(failures)} {sorted(set(failures))}, "
+          f"实际预约数: {actual}, 超额预约: {max(actual - capacity, 0)}, "
+          f"名额计数: {participants}（应为 {actual}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='活动预约并发基准测试')
+    parser.add_argument('--database-uri', help='测试数据库连接串，默认使用临时 SQLite 文件')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--users', type=int, default=200, help='参与预约的用户数（每人预约一次）')
+    parser.add_argument('--capacity', type=int, default=50, help='活动人数上限')
+    parser.add_argument('--mode', choices=['legacy', 'engine', 'queue', 'all'], default='all')
+    args = parser.parse_args()
+
+    database_uri = args.database_uri
+    if not database_uri:
+        database_uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_booking.db')
+
+    app = build_app(database_uri)
+    modes = ['legacy', 'engine', 'queue'] if args.mode == 'all' else [args.mode]
+    for mode in modes:
+        run(app, mode, args.threads, args.users, args.capacity)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# 同一热门帖子并发创建楼层的基准测试
+# 对比旧流程（SELECT MAX(floor_number) + 1 后插入，Python 中递增评论数）与楼层号分配器（一条 UPDATE + 一条 INSERT），
+# 输出耗时、吞吐量、失败次数以及楼层号是否连续唯一
+#
+# 会在目标数据库中创建测试用户和帖子，请使用独立的测试库
+#
+# 用法: python scripts/bench_forum_floor_allocator.py [--database-uri URI] [--threads 8] [--floors 50]
+#       默认使用临时 SQLite 文件
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+
+def build_app(database_uri):
+    from app import create_app
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        # SQLite 写锁等待时间，避免并发写入直接报 database is locked
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}} if database_uri.startswith('sqlite') else {}
+        TESTING = True
+        INIT_TEST_DATA = False
+
+    return create_app(BenchConfig)
+
+
+def create_fixture(db, User, ForumPost):
+    """创建测试用户与帖子，返回 (user_id, post_id)"""
+    suffix = str(int(time.time() * 1000))[-9:]
+    user = User(account=f'bench{suffix}', username=f'bench{suffix}', phone=f'19{suffix}',
+                email=f'bench{suffix}@example.com', role='USER')
+    user.set_password('bench123456')
+    db.session.add(user)
+    db.session.flush()
+    post = ForumPost(title='楼层并发基准测试', content='bench', author_user_id=user.id,
+                     author_display=user.username, status='published')
+    db.session.add(post)
+    db.session.commit()
+    return user.id, post.id
+
+
+def legacy_create_floor(db, ForumPost, ForumFloor, post_id, user_id):
+    """旧流程：加载帖子 -> MAX(floor_number) -> 插入 -> Python 中递增评论数"""
+    post = ForumPost.query.get(post_id)
+    max_floor = db.session.query(db.func.max(ForumFloor.floor_number)).filter_by(post_id=post_id).scalar() or 0
+    db.session.add(ForumFloor(post_id=post_id, author_user_id=user_id, author_display='bench',
+                              content='bench', floor_number=max_floor + 1))
+    post.comment_count += 1
+    db.session.commit()
+
+
+def allocator_create_floor(db, ForumPost, ForumFloor, post_id, user_id):
+    """新流程：分配器 UPDATE + 插入楼层"""
+    ForumFloor.create_floor(post_id=post_id, user_id=user_id, content='bench')
+
+
+def run(app, mode, threads, floors_per_thread):
+    from components.models import db, User, ForumPost, ForumFloor
+
+    with app.app_context():
+        user_id, post_id = create_fixture(db, User, ForumPost)
+
+    create = legacy_create_floor if mode == 'legacy' else allocator_create_floor
+    failures = []
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            for _ in range(floors_per_thread):
+                try:
+                    create(db, ForumPost, ForumFloor, post_id, user_id)
+                except Exception as e:
+                    db.session.rollback()
+                    failures.append(type(e).__name__)
+            db.session.remove()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        numbers = [row[0] for row in db.session.query(ForumFloor.floor_number).filter_by(post_id=post_id).all()]
+        comment_count = db.session.query(ForumPost.comment_count).filter_by(id=post_id).scalar()
+
+    created = len(numbers)
+    print(f"【{mode}】线程: {threads}, 每线程楼层: {floors_per_thread}, 耗时: {elapsed:.3f}s, "
+          f"成功: {created}, 吞吐: {created / elapsed:.1f} 楼/秒")
+    print(f"    失败: {len(failures)} {sorted(set(failures))}, 重复楼层号: {created - len(set(numbers))}, "
+          f"楼层号连续: {sorted(numbers) == list(range(1, created + 1))}, "
+          f"评论数: {comment_count}（应为 {created}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='论坛楼层号分配并发基准测试')
+    parser.add_argument('--database-uri', help='测试数据库连接串，默认使用临时 SQLite 文件')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--floors', type=int, default=50, help='每个线程创建的楼层数')
+    parser.add_argument('--mode', choices=['legacy', 'allocator', 'both'], default='both')
+    args = parser.parse_args()
+
+    database_uri = args.database_uri
+    if not database_uri:
+        database_uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_floor.db')
+
+    app = build_app(database_uri)
+    modes = ['legacy', 'allocator'] if args.mode == 'both' else [args.mode]
+    for mode in modes:
+        run(app, mode, args.threads, args.floors)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+# 全文检索基准测试：倒排索引 vs LIKE '%关键词%'
+# 生成合成中文语料写入论坛帖子表（Core 批量插入，不触发增量索引），重建倒排索引后
+# 对一组关键词分别执行 LIKE 查询与倒排索引查询（命中总数 + 第一页20条），输出耗时与命中数
+#
+# 会在目标数据库中写入大量测试数据，请使用独立的测试库
+#
+# 用法: python scripts/bench_search_index.py [--database-uri URI] [--rows 1000000] [--repeat 3]
+#       默认使用临时 SQLite 文件
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+
+# 合成语料：随机生成的中文词表按 Zipf 分布取词（高频词出现在大部分文档中，低频词只出现在少数文档中），
+# 以下业务词汇插入在中频位置，查询关键词由它们组成
+VOCABULARY_SIZE = 20000
+WORDS = [
+    '科普', '讲座', '垃圾', '分类', '防诈骗', '志愿者', '报名', '心理', '健康', '急救', '知识', '天文', '展览',
+    '社区', '活动', '环保', '消防', '安全', '儿童', '老人', 'python', 'flask', 'mysql'
+]
+QUERIES = ['科普讲座', '垃圾分类', '防诈骗', '志愿者报名', '心理健康', 'python', '急救知识', '天文展览']
+
+
+def build_vocabulary(rng):
+    """生成词表及其 Zipf 权重"""
+    vocabulary = [
+        ''.join(chr(rng.randint(0x4e00, 0x7fff)) for _ in range(rng.choice((2, 2, 3))))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+    for index, word in enumerate(WORDS):
+        vocabulary[200 + index * 37] = word
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    return vocabulary, weights
+
+
+def build_app(database_uri):
+    from app import create_app
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        TESTING = True
+        INIT_TEST_DATA = False
+
+    return create_app(BenchConfig)
+
+
+def synthetic_text(rng, vocabulary, weights, words):
+    return ''.join(
+        word + ('，' if rng.random() < 0.2 else '')
+        for word in rng.choices(vocabulary, weights=weights, k=words)
+    )
+
+
+def generate_corpus(db, ForumPost, rows, batch_size=5000):
+    """批量写入合成帖子（Core INSERT，不触发 ORM 事件）"""
+    rng = random.Random(42)
+    vocabulary, weights = build_vocabulary(rng)
+    table = ForumPost.__table__
+    now = datetime.now()
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        db.session.execute(table.insert(), [{
+            'title': synthetic_text(rng, vocabulary, weights, 6),
+            'content': synthetic_text(rng, vocabulary, weights, 60),
+            'category': 'bench',
+            'status': 'published',
+            'author_display': 'bench',
+            'view_count': 0, 'like_count': 0, 'comment_count': 0, 'hot_score': 0, 'next_floor': 0,
+            'created_at': now, 'updated_at': now
+        } for _ in range(min(batch_size, rows - offset))])
+        db.session.commit()
+    print(f"【语料生成】帖子数: {rows}, 耗时: {time.perf_counter() - started:.1f}s")
+
+
+def timed(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全文检索倒排索引基准测试')
+    parser.add_argument('--database-uri', help='测试数据库连接串，默认使用临时 SQLite 文件')
+    parser.add_argument('--rows', type=int, default=1000000, help='合成帖子数')
+    parser.add_argument('--repeat', type=int, default=3, help='每个查询重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    database_uri = args.database_uri or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+    app = build_app(database_uri)
+
+    from components.models import db, ForumPost
+    from components.search_index import search_index, SEARCH_DOC_FORUM_POST, LikeSearchBackend, _get_doc_types
+
+    with app.app_context():
+        generate_corpus(db, ForumPost, args.rows)
+
+        started = time.perf_counter()
+        search_index.rebuild(SEARCH_DOC_FORUM_POST)
+        print(f"【索引重建】耗时: {time.perf_counter() - started:.1f}s")
+
+        doc = _get_doc_types()[SEARCH_DOC_FORUM_POST]
+        like_backend = LikeSearchBackend()
+        base_query = ForumPost.query.filter(ForumPost.status == 'published')
+
+        def like_search(keyword):
+            query = like_backend.apply(base_query, SEARCH_DOC_FORUM_POST, doc, keyword, None)
+            return query.count(), [post.id for post in query.order_by(ForumPost.created_at.desc()).limit(20)]
+
+        def index_search(keyword):
+            query = search_index.apply(base_query, SEARCH_DOC_FORUM_POST, keyword, rank=True)
+            return query.count(), [post.id for post in query.order_by(ForumPost.created_at.desc()).limit(20)]
+
+        print(f"{'关键词':<12}{'LIKE耗时':>10}{'LIKE命中':>10}{'索引耗时':>10}{'索引命中':>10}{'加速比':>8}")
+        for keyword in QUERIES:
+            like_time, (like_total, _) = timed(lambda: like_search(keyword), args.repeat)
+            index_time, (index_total, _) = timed(lambda: index_search(keyword), args.repeat)
+            print(f"{keyword:<12}{like_time * 1000:>9.1f}ms{like_total:>10}{index_time * 1000:>9.1f}ms"
+                  f"{index_total:>10}{like_time / index_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# 活动名额计数回填：按预约记录（booked 状态）重算全部活动的 current_participants
+# 用于启用名额预约引擎前的存量数据回填，或预约表被直接修改后的修正
+#
+# 用法: python scripts/rebuild_activity_participants.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components import seat_reservation
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        updated = seat_reservation.rebuild_participant_counts()
+        print(f"【活动名额计数回填完成】更新活动数: {updated}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# 活动评分汇总对账：从评分表重新聚合并整表替换 activity_rating_summary 汇总表
+# 用于新增汇总表后的存量数据回填，或评分表被直接修改后的修正；输出与原汇总表不一致的行数
+#
+# 用法: python scripts/rebuild_activity_rating_summary.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.activity_rating_summary import rating_summary
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        result = rating_summary.rebuild()
+        print(f"【评分汇总对账完成】汇总行数: {result['rows']}, 不一致行数: {result['drift']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# 论坛分类统计对账：从帖子表重新聚合并整表替换 forum_category_stats 汇总表
+# 用于新增汇总表后的存量数据回填，或帖子表被直接修改后的修正；输出与原汇总表不一致的行数
+#
+# 用法: python scripts/rebuild_forum_category_stats.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.forum_category_stats import category_stats
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        result = category_stats.rebuild()
+        print(f"【分类统计对账完成】汇总行数: {result['rows']}, 不一致行数: {result['drift']}")
+
+
+if __name__ == '__main__':
+    main()
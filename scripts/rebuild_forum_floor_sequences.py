@@ -0,0 +1,23 @@
+# 按已有楼层回填帖子的楼层号分配器（forum_posts.next_floor）
+# 用于新增 next_floor 字段后的存量数据回填：分配器从帖子当前最大楼层号之后继续分配
+#
+# 用法: python scripts/rebuild_forum_floor_sequences.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.models import ForumPost
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        updated = ForumPost.rebuild_floor_sequences()
+        print(f"【楼层号分配器回填完成】更新帖子数: {updated}")
+
+
+if __name__ == '__main__':
+    main()
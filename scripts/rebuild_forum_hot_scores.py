@@ -0,0 +1,23 @@
+# 按计数字段重算论坛帖子热度分（forum_posts.hot_score）
+# 用于新增热度分字段后的存量数据回填，或计数字段被直接修改后的修正
+#
+# 用法: python scripts/rebuild_forum_hot_scores.py
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.models import ForumPost
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        updated = ForumPost.rebuild_hot_scores()
+        print(f"【热度分重算完成】更新帖子数: {updated}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# 重建全文检索倒排索引（search_tokens）
+# 用于新增检索索引后的存量数据回填，或绕过 ORM 的批量修改后修正索引
+#
+# 用法: python scripts/rebuild_search_index.py [--doc-type forum_post|science_article|notice|activity|activity_discuss]
+#       不指定 --doc-type 时重建全部文档类型
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.search_index import search_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重建全文检索倒排索引')
+    parser.add_argument('--doc-type', help='只重建指定文档类型')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = search_index.rebuild(args.doc_type)
+        for doc_type, total in result.items():
+            print(f"【检索索引重建完成】{doc_type}: 文档数 {total}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# 论坛计数对账：按主键区间分批重算帖子、楼层、回复的点赞数/评论数/回复数（帖子同时重算热度分）
+# 试运行只输出差异；正式运行每批提交后写检查点，中断后用 --resume 继续；
+# 帖子计数有变化时随后重建分类统计汇总表（forum_category_stats）
+#
+# 用法: python scripts/reconcile_forum_counters.py [--tables forum_posts,forum_floors,forum_replies]
+#       [--chunk-size 5000] [--dry-run] [--checkpoint reconcile_forum_counters.json] [--resume]
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from components.forum_counters import reconcile, COUNTER_TABLES
+from components.forum_category_stats import category_stats
+
+
+def print_diff(table_name, diff):
+    print(f"  {table_name}#{diff['id']} {diff['column']}: {diff['stored']} -> {diff['actual']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='论坛计数对账')
+    parser.add_argument('--tables', help=f"只对账指定的表（逗号分隔，可选 {','.join(COUNTER_TABLES)}）")
+    parser.add_argument('--chunk-size', type=int, default=5000, help='每批的主键区间大小')
+    parser.add_argument('--dry-run', action='store_true', help='只输出差异，不写入')
+    parser.add_argument('--checkpoint', default='reconcile_forum_counters.json', help='检查点文件路径')
+    parser.add_argument('--resume', action='store_true', help='从检查点继续')
+    args = parser.parse_args()
+
+    tables = args.tables.split(',') if args.tables else None
+    unknown = set(tables or []) - set(COUNTER_TABLES)
+    if unknown:
+        parser.error(f"未知的表: {','.join(sorted(unknown))}")
+
+    app = create_app()
+    with app.app_context():
+        summary = reconcile(
+            tables=tables, chunk_size=args.chunk_size, dry_run=args.dry_run,
+            checkpoint_path=None if args.dry_run else args.checkpoint, resume=args.resume,
+            on_diff=print_diff
+        )
+        for table_name, result in summary.items():
+            print(f"【计数对账{'（试运行）' if args.dry_run else ''}】{table_name}: {result}")
+
+        if not args.dry_run and summary.get('forum_posts', {}).get('updated'):
+            result = category_stats.rebuild()
+            print(f"【分类统计对账完成】汇总行数: {result['rows']}, 不一致行数: {result['drift']}")
+
+
+if __name__ == '__main__':
+    main()